@@ -0,0 +1,1364 @@
+"""Mesures de performance sur un bureau simulé (utilisable hors Windows).
+
+Usage:
+    python benchmark.py            # lance toutes les mesures
+    python benchmark.py detection  # lance une mesure précise
+"""
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+from testing import (
+    FakeBackend, FakeFontMetrics, FakeHookSource, FakeKeyboardLayout, FakeMouse, FakeMouseData, FakeWidget, FakeWindow,
+    FakeTkRoot, HeadlessOverlay, RecordingKeyboard, ScriptedEventSource, SyntheticCaptureSource, DOFUS_TITLES,
+    count_focus, make_roster
+)
+from window_detector import WindowDetector, WindowInfo
+from window_registry import WindowRegistry, EVENT_OBJECT_SHOW
+from detection_snapshot import DetectionSnapshot
+from window_manager import CharacterWindow, Roster, WindowManager
+from switch_dispatcher import SwitchDispatcher
+from focus_strategies import AltKeyStrategy, FocusStrategyEngine
+from hook_watchdog import HookWatchdog
+from hotkey_table import HotkeyTable, MODIFIER_NAMES, split_binding
+from hotkey_manager import HotkeyManager, position_binding
+from overlay_layout import CachedFontMetrics, compute_layout
+from thumbnails import ThumbnailScaler, ThumbnailScheduler
+from process_scheduler import PRIORITIES, ProcessPolicy, ProcessScheduler
+from memory_manager import MB, MemoryManager
+from focus_mode import FocusMode
+from resource_monitor import ResourceMonitor
+from core_loop import CoreLoop
+from win32_backend import Win32Backend
+from mouse_input import WM_MOUSEMOVE
+
+
+def _timeit(func, repeat: int) -> float:
+    """Retourne la durée moyenne d'un appel en millisecondes."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def _percentile(samples, fraction: float) -> float:
+    """Retourne le percentile `fraction` (0-1) d'une liste de mesures."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _core_loop(*components) -> CoreLoop:
+    """Boucle du cœur démarrée et confiée à `components` (à arrêter par l'appelant)."""
+    core = CoreLoop()
+    for component in components:
+        component.core = core
+    core.start()
+    return core
+
+
+def _legacy_detect(backend: FakeBackend):
+    """Reproduit l'ancien algorithme (2 GetWindowThreadProcessId + 1 accès processus par fenêtre)."""
+    windows = []
+    for hwnd in backend.enum_windows():
+        if not backend.is_window_visible(hwnd):
+            continue
+        title = backend.get_window_text(hwnd)
+        try:
+            pid = backend.get_window_pid(hwnd)
+            is_dofus = backend.get_process_name(pid) in WindowDetector.DOFUS_PROCESS_NAMES
+        except Exception:
+            is_dofus = False
+        if is_dofus:
+            windows.append(WindowInfo(hwnd, title, backend.get_window_pid(hwnd)))
+    return windows
+
+
+def bench_detection():
+    """Coût d'un re-scan complet: ancien algorithme vs moteur à cache de PID."""
+    print("🔍 Détection des fenêtres (200 applications, 8 clients DOFUS)")
+    backend = FakeBackend(latency={"get_process_name": 0.00005, "get_process_create_time": 0.00005})
+    backend.populate_desktop(DOFUS_TITLES, other_processes=200)
+    
+    backend.reset_calls()
+    legacy_ms = _timeit(lambda: _legacy_detect(backend), 20)
+    legacy_calls = sum(backend.calls.values()) / 20
+    legacy_lookups = backend.calls["get_process_name"] / 20
+    
+    detector = WindowDetector(backend)
+    backend.reset_calls()
+    new_ms = _timeit(detector.detect_windows, 20)
+    new_calls = sum(backend.calls.values()) / 20
+    new_lookups = backend.calls["get_process_create_time"] / 20
+    
+    print(f"  Ancien : {legacy_ms:7.3f} ms/scan, {legacy_calls:6.0f} appels, {legacy_lookups:4.0f} accès processus")
+    print(f"  Nouveau: {new_ms:7.3f} ms/scan, {new_calls:6.0f} appels, {new_lookups:4.0f} accès processus")
+    print(f"  → {len(detector.windows)} fenêtre(s) DOFUS détectée(s)\n")
+
+
+def bench_events():
+    """Mise à jour du registre par événements vs re-scan complet du bureau."""
+    print("📡 Registre événementiel (ouverture, renommage, fermeture d'un client)")
+    backend = FakeBackend()
+    backend.populate_desktop(DOFUS_TITLES, other_processes=200)
+    detector = WindowDetector(backend)
+    registry = WindowRegistry(detector)
+    registry.seed()
+    changes = []
+    registry.subscribe(changes.append)
+    source = ScriptedEventSource(backend, registry)
+    
+    # Bruit: fenêtres d'autres applications qui apparaissent
+    noise = [backend.create_window(backend.spawn_process("chrome.exe").pid, "Onglet") for _ in range(20)]
+    
+    backend.reset_calls()
+    for window in noise:
+        source.emit(EVENT_OBJECT_SHOW, window.hwnd)
+    new_window = source.launch_client("Nouveau - Cra - 3.0.12")
+    source.rename(new_window.hwnd, "Nouveau - Cra - 3.0.13")
+    source.close_client(new_window.hwnd)
+    event_calls = sum(backend.calls.values())
+    
+    backend.reset_calls()
+    detector.detect_windows()
+    rescan_calls = sum(backend.calls.values())
+    
+    kinds = [c.kind for c in changes]
+    print(f"  Événements: {len(source.emitted)} traités en {event_calls} appels système → {kinds}")
+    print(f"  Re-scan complet équivalent: {rescan_calls} appels système")
+    print(f"  → {len(registry.windows)} fenêtre(s) dans le registre\n")
+
+
+def bench_warm_start():
+    """Démarrage à froid (énumération complète) vs à chaud (instantané vérifié)."""
+    print("🚀 Démarrage à froid vs à chaud (400 applications, 8 clients, 20 µs/appel système)")
+    backend = FakeBackend()
+    backend.populate_desktop(DOFUS_TITLES, other_processes=400)
+    backend.latency = {name: 0.00002 for name in (
+        "enum_windows", "get_window_pid", "get_window_text", "is_window",
+        "is_window_visible", "iter_processes", "get_process_create_time")}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = DetectionSnapshot(os.path.join(tmp, "detection_cache.json"))
+        
+        backend.reset_calls()
+        cold_ms = _timeit(lambda: WindowDetector(backend).detect_windows(), 5)
+        cold_calls = sum(backend.calls.values()) / 5
+        detector = WindowDetector(backend)
+        snapshot.save(detector, detector.detect_windows())
+        
+        backend.reset_calls()
+        warm_ms = _timeit(lambda: snapshot.load_windows(WindowDetector(backend)), 5)
+        warm_calls = sum(backend.calls.values()) / 5
+        warm = snapshot.last_load_was_warm
+        
+        # Un client fermé invalide l'instantané: retour à l'énumération complète
+        closed = next(w for w in backend.windows.values() if w.title == DOFUS_TITLES[0])
+        backend.kill_process(closed.pid)
+        fallback_ms = _timeit(lambda: snapshot.load_windows(WindowDetector(backend)), 1)
+    
+    print(f"  À froid : {cold_ms:7.2f} ms, {cold_calls:6.0f} appels système")
+    print(f"  À chaud : {warm_ms:7.2f} ms, {warm_calls:6.0f} appels système (instantané valide: {warm})")
+    print(f"  Instantané invalide → repli complet: {fallback_ms:7.2f} ms\n")
+
+
+def bench_hook_dispatch():
+    """Durée du callback du hook clavier: switch synchrone vs dispatcher, en rafales."""
+    print("⌨️ Callback du hook clavier (focus simulé à 4 ms, rafales de 30 appuis)")
+    latency = {"set_foreground_window": 0.003, "keybd_event": 0.0005}
+    
+    def run(callback, bursts: int = 5, presses: int = 30):
+        samples = []
+        for _ in range(bursts):
+            for _ in range(presses):
+                start = time.perf_counter()
+                callback()
+                samples.append((time.perf_counter() - start) * 1000)
+                time.sleep(0.0005)  # répétition clavier très rapide
+            time.sleep(0.05)
+        return samples
+    
+    manager = make_roster(FakeBackend(latency=latency), strategies=[AltKeyStrategy()])
+    sync_attempts = count_focus(manager)
+    sync = run(manager.switch_to_next)
+    sync_focus = len(sync_attempts)
+    
+    manager = make_roster(FakeBackend(latency=latency), strategies=[AltKeyStrategy()])
+    queued_attempts = count_focus(manager)
+    dispatcher = SwitchDispatcher(manager)
+    core = _core_loop(dispatcher)
+    queued = run(dispatcher.submit_next)
+    time.sleep(0.05)
+    dispatcher.stop()
+    core.stop()
+    queued_focus = len(queued_attempts)
+    
+    for label, samples, focus in (("Synchrone ", sync, sync_focus), ("Dispatcher", queued, queued_focus)):
+        print(f"  {label}: moyenne {sum(samples) / len(samples):7.3f} ms, p99 {_percentile(samples, 0.99):7.3f} ms, "
+              f"max {max(samples):7.3f} ms, {focus} focus pour {len(samples)} appuis")
+    print(f"  → {dispatcher.coalesced} intention(s) fusionnée(s)\n")
+
+
+def bench_turn_order(cycles: int = 5000):
+    """Coût de suivant/précédent sur des rosters aléatoires (invalides + passés)."""
+    print(f"🔁 Ordre de tour: {cycles} switchs par roster, fenêtres invalides et personnages passés aléatoires")
+    rng = random.Random(42)
+    total_ms = 0.0
+    total_switches = 0
+    switched_count = 0
+    max_attempts = 0
+    max_calls = 0
+    for size in (1, 2, 8, 16, 32):
+        backend = FakeBackend()
+        manager = make_roster(backend, [f"Perso{i} - Iop - 3" for i in range(size)])
+        focus_attempts = count_focus(manager)
+        hwnds = [c.hwnd for c in manager.characters]
+        for cycle in range(cycles):
+            if cycle % 500 == 0:
+                # Relance des clients fermés (comme après un rattachement)
+                for hwnd, char in zip(hwnds, manager.characters):
+                    backend.windows.setdefault(hwnd, FakeWindow(hwnd, 0, char.name))
+                manager.validate_windows()
+            # Perturbations: fermeture/réouverture de fenêtres et personnages passés
+            if rng.random() < 0.05:
+                manager.set_valid_window(hwnds[rng.randrange(size)], rng.random() < 0.5)
+            if rng.random() < 0.05:
+                manager.toggle_skip(rng.randrange(size))
+            if rng.random() < 0.02:
+                # Fenêtre fermée sans événement reçu: seul l'échec du focus la révèle
+                backend.destroy_window(manager.characters[rng.randrange(size)].hwnd)
+            before = sum(backend.calls.values())
+            offset = rng.choice((1, -1, 2, -3))
+            start = time.perf_counter()
+            switched = manager.switch_by(offset)
+            total_ms += (time.perf_counter() - start) * 1000
+            total_switches += 1
+            attempts = len(focus_attempts)
+            focus_attempts.clear()
+            max_attempts = max(max_attempts, attempts)
+            max_calls = max(max_calls, sum(backend.calls.values()) - before)
+            switched_count += switched
+    print(f"  {total_switches} switchs ({switched_count} réussis): {total_ms * 1000 / total_switches:6.2f} µs/switch")
+    print(f"  Au plus {max_attempts} tentative(s) de focus et {max_calls} appels Win32 par switch\n")
+
+
+def bench_focus_strategies(switches: int = 300):
+    """Sélection automatique de la stratégie de focus sur une machine simulée."""
+    print(f"🎯 Stratégies de focus ({switches} switchs, verrou de premier plan et latence variable)")
+    backend = FakeBackend(
+        latency={"set_foreground_window": 0.0008, "switch_to_this_window": 0.0004,
+                 "attach_thread_input": 0.0006, "show_window": 0.003},
+        refusal={"set_foreground_window+alt": 0.35, "set_foreground_window+attached": 0.02,
+                 "switch_to_this_window": 0.5, "show_window_restore": 0.0},
+        jitter=0.3,
+    )
+    manager = make_roster(backend)
+    engine = manager.detector.focus_engine
+    engine.verify_timeout_ms = 10
+    
+    confirmed = 0
+    for _ in range(switches):
+        confirmed += manager.switch_to_next()
+    
+    for name, stats in engine.stats.items():
+        print(f"  {name:22s}: {stats.attempts:4d} essais, succès {stats.success_rate * 100:5.1f} %, "
+              f"latence {stats.latency_ms:6.3f} ms")
+    print(f"  → stratégie préférée: {engine.preferred()} ({confirmed}/{switches} switchs réussis)")
+    
+    # Les statistiques apprises survivent à un redémarrage
+    restored = WindowDetector(backend).focus_engine
+    restored.from_dict(engine.to_dict())
+    assert restored.preferred() == engine.preferred()
+    print("  ✓ Préférence restaurée depuis la configuration\n")
+
+
+def bench_focus_verification(switches: int = 200):
+    """Vérification du focus: lecture immédiate vs attente avec échéance et nouvel essai."""
+    print(f"⏱️ Vérification du focus ({switches} switchs, activation effective après 3-12 ms, 10 % de refus)")
+    
+    def run(verify_timeout_ms: int):
+        backend = FakeBackend(refusal={"set_foreground_window+alt": 0.1, "set_foreground_window+attached": 0.1,
+                                       "switch_to_this_window": 0.1, "show_window_restore": 0.1}, seed=7)
+        manager = make_roster(backend)
+        backend.activation_delay = 0.003
+        backend.rng.seed(7)
+        engine = manager.detector.focus_engine
+        engine.verify_timeout_ms = verify_timeout_ms
+        wrong_index = 0
+        for i in range(switches):
+            backend.activation_delay = 0.003 + 0.009 * backend.rng.random()
+            switched = manager.switch_to_next()
+            time.sleep(0.015)
+            # L'index courant doit toujours désigner la fenêtre réellement au premier plan
+            current = manager.get_current_character()
+            if switched and current is not None and backend.get_foreground_window() != current.hwnd:
+                wrong_index += 1
+        return engine.metrics.snapshot(), wrong_index
+    
+    for label, timeout in (("Lecture immédiate", 0), ("Échéance 50 ms  ", 50)):
+        metrics, wrong = run(timeout)
+        print(f"  {label}: {metrics['confirmed']:3d} confirmés, {metrics['failed']:3d} échecs, "
+              f"p50 {metrics['p50_ms']:6.2f} ms, p95 {metrics['p95_ms']:6.2f} ms, "
+              f"{wrong} index faux")
+        if timeout:
+            assert metrics['failed'] == 0 and wrong == 0
+    print("  ✓ L'index courant n'avance qu'après confirmation du premier plan\n")
+
+
+def bench_prefetch(turns: int = 60):
+    """Latence d'un « suivant » vers un client minimisé, avec et sans préchargement."""
+    print(f"🪟 Préchargement du prochain personnage ({turns} tours, clients minimisés, restauration à 8 ms)")
+    
+    def run(prefetch: bool):
+        backend = FakeBackend(latency={"show_window": 0.008, "set_foreground_window": 0.001})
+        manager = make_roster(backend, strategies=[AltKeyStrategy()])
+        dispatcher = SwitchDispatcher(manager, prefetch=prefetch)
+        switched = threading.Event()
+        dispatcher.on_switched = switched.set
+        core = _core_loop(dispatcher)
+        samples = []
+        for _ in range(turns):
+            # Entre deux tours, les autres clients sont minimisés (comme après un Alt+Tab)
+            current = manager.get_current_character()
+            for char in manager.characters:
+                if current is None or char.hwnd != current.hwnd:
+                    backend.windows[char.hwnd].iconic = True
+            dispatcher.submit_prefetch()
+            time.sleep(0.03)  # le tour du personnage actif
+            switched.clear()
+            start = time.perf_counter()
+            dispatcher.submit_next()
+            switched.wait(1.0)
+            samples.append((time.perf_counter() - start) * 1000)
+        dispatcher.stop()
+        core.stop()
+        return samples, dispatcher.prefetched
+    
+    for label, prefetch in (("Sans préchargement", False), ("Avec préchargement", True)):
+        samples, prefetched = run(prefetch)
+        print(f"  {label}: moyenne {sum(samples) / len(samples):6.2f} ms, p95 {_percentile(samples, 0.95):6.2f} ms "
+              f"({prefetched} fenêtre(s) préparée(s))")
+    print()
+
+
+def bench_hook_watchdog():
+    """Chien de garde du hook: chronométrage, délestage et réinstallation après retrait."""
+    print("🐕 Chien de garde du hook clavier (budget 40 ms, callback lent à 25 ms)")
+    clock = [0.0]
+    source = FakeHookSource(clock=lambda: clock[0])
+    watchdog = HookWatchdog(source, budget_ms=40, clock=lambda: clock[0])
+    core = _core_loop(watchdog)
+    done = []
+    
+    def register():
+        source.add_hotkey("tab", watchdog.wrap("tab", lambda: done.append("tab")))
+        source.add_hotkey("ctrl+alt+o", watchdog.wrap("ctrl+alt+o", lambda: (time.sleep(0.025), done.append("o"))))
+        source.add_hotkey("ctrl+alt+x", watchdog.wrap("ctrl+alt+x", lambda: (time.sleep(0.05), done.append("x"))))
+    
+    watchdog.on_hook_reinstalled = register
+    source.install()
+    register()
+    
+    samples = {"tab": [], "ctrl+alt+o": []}
+    for _ in range(20):
+        for key in samples:
+            start = time.perf_counter()
+            source.press(key)
+            samples[key].append((time.perf_counter() - start) * 1000)
+    source.press("ctrl+alt+x")
+    streak = HookWatchdog.OFFLOAD_STREAK
+    for key, values in samples.items():
+        stats = watchdog.stats[key]
+        print(f"  {key:11s}: {streak} premiers appels max {max(values[:streak]):6.2f} ms, "
+              f"suivants max {max(values[streak:]):6.3f} ms dans le hook, déporté: {stats.offloaded}")
+    print(f"  Dépassements du budget: {watchdog.total_overruns()} (ctrl+alt+x à 50 ms)")
+    assert watchdog.stats["ctrl+alt+o"].offloaded and not watchdog.stats["tab"].offloaded
+    assert max(samples["ctrl+alt+o"][streak:]) < 5
+    
+    # Windows retire le hook: les frappes ne l'atteignent plus
+    clock[0] += 5
+    source.drop()
+    lost = sum(not source.press("tab") for _ in range(3))
+    clock[0] += 2
+    reinstalled = watchdog.check()
+    assert reinstalled and source.press("tab") and "tab" in source.hotkeys
+    print(f"  Hook retiré: {lost} frappe(s) perdue(s), détecté par check() → réinstallé "
+          f"({watchdog.reinstalls} fois, {source.probes} sonde(s)), raccourcis réenregistrés")
+    
+    # Sans frappe manquée, aucune sonde n'est envoyée
+    probes = source.probes
+    clock[0] += 20
+    source.press("tab")
+    assert not watchdog.check() and source.probes == probes
+    watchdog.stop()
+    core.stop()
+    print("  ✓ Hook actif: aucune sonde envoyée\n")
+
+
+def bench_hotkey_table(keystrokes: int = 20000):
+    """Coût par frappe: table précompilée vs test de chaque raccourci (comme add_hotkey)."""
+    print(f"🗂️ Distribution des raccourcis ({keystrokes} frappes, disposition AZERTY simulée)")
+    layout = FakeKeyboardLayout()
+    keys = [name for name in layout.SCAN_CODES if name not in MODIFIER_NAMES and not name.startswith("right")]
+    modifiers = ["", "ctrl+", "shift+", "alt+", "ctrl+alt+", "ctrl+shift+", "alt+shift+", "windows+",
+                 "ctrl+alt+shift+", "windows+shift+", "windows+ctrl+", "windows+alt+"]
+    all_bindings = [mod + key for mod in modifiers for key in keys]
+    rng = random.Random(3)
+    
+    for count in (8, 32, 128, 512):
+        bindings = all_bindings[:count]
+        hits = []
+        table = HotkeyTable(layout.resolve)
+        table.compile({binding: (lambda b=binding: hits.append(b)) for binding in bindings})
+        events = []
+        while len(events) < keystrokes:
+            events.extend(layout.chord(rng.choice(all_bindings)))
+        
+        # Référence: chaque frappe est comparée à chaque raccourci enregistré
+        combos = [(frozenset(layout.resolve(n)[0] for n in split_binding(b)), b) for b in bindings]
+        pressed = set()
+        linear_hits = []
+        
+        def linear(event):
+            if event.event_type == "down":
+                pressed.add(event.scan_code)
+                for combo, binding in combos:
+                    if combo == pressed:
+                        linear_hits.append(binding)
+            else:
+                pressed.discard(event.scan_code)
+        
+        start = time.perf_counter()
+        for event in events:
+            linear(event)
+        linear_us = (time.perf_counter() - start) * 1e6 / len(events)
+        
+        handle = table.handle
+        start = time.perf_counter()
+        for event in events:
+            handle(event)
+        table_us = (time.perf_counter() - start) * 1e6 / len(events)
+        print(f"  {count:4d} raccourcis: linéaire {linear_us:6.3f} µs/événement, table {table_us:6.3f} µs/événement "
+              f"({len(hits)} déclenchés)")
+    
+    lookups = layout.lookups
+    table = HotkeyTable(layout.resolve)
+    table.compile({"&": lambda: None, "é": lambda: None, "ctrl+alt+o": lambda: None})
+    print(f"  → « & » et « é » résolus à la compilation ({layout.lookups - lookups} résolutions pour 3 raccourcis)\n")
+
+
+def bench_hotkey_diff(reconfigurations: int = 500):
+    """Réenregistrement différentiel: coût d'une reconfiguration pendant que F1 est utilisé."""
+    print(f"♻️ Réenregistrement différentiel des raccourcis ({reconfigurations} reconfigurations)")
+    fake_keyboard = RecordingKeyboard()
+    manager = WindowManager(WindowDetector(FakeBackend()))
+    watchdog = HookWatchdog(FakeHookSource(), budget_ms=300)
+    hotkeys = HotkeyManager(manager, SwitchDispatcher(manager), watchdog, keyboard_module=fake_keyboard)
+    hotkeys.dispatcher.submit_position = lambda position: fired.append(position)
+    fired = []
+    core = _core_loop(hotkeys.dispatcher, watchdog)
+    
+    hotkeys.register_all()
+    hotkeys.next_key = "a"
+    print(f"  Suivant ` → a            → {hotkeys.apply_bindings()}")
+    hotkeys.next_key, hotkeys.previous_key = hotkeys.previous_key, hotkeys.next_key
+    print(f"  Échange suivant/précédent → {hotkeys.apply_bindings()}")
+    
+    # F1 reste utilisé pendant que d'autres touches changent en continu
+    stop = threading.Event()
+    
+    def press_f1():
+        while not stop.is_set():
+            fake_keyboard.press("f1")
+    
+    presser = threading.Thread(target=press_f1)
+    presser.start()
+    start = time.perf_counter()
+    for i in range(reconfigurations):
+        hotkeys.toggle_overlay_key = "ctrl+alt+o" if i % 2 else "ctrl+alt+p"
+        hotkeys.quit_key = "ctrl+alt+q" if i % 3 else "ctrl+alt+w"
+        hotkeys.apply_bindings()
+    elapsed = (time.perf_counter() - start) * 1000 / reconfigurations
+    stop.set()
+    presser.join()
+    watchdog.stop()
+    core.stop()
+    print(f"  {elapsed * 1000:6.1f} µs/reconfiguration, {len(fired)} appuis sur F1, "
+          f"opérations keyboard: {fake_keyboard.operations}\n")
+
+
+def bench_mouse_input(moves: int = 200000):
+    """Moteur clavier + souris: coût du filtre sur les mouvements."""
+    print(f"🖱️ Boutons de souris dans la table des raccourcis ({moves} mouvements simulés)")
+    fake_mouse = FakeMouse()
+    manager = WindowManager(WindowDetector(FakeBackend()))
+    hotkeys = HotkeyManager(manager, SwitchDispatcher(manager), HookWatchdog(FakeHookSource(), budget_ms=300),
+                            keyboard_module=RecordingKeyboard(), mouse_module=fake_mouse)
+    core = _core_loop(hotkeys.dispatcher, hotkeys.watchdog)
+    hotkeys.register_all()
+    hotkeys.next_key = "mouse:x2"
+    hotkeys.previous_key = "mouse:x1"
+    hotkeys.position_keys[0] = "ctrl+mouse:middle"
+    hotkeys.position_keys[1] = "mouse:tilt_right"
+    hotkeys.apply_bindings()
+    
+    # Coût du filtre sur le chemin des mouvements (la majorité des messages)
+    move = FakeMouseData()
+    mouse_filter = fake_mouse.listeners[0].win32_event_filter
+    start = time.perf_counter()
+    for _ in range(moves):
+        mouse_filter(WM_MOUSEMOVE, move)
+    per_move = (time.perf_counter() - start) * 1e9 / moves
+    hotkeys.watchdog.stop()
+    core.stop()
+    print(f"  Filtre sur WM_MOUSEMOVE: {per_move:6.0f} ns/mouvement\n")
+
+
+def bench_large_roster(repeat: int = 2000):
+    """Rosters de 8 à 32 personnages: raccourcis par pages, switchs et mise en page de l'overlay."""
+    print(f"👥 Grands rosters (pages Shift/Ctrl+Shift/Alt+Shift, {repeat} répétitions)")
+    for size in (8, 16, 32):
+        titles = [f"Perso{i} - {['Iop', 'Cra', 'Eniripsa', 'Sacrieur'][i % 4]} - 3.0" for i in range(size)]
+        manager = make_roster(FakeBackend(), titles, strategies=[AltKeyStrategy()])
+        
+        fake_keyboard = RecordingKeyboard()
+        hotkeys = HotkeyManager(manager, SwitchDispatcher(manager), HookWatchdog(FakeHookSource(), budget_ms=300),
+                                keyboard_module=fake_keyboard)
+        hotkeys.page_modifiers = ["", "shift", "ctrl+shift", "alt+shift"]
+        hotkeys.dispatcher.submit_position = lambda position: None
+        core = _core_loop(hotkeys.dispatcher, hotkeys.watchdog)
+        hotkeys.register_all()
+        # Raccourci direct du dernier personnage (page la plus chargée en modificateurs)
+        last = position_binding(size - 1, hotkeys.position_keys, hotkeys.page_modifiers)
+        press_us = _timeit(lambda: fake_keyboard.press(last), repeat) * 1000
+        hotkeys.watchdog.stop()
+        core.stop()
+        
+        switch_us = _timeit(lambda: manager.switch_by(1), repeat) * 1000
+        names = [c.name for c in manager.characters]
+        name_us = _timeit(lambda: manager.switch_to_character(names[-1]), repeat) * 1000
+        
+        overlay = HeadlessOverlay()
+        overlay.update_display([f"{c.name}-{t.split(' - ')[1]}" for c, t in zip(manager.characters, titles)],
+                               0, 1)
+        overlay.drain()
+        layout_us = _timeit(lambda: compute_layout(overlay.characters, overlay.metrics, overlay.FONT_FAMILY,
+                                                   overlay.font_size, 1900), repeat) * 1000
+        layout = overlay.compute_layout()
+        print(f"  {size:2d} personnages: raccourci {last} {press_us:5.1f} µs, switch suivant {switch_us:6.1f} µs, "
+              f"par nom {name_us:6.1f} µs, mise en page {layout_us:6.1f} µs "
+              f"({len(layout.rows)} ligne(s), {overlay._window_size(layout)[0]} px)")
+    print()
+
+
+def bench_overlay_layout(repeat: int = 2000):
+    """Mise en page sans Tk: largeurs mesurées, cache LRU des métriques de police."""
+    print(f"📐 Mise en page de l'overlay ({repeat} calculs par taille de roster)")
+    # Noms de même longueur mais de largeurs très différentes dans une police proportionnelle
+    shapes = ["Iiilljt", "Mowwmwm", "Sadi-Perso", "WWMMWWM", "Eni", "Roublard-Perso"]
+    max_width = 1900
+    for size in (8, 16, 32):
+        names = [f"{shapes[i % len(shapes)]}{i}" for i in range(size)]
+        font = FakeFontMetrics()
+        metrics = CachedFontMetrics(font)
+        cold_start = time.perf_counter()
+        layout = compute_layout(names, metrics, "Arial", 14, max_width)
+        cold_us = (time.perf_counter() - cold_start) * 1e6
+        cold_measures = font.measures
+        warm_us = _timeit(lambda: compute_layout(names, metrics, "Arial", 14, max_width), repeat) * 1000
+        
+        # Écart de l'ancienne estimation (9 px par caractère + 10 %) avec la mesure réelle
+        errors = []
+        for (_, _, width, _), name in zip(layout.labels, names):
+            estimate = int(((len(name) + 2) * 9 + 16) * 1.1)
+            errors.append(estimate - width)
+        hit_rate = metrics.hits / (metrics.hits + metrics.misses)
+        print(f"  {size:2d} personnages: à froid {cold_us:6.1f} µs ({cold_measures} mesures), en cache "
+              f"{warm_us:5.1f} µs, succès du cache {hit_rate:.1%}, {len(layout.rows)} ligne(s); "
+              f"ancienne estimation {min(errors):+d}..{max(errors):+d} px par label")
+    print()
+
+
+def bench_overlay_diff(updates: int = 2000):
+    """Rendu différentiel de l'overlay: opérations sur les widgets par mise à jour."""
+    print(f"🖼️ Rendu différentiel de l'overlay ({updates} mises à jour par taille de roster)")
+    for size in (8, 16, 32):
+        names = [f"Perso{i}" for i in range(size)]
+        overlay = HeadlessOverlay()
+        first = overlay.render(names, 0, 1)
+        unchanged = overlay.render(list(names), 0, 1)
+        
+        cursor_ops = []
+        start = time.perf_counter()
+        for step in range(updates):
+            current = step % size
+            cursor_ops.append(overlay.render(names, current, (current + 1) % size))
+        per_update = (time.perf_counter() - start) * 1e6 / updates
+        
+        renamed = list(names)
+        renamed[size // 2] = "Renommé"
+        rename_ops = overlay.render(renamed, 0, 1)
+        grown_ops = overlay.render(renamed + ["Nouveau"], 0, 1)
+        shrunk_ops = overlay.render(renamed, 0, 1)
+        print(f"  {size:2d} personnages: création {first:3d} op., inchangé {unchanged} op., curseur max "
+              f"{max(cursor_ops)} op. ({per_update:5.1f} µs), renommage {rename_ops} op., "
+              f"ajout {grown_ops} op., retrait {shrunk_ops} op.")
+    print()
+
+
+def bench_overlay_handoff(updates_per_thread: int = 3000, max_fps: int = 60):
+    """Mises à jour de l'overlay depuis plusieurs threads, relevées par le thread Tk à cadence plafonnée."""
+    print(f"🧵 Transmission à l'overlay (3 threads × {updates_per_thread} mises à jour, {max_fps} i/s)")
+    names = [f"Perso{i}" for i in range(8)]
+    overlay = HeadlessOverlay()
+    overlay.max_fps = max_fps
+    interval = overlay.frame_interval_ms / 1000
+    done = threading.Event()
+    last_put = {}
+    
+    def producer(name: str, pause: float):
+        for step in range(updates_per_thread):
+            current = step % len(names)
+            overlay.update_display(names, current, (current + 1) % len(names))
+            last_put[name] = time.perf_counter()
+            time.sleep(pause)
+    
+    threads = [threading.Thread(target=producer, args=(name, pause))
+               for name, pause in (("raccourcis", 0.0001), ("fenêtres", 0.0003), ("configuration", 0.0005))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    
+    # Boucle du thread Tk: un relevé par image
+    frames = 0
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(interval)
+        overlay.drain()
+        frames += 1
+    rendered_at = time.perf_counter()
+    overlay.drain()
+    # Dernier état publié rendu au plus une image après la dernière mise à jour
+    lag_ms = (rendered_at - max(last_put.values())) * 1000
+    elapsed = time.perf_counter() - start
+    
+    total = updates_per_thread * len(threads)
+    assert overlay.renders <= frames + 1
+    assert overlay._pending.take() is None
+    print(f"  {total} mises à jour en {elapsed:.2f} s → {overlay.renders} rendus sur {frames} images "
+          f"({total / max(1, overlay.renders):.0f} mises à jour fusionnées par rendu), "
+          f"retard de la dernière {lag_ms:.1f} ms (image = {interval * 1000:.0f} ms)")
+    print("  ✓ Aucun appel Tk hors du thread Tk; au plus un rendu par image\n")
+
+
+def bench_thumbnails(scales: int = 50, seconds: int = 60):
+    """Vignettes: réduction NumPy sans allocation, priorités du planificateur, thread Tk jamais bloqué."""
+    import numpy as np
+    import tracemalloc
+    
+    print(f"🖼️ Vignettes en direct (1920×1080 → 160×90, {seconds} s simulées)")
+    source = SyntheticCaptureSource()
+    scaler = ThumbnailScaler(160, 90)
+    frame = source.capture(1)
+    first = scaler.scale(1, frame)
+    second = scaler.scale(1, source.capture(1))
+    assert first is not second and scaler.scale(1, source.capture(1)) is first
+    
+    # Référence: moyenne des mêmes échantillons calculée naïvement
+    rows, cols = scaler._plan(frame.shape)[:2]
+    frame = source.capture(1)
+    output = scaler.scale(1, frame)
+    reference = sum(frame[r][:, c][:, :, :3].astype(np.uint16) for r in rows for c in cols) // 4
+    assert np.array_equal(output, reference[:, :, ::-1].astype(np.uint8))
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(scales):
+        scaler.scale(1, frame)
+    scale_ms = (time.perf_counter() - start) * 1000 / scales
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  Réduction: {scale_ms:.2f} ms par image, pic d'allocation {peak} octets sur {scales} images")
+    
+    # Planificateur: 16 fenêtres, 8 captures/s, horloge simulée
+    now = [0.0]
+    scheduler = ThumbnailScheduler(SyntheticCaptureSource(320, 180), ThumbnailScaler(160, 90),
+                                   captures_per_second=8, clock=lambda: now[0])
+    hwnds = list(range(100, 116))
+    scheduler.set_roster(hwnds, current_hwnd=100, next_hwnd=101)
+    ticks = seconds * scheduler.captures_per_second
+    for _ in range(ticks):
+        scheduler.tick()
+        now[0] += 1 / scheduler.captures_per_second
+    captures = scheduler.captures
+    others = [captures.get(hwnd, 0) for hwnd in hwnds[2:]]
+    assert sum(captures.values()) == ticks
+    assert captures[101] > captures[100] > max(others)
+    print(f"  Planificateur ({ticks} captures): suivant toutes les {seconds / captures[101]:.2f} s, "
+          f"actif toutes les {seconds / captures[100]:.2f} s, autres toutes les "
+          f"{seconds * len(others) / sum(others):.2f} s")
+    
+    # Fermeture d'une fenêtre: ses tampons et sa vignette disparaissent
+    scheduler.set_roster(hwnds[:-1], 100, 101)
+    scheduler.tick()
+    assert hwnds[-1] not in scheduler.published and hwnds[-1] not in scheduler.scaler._outputs
+    
+    # Thread de capture réel (capture lente de 20 ms) pendant que le thread Tk relève l'état
+    scheduler = ThumbnailScheduler(SyntheticCaptureSource(capture_delay=0.02), ThumbnailScaler(160, 90),
+                                   captures_per_second=20)
+    scheduler.set_roster(hwnds[:8], 100, 101)
+    overlay = HeadlessOverlay()
+    overlay.set_thumbnails(scheduler)
+    overlay.update_display([f"Perso{i}" for i in range(8)], 0, 1, hwnds=hwnds[:8])
+    scheduler.start()
+    drains = []
+    deadline = time.perf_counter() + 1.0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        overlay.drain()
+        drains.append((time.perf_counter() - start) * 1000)
+        time.sleep(1 / 60)
+    scheduler.stop()
+    shown = sum(1 for label in overlay.labels if label.options.get("image"))
+    print(f"  Thread Tk: relevé max {max(drains):.2f} ms (capture {scheduler.capture_ms / max(1, sum(scheduler.captures.values())):.1f} ms), "
+          f"{shown}/8 vignettes affichées, {sum(scheduler.captures.values())} captures en 1 s")
+    print("  ✓ Captures hors du thread Tk, tampons réutilisés, priorité au prochain puis à l'actif\n")
+
+
+def bench_process_scheduler(turns: int = 40):
+    """Priorité/affinité des clients: politique sur table simulée, coût hors du chemin du switch."""
+    print(f"⚙️ Priorité CPU des clients ({turns} switchs, appels psutil à 3 ms)")
+    latency = {name: 0.003 for name in ("get_process_priority", "set_process_priority",
+                                         "get_process_affinity", "set_process_affinity")}
+    focused, background = PRIORITIES["above_normal"], PRIORITIES["below_normal"]
+    
+    # Politique pure: cœurs filtrés, le client actif l'emporte
+    policy = ProcessPolicy(default_cores=[4, 5, 6, 7, 42], client_cores={"p1": [0, 1]})
+    plan = policy.plan([("P1", 10), ("P2", 11), ("P3", 0)], focused_pid=11, cpu_count=8)
+    assert plan == {10: (background, (0, 1)), 11: (focused, (4, 5, 6, 7))}
+    
+    def run(with_scheduler: bool):
+        backend = FakeBackend(latency=dict(latency, set_foreground_window=0.001))
+        manager = make_roster(backend, strategies=[AltKeyStrategy()])
+        scheduler = ProcessScheduler(backend, ProcessPolicy(default_cores=[2, 3, 4, 5, 6, 7]),
+                                     enabled=with_scheduler)
+        clients = [(char.name, char.hwnd) for char in manager.characters]
+        pids = {char.hwnd: backend.windows[char.hwnd].pid for char in manager.characters}
+        dispatcher = SwitchDispatcher(manager)
+        switched = threading.Event()
+        
+        def on_switched():
+            scheduler.notify(clients, manager.get_current_character().hwnd)
+            switched.set()
+        
+        dispatcher.on_switched = on_switched
+        core = _core_loop(dispatcher, scheduler)
+        samples = []
+        for _ in range(turns):
+            switched.clear()
+            start = time.perf_counter()
+            dispatcher.submit_next()
+            switched.wait(1.0)
+            samples.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.06)  # laisser le planificateur appliquer avant le switch suivant
+        dispatcher.stop()
+        scheduler.stop()
+        core.stop()
+        return backend, manager, scheduler, pids, samples
+    
+    for label, enabled in (("Sans planificateur", False), ("Avec planificateur", True)):
+        backend, manager, scheduler, pids, samples = run(enabled)
+        print(f"  {label}: switch moyen {sum(samples) / len(samples):5.2f} ms, "
+              f"p95 {_percentile(samples, 0.95):5.2f} ms")
+    
+    current_pid = pids[manager.get_current_character().hwnd]
+    for pid in pids.values():
+        process = backend.processes[pid]
+        assert process.priority == (focused if pid == current_pid else background)
+        assert process.affinity == [2, 3, 4, 5, 6, 7]
+    sets = backend.calls["set_process_priority"]
+    # Premier passage: 8 clients; ensuite 2 changements par switch (ancien et nouvel actif)
+    assert sets == 8 + 2 * (turns - 1), sets
+    print(f"  {sets} changements de priorité pour {turns} switchs, affinité posée une fois "
+          f"({backend.calls['set_process_affinity']} appels)")
+    
+    # Client protégé: une seule erreur, pas de nouvel essai à chaque switch
+    protected = next(iter(pids.values()))
+    backend.processes[protected].protected = True
+    scheduler.restore()
+    clients = [(char.name, char.hwnd) for char in manager.characters]
+    for char in manager.characters:
+        scheduler.apply(clients, char.hwnd)
+    errors = scheduler.errors
+    scheduler.apply(clients, manager.characters[0].hwnd)
+    assert scheduler.errors == errors and errors >= 1
+    
+    # Fermeture: tous les autres clients retrouvent leurs réglages d'origine
+    scheduler.restore()
+    for pid in pids.values():
+        if pid != protected:
+            assert backend.processes[pid].priority == PRIORITIES["normal"]
+            assert backend.processes[pid].affinity == list(range(backend.cpus))
+    print(f"  Client protégé: {errors} erreur(s) sans nouvel essai; réglages d'origine rétablis à la fermeture")
+    print("  ✓ Les appels psutil se font dans le thread du planificateur, jamais dans le switch\n")
+
+
+def bench_memory_manager(minutes: int = 60):
+    """Réduction du working set: exemptions, limites de rythme et mémoire libérée (horloge simulée)."""
+    print(f"🧹 Réduction mémoire des clients en arrière-plan ({minutes} min simulées, 8 clients à 1,5 Go)")
+    backend = FakeBackend()
+    manager = make_roster(backend)
+    clock = [0.0]
+    memory = MemoryManager(backend, enabled=True, clock=lambda: clock[0])
+    clients = [(char.name, char.hwnd) for char in manager.characters]
+    pids = {char.name: backend.windows[char.hwnd].pid for char in manager.characters}
+    for pid in pids.values():
+        backend.processes[pid].rss = 1536 * MB
+    protected = pids["P8"]
+    backend.processes[protected].protected = True
+    
+    trims_by_tick = []
+    for minute in range(minutes):
+        # Un switch toutes les 5 minutes; les clients reprennent 2 % de mémoire par minute
+        current = (minute // 5) % len(clients)
+        next_index = (current + 1) % len(clients)
+        memory.set_roster(clients, clients[current][1], clients[next_index][1])
+        for pid in pids.values():
+            process = backend.processes[pid]
+            process.rss = min(1536 * MB, int(process.rss * 1.02))
+        exempt = {pids[clients[current][0]], pids[clients[next_index][0]]}
+        trimmed = memory.tick()
+        assert all(record.pid not in exempt for record in trimmed)
+        trims_by_tick.append(len(trimmed))
+        clock[0] += memory.interval
+    
+    assert max(trims_by_tick) <= memory.max_trims_per_tick
+    by_pid = {}
+    for record in memory.records:
+        by_pid.setdefault(record.pid, []).append(record.time)
+    for times in by_pid.values():
+        assert all(b - a >= memory.client_interval for a, b in zip(times, times[1:]))
+    assert protected not in by_pid and memory.errors >= 1
+    
+    savings = memory.saved_by_client
+    first = memory.records[0]
+    print(f"  {len(memory.records)} trims ({max(trims_by_tick)} max par passe), "
+          f"{memory.total_saved // MB} Mo libérés au total, ex. {first.name}: "
+          f"{first.before // MB} → {first.after // MB} Mo")
+    print(f"  Par personnage: " + ", ".join(f"{name} {saved // MB} Mo" for name, saved in sorted(savings.items())))
+    print(f"  Client protégé: {memory.errors} refus, réessayé au rythme normal")
+    print("  ✓ Actif et suivant jamais réduits; un trim par client toutes les "
+          f"{memory.client_interval:.0f} s au plus\n")
+
+
+def bench_focus_mode(switches: int = 100):
+    """Coût par switch du mode focus (minimiser ou masquer), dans son budget, sur bureau simulé."""
+    print(f"🎯 Mode focus ({switches} switchs, 8 clients, ShowWindow à 1,5 ms, cloak DWM à 0,3 ms)")
+    
+    def run(method):
+        backend = FakeBackend(latency={"show_window": 0.0015, "cloak_window": 0.0003,
+                                       "set_foreground_window": 0.001})
+        manager = make_roster(backend, strategies=[AltKeyStrategy()])
+        focus_mode = manager.focus_mode
+        focus_mode.from_dict({"enabled": method is not None, "method": method or FocusMode.MINIMIZE})
+        dispatcher = SwitchDispatcher(manager)
+        switched = threading.Event()
+        dispatcher.on_switched = switched.set
+        core = _core_loop(dispatcher)
+        samples = []
+        for _ in range(switches):
+            switched.clear()
+            start = time.perf_counter()
+            dispatcher.submit_next()
+            switched.wait(1.0)
+            samples.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.02)  # le tour du personnage actif (le travail différé se termine)
+        dispatcher.stop()
+        core.stop()
+        manager.settle_focus_mode()
+        
+        if method is not None:
+            current = manager.get_current_character()
+            next_char = manager.characters[manager.get_next_index()]
+            shown = {char.hwnd for char in manager.characters
+                     if not backend.windows[char.hwnd].iconic and not backend.windows[char.hwnd].cloaked}
+            assert shown == {current.hwnd, next_char.hwnd}, shown
+            assert set(focus_mode.hidden) == {char.hwnd for char in manager.characters} - shown
+            focus_mode.restore_all()
+            assert not any(backend.windows[char.hwnd].iconic or backend.windows[char.hwnd].cloaked
+                           for char in manager.characters)
+        return samples, list(focus_mode.costs), focus_mode.deferred
+    
+    budget = FocusMode.DEFAULT_BUDGET_MS
+    for label, method in (("Désactivé", None), ("Minimiser", FocusMode.MINIMIZE), ("Masquer (DWM)", FocusMode.CLOAK)):
+        samples, costs, deferred = run(method)
+        line = f"  {label:14} switch p50 {_percentile(samples, 0.5):5.2f} ms, p95 {_percentile(samples, 0.95):5.2f} ms"
+        if costs:
+            assert _percentile(costs, 0.5) <= budget
+            line += (f" | mode focus p50 {_percentile(costs, 0.5):4.2f} ms, max {max(costs):4.2f} ms "
+                     f"(budget {budget:.0f} ms, {deferred} switch(s) avec travail différé)")
+        print(line)
+    
+    # Budget vérifié exactement: horloge simulée avancée par chaque appel système (±30 %),
+    # sans les retards d'ordonnancement de la machine; sauts directs vers des clients masqués compris
+    now = [0.0]
+    
+    def advance(delay):
+        now[0] += delay
+    
+    for method in (FocusMode.MINIMIZE, FocusMode.CLOAK):
+        backend = FakeBackend(latency={"show_window": 0.0015, "cloak_window": 0.0003}, jitter=0.3, sleep=advance)
+        manager = make_roster(backend, strategies=[AltKeyStrategy()])
+        manager.focus_mode = FocusMode(backend, method, enabled=True, clock=lambda: now[0])
+        manager.focus_mode.costs = deque()  # tous les switchs, pas seulement les derniers
+        rng = random.Random(5)
+        for _ in range(switches * 5):
+            if rng.random() < 0.3:
+                manager.switch_to_position(rng.randrange(len(manager.characters)))
+            else:
+                manager.switch_by(1)
+            manager.settle_focus_mode()
+        costs = manager.focus_mode.costs
+        assert max(costs) <= budget, f"mode focus hors budget: {max(costs):.2f} ms"
+        print(f"  Horloge simulée, {method:8}: max {max(costs):4.2f} ms sur {len(costs)} switchs "
+              f"({manager.focus_mode.deferred} avec travail différé)")
+    print(f"  ✓ Après chaque tour, seuls l'actif et le suivant sont affichés; budget de {budget:.0f} ms jamais dépassé "
+          f"(horloge simulée)\n")
+
+
+def bench_resource_monitor(ticks: int = 3600, clients: int = 16):
+    """Coût de l'échantillonnage CPU/RAM à 1 Hz (table de processus simulée) et badges de l'overlay."""
+    print(f"📊 Suivi des ressources ({clients} clients, {ticks} ticks à 1 Hz simulés)")
+    titles = [f"Perso{i} - {['Iop', 'Cra', 'Eniripsa', 'Sacrieur'][i % 4]} - 3.0" for i in range(clients)]
+    backend = FakeBackend()
+    manager = make_roster(backend, titles)
+    rng = random.Random(3)
+    clock = [0.0]
+    monitor = ResourceMonitor(backend, enabled=True, clock=lambda: clock[0])
+    monitor.set_roster([(window.hwnd, window.pid) for window in manager.registry.get_windows()])
+    processes = [backend.processes[window.pid] for window in manager.registry.get_windows()]
+    for process in processes:
+        process.rss = rng.randrange(800, 1600) * MB
+    
+    monitor.tick()
+    buffers = {pid: stats.cpu.data.buffer_info()[0] for pid, stats in monitor.stats.items()}
+    elapsed = 0.0
+    for _ in range(ticks):
+        # Chaque client consomme entre 0 et 1,5 cœur pendant la seconde écoulée
+        for process in processes:
+            process.cpu_time += rng.uniform(0.0, 1.5)
+            process.rss += rng.randrange(-4, 5) * MB
+        clock[0] += 1.0
+        start = time.process_time()
+        monitor.tick()
+        elapsed += time.process_time() - start
+    
+    assert backend.calls["sample_processes"] == ticks + 1  # une seule passe par tick
+    assert len(monitor.published) == clients
+    first = monitor.stats[processes[0].pid]
+    assert first.cpu.count == monitor.history
+    assert all(stats.cpu.data.buffer_info()[0] == buffers[pid] for pid, stats in monitor.stats.items())
+    assert all(0.0 <= value <= 1.5 / backend.cpus * 100 + 1e-3 for value in first.cpu.values())
+    per_tick_ms = elapsed / ticks * 1000
+    cpu_percent = per_tick_ms / 1000 * 100  # une passe par seconde
+    assert cpu_percent < 1.0
+    print(f"  Table simulée: {per_tick_ms * 1000:6.1f} µs par passe, soit {cpu_percent:.4f} % d'un cœur à 1 Hz")
+    print(f"  Historique: {monitor.history} mesures par client, tampons préalloués "
+          f"({first.cpu.data.itemsize + first.rss.data.itemsize} octets par mesure)")
+    
+    # Même passe sur de vrais processus (ceux de cette machine) via psutil
+    import psutil
+    pids = [p.pid for p in psutil.process_iter()][:clients]
+    real = Win32Backend()
+    real.sample_processes(pids)
+    start = time.process_time()
+    for _ in range(50):
+        real.sample_processes(pids)
+    real_ms = (time.process_time() - start) / 50 * 1000
+    print(f"  psutil réel ({len(pids)} processus de cette machine): {real_ms:.3f} ms par passe, "
+          f"{real_ms / 10:.3f} % d'un cœur à 1 Hz")
+    
+    # Badges: un tick ne reconfigure que les labels dont le badge a changé
+    overlay = HeadlessOverlay()
+    overlay.set_resources(monitor)
+    hwnds = [char.hwnd for char in manager.characters]
+    overlay.update_display(manager.get_character_list(), 0, 1, hwnds=hwnds)
+    overlay.drain()
+    text = overlay.labels[0].options["text"]
+    assert text.startswith("[P1]\n") and "% · " in text and text.endswith(" Mo"), text
+    for _ in range(2):
+        # Clients au repos: les badges se stabilisent
+        clock[0] += 1.0
+        monitor.tick()
+        overlay.drain()
+    processes[2].cpu_time += 0.5
+    clock[0] += 1.0
+    monitor.tick()
+    overlay.drain()
+    assert overlay.last_update_ops == 1, overlay.last_update_ops
+    print(f"  Overlay: badge « {text.splitlines()[1]} », {overlay.last_update_ops} label(s) "
+          f"reconfiguré(s) après un tick\n")
+
+
+def bench_roster_stress(duration: float = 1.5):
+    """Débit des switchs, remplacements du roster et lectures en parallèle."""
+    print(f"🧪 Roster sous contention ({duration:.1f} s: 2 threads de switch, 1 de configuration, "
+          f"1 d'événements, 1 lecteur)")
+    titles = [f"Perso{i} - {['Iop', 'Cra', 'Eniripsa', 'Sacrieur'][i % 4]} - 3.0" for i in range(16)]
+    backend = FakeBackend()
+    manager = make_roster(backend, titles)
+    windows = manager.registry.get_windows()
+    # Deux rosters possibles: 16 personnages « A », ou 8 personnages « B » dans l'ordre inverse
+    roster_a = [(f"A{i}", window.hwnd, i) for i, window in enumerate(windows)]
+    roster_b = [(f"B{i}", window.hwnd, i) for i, window in enumerate(reversed(windows[:8]))]
+    manager.set_characters(roster_a)
+    
+    stop = threading.Event()
+    counts = {"switchs": 0, "remplacements": 0, "événements": 0, "lectures": 0}
+    counts_lock = threading.Lock()
+    
+    def worker(name, action):
+        rng = random.Random(name)
+        done = 0
+        while not stop.is_set():
+            action(rng)
+            done += 1
+        with counts_lock:
+            counts[name] += done
+    
+    def switch(rng):
+        if rng.random() < 0.7:
+            manager.switch_by(rng.choice((1, -1, 2)))
+        else:
+            manager.switch_to_position(rng.randrange(16))
+    
+    def replace(rng):
+        manager.set_characters(roster_b if rng.random() < 0.5 else roster_a)
+        time.sleep(0.0005)
+    
+    def event(rng):
+        window = rng.choice(windows)
+        manager.set_valid_window(window.hwnd, rng.random() < 0.7)
+        if rng.random() < 0.2:
+            manager.toggle_skip_current()
+    
+    def read(rng):
+        # Comme _update_overlay: un instantané, puis uniquement lui
+        snapshot = manager.snapshot()
+        snapshot.names()
+        snapshot.next_index()
+    
+    threads = [threading.Thread(target=worker, args=("switchs", switch)) for _ in range(2)]
+    threads += [threading.Thread(target=worker, args=("remplacements", replace)),
+                threading.Thread(target=worker, args=("événements", event)),
+                threading.Thread(target=worker, args=("lectures", read))]
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    print("  " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+    print(f"  {manager.snapshot().version} instantanés publiés\n")
+
+
+def _context_switches() -> int:
+    """Changements de contexte cumulés de tous les threads du processus."""
+    tasks = "/proc/self/task"
+    if os.path.isdir(tasks):
+        total = 0
+        for tid in os.listdir(tasks):
+            try:
+                with open(os.path.join(tasks, tid, "status")) as status:
+                    for line in status:
+                        if "ctxt_switches" in line:  # volontaires et involontaires
+                            total += int(line.split()[-1])
+            except OSError:
+                pass  # thread terminé entre-temps
+        return total
+    import psutil
+    switches = psutil.Process().num_ctx_switches()
+    return switches.voluntary + switches.involuntary
+
+
+def bench_core_loop(idle_seconds: float = 3.0, switches: int = 100):
+    """Réveils au repos et latence des switchs: threads dédiés (référence), puis boucle du cœur et ses couloirs."""
+    print(f"🔄 Boucle du cœur ({idle_seconds:.0f} s au repos, puis {switches} switchs; suivi des ressources à 1 Hz, "
+          f"priorités à 20 ms par appel)")
+    
+    def run(use_core: bool):
+        # Appels de priorité lents: ils ne doivent retarder ni les switchs ni la boucle
+        backend = FakeBackend(latency={"set_foreground_window": 0.001, "set_process_priority": 0.02})
+        manager = make_roster(backend, strategies=[AltKeyStrategy()])
+        dispatcher = SwitchDispatcher(manager)
+        scheduler = ProcessScheduler(backend, enabled=True)
+        memory = MemoryManager(backend, enabled=True)
+        resources = ResourceMonitor(backend, enabled=True)
+        watchdog = HookWatchdog(FakeHookSource(), budget_ms=300)
+        overlay = HeadlessOverlay()
+        overlay.root = FakeTkRoot()
+        overlay.root.after(0, overlay._drain_loop)
+        overlay.set_resources(resources)
+        
+        # Référence: l'organisation d'avant la boucle, un thread par composant
+        stop = threading.Event()
+        jobs = {"switch": queue.Queue(), "processes": queue.Queue()}
+        
+        def worker(jobs_queue: queue.Queue):
+            while True:
+                job = jobs_queue.get()
+                if job is None:
+                    return
+                job()
+        
+        def periodic(interval: float, tick):
+            while not stop.wait(interval):
+                tick()
+        
+        latest = deque(maxlen=1)  # seul le dernier état compte, comme dans ProcessScheduler
+        
+        def apply_latest():
+            if latest:
+                scheduler.apply(*latest.popleft())
+        
+        applied = []
+        
+        def on_roster_changed():
+            snapshot = manager.snapshot()
+            overlay.update_display(snapshot.names(), snapshot.current_index, snapshot.next_index(),
+                                   snapshot.turn_order.skipped, snapshot.hwnds())
+            clients = [(char.name, char.hwnd) for char in snapshot.characters]
+            current = snapshot.current()
+            if use_core:
+                scheduler.notify(clients, current.hwnd if current else 0)
+            else:
+                latest.append((clients, current.hwnd if current else 0))
+                jobs["processes"].put(apply_latest)
+            resources.set_roster([(window.hwnd, window.pid) for window in manager.registry.get_windows()])
+            applied.append(snapshot.current_index)
+        
+        switched = threading.Event()
+        
+        def on_switched():
+            on_roster_changed()
+            switched.set()
+        
+        tk_thread = threading.Thread(target=overlay.root.mainloop, daemon=True)
+        tk_thread.start()
+        core = None
+        threads = []
+        if use_core:
+            core = _core_loop(dispatcher, scheduler, memory, resources, watchdog)
+            dispatcher.on_switched = on_switched
+            memory.start()
+            resources.start()
+            watchdog.start()
+            submit_next = dispatcher.submit_next
+        else:
+            watchdog.hook_source.install()
+            threads = [threading.Thread(target=worker, args=(jobs_queue,), daemon=True) for jobs_queue in jobs.values()]
+            threads += [threading.Thread(target=periodic, args=args, daemon=True)
+                        for args in ((resources.interval, resources.tick), (memory.interval, memory.tick),
+                                     (watchdog.CHECK_INTERVAL, watchdog.check))]
+            for thread in threads:
+                thread.start()
+            submit_next = lambda: jobs["switch"].put(lambda: (manager.switch_by(1), on_switched()))
+        on_roster_changed()
+        time.sleep(0.3)
+        
+        # Repos: aucun switch, aucune fenêtre qui change
+        iterations = overlay.root.iterations
+        wakeups = core.wakeups if core else 0
+        switches_before = _context_switches()
+        time.sleep(idle_seconds)
+        context = (_context_switches() - switches_before) / idle_seconds
+        tk_rate = (overlay.root.iterations - iterations) / idle_seconds
+        core_rate = ((core.wakeups if core else 0) - wakeups) / idle_seconds
+        
+        # Activité: chaque switch est suivi du rendu et de l'application des priorités
+        samples = []
+        for _ in range(switches):
+            switched.clear()
+            start = time.perf_counter()
+            submit_next()
+            switched.wait(1.0)
+            samples.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert overlay.current_index == manager.current_index, "overlay en retard sur le dernier switch"
+        assert applied[-1] == manager.current_index
+        
+        blocked_ms = None
+        if core is not None:
+            # Sonde du hook et appels psutil bloqués: ni les switchs ni la boucle n'attendent
+            core.offload(HookWatchdog.LANE, time.sleep, 0.5)
+            core.offload(ProcessScheduler.LANE, time.sleep, 0.5)
+            time.sleep(0.01)
+            relayed = threading.Event()
+            switched.clear()
+            start = time.perf_counter()
+            core.call(relayed.set)
+            dispatcher.submit_next()
+            assert switched.wait(1.0) and relayed.wait(1.0)
+            blocked_ms = (time.perf_counter() - start) * 1000
+            assert blocked_ms < 100, f"switch retardé par un couloir bloqué ({blocked_ms:.0f} ms)"
+            
+            watchdog.stop()
+            resources.stop()
+            memory.stop()
+            scheduler.stop()
+            dispatcher.stop()
+            core.stop()
+        else:
+            stop.set()
+            for jobs_queue in jobs.values():
+                jobs_queue.put(None)
+            for thread in threads:
+                thread.join(1.0)
+        overlay.root.quit()
+        tk_thread.join(1.0)
+        return context, tk_rate, core_rate, samples, blocked_ms
+    
+    results = {}
+    for label, use_core in (("Threads dédiés", False), ("Boucle du cœur", True)):
+        context, tk_rate, core_rate, samples, blocked_ms = run(use_core)
+        results[use_core] = (context, _percentile(samples, 0.5))
+        print(f"  {label:15} {context:6.1f} changements de contexte/s au repos, "
+              f"Tk {tk_rate:5.1f} réveil(s)/s, boucle {core_rate:4.1f}/s | "
+              f"switch p50 {_percentile(samples, 0.5):5.2f} ms, p95 {_percentile(samples, 0.95):5.2f} ms")
+        if blocked_ms is not None:
+            print(f"  {'':15} couloirs du hook et de psutil bloqués 500 ms: switch et relais en {blocked_ms:.1f} ms")
+    assert results[True][0] < results[False][0]
+    assert results[True][1] < results[False][1] * 2 + 1.0
+    print("  ✓ Attentes bloquantes hors de la boucle; moins de réveils au repos que les threads dédiés\n")
+
+
+def bench_roster_index(repeat: int = 20000):
+    """Recherches indexées (position, nom, hwnd, PID), mutations incrémentales et chargement en bloc."""
+    print(f"🗂️ Roster indexé ({repeat} recherches par taille)")
+    for size in (32, 1000, 10000):
+        titles = [f"Perso{i} - {['Iop', 'Cra', 'Eniripsa', 'Sacrieur'][i % 4]} - 3.0" for i in range(size)]
+        backend = FakeBackend()
+        backend.populate_desktop(titles, other_processes=0)
+        detector = WindowDetector(backend)
+        registry = WindowRegistry(detector)
+        registry.seed()
+        windows = registry.get_windows()
+        source = WindowManager(detector)
+        source.attach_registry(registry)
+        source.set_characters([(f"Perso{i}", window.hwnd, i) for i, window in enumerate(windows)])
+        data = source.to_dict()
+        
+        # Chargement en bloc: rattachement par empreinte puis un seul tri et une passe d'index
+        manager = WindowManager(detector)
+        manager.attach_registry(registry)
+        start = time.perf_counter()
+        manager.from_dict(data)
+        load_ms = (time.perf_counter() - start) * 1000
+        assert not manager.unmatched_characters and len(manager.characters) == size
+        characters = list(manager.characters)
+        start = time.perf_counter()
+        roster = Roster(characters)
+        build_ms = (time.perf_counter() - start) * 1000
+        
+        rng = random.Random(size)
+        targets = [rng.choice(characters) for _ in range(repeat)]
+        names = [char.name.swapcase() for char in targets]
+        lookups = {
+            "position": lambda: [roster.by_position(char.position) for char in targets],
+            "nom": lambda: [roster.by_name(name) for name in names],
+            "hwnd": lambda: [roster.by_hwnd(char.hwnd) for char in targets],
+            "PID": lambda: [roster.by_pid(char.pid) for char in targets],
+        }
+        timings = []
+        for label, lookup in lookups.items():
+            found = lookup()
+            assert all(a is b for a, b in zip(found, targets)), label
+            timings.append(f"{label} {_timeit(lookup, 1) * 1000 / repeat:.2f}")
+        
+        # Ancienne recherche par nom: parcours linéaire avec .upper() à chaque appel
+        def linear(name):
+            upper = name.upper()
+            return next((char for char in characters if char.name.upper() == upper), None)
+        scans = targets[:max(1, repeat * 32 // size // 10)]
+        linear_us = _timeit(lambda: [linear(char.name) for char in scans], 1) * 1000 / len(scans)
+        
+        # Ajout un par un: insertion à sa place vs retri et index complets à chaque ajout
+        ops = min(size, 1000)
+        extra = [CharacterWindow(f"Extra{i}", 0, size + i) for i in range(ops)]
+        start = time.perf_counter()
+        grown = roster
+        for char in extra:
+            grown = grown.added(char)
+        add_us = (time.perf_counter() - start) * 1e6 / ops
+        start = time.perf_counter()
+        rebuilt = roster
+        for char in extra[:max(1, ops // 10)]:
+            rebuilt = Roster(rebuilt.characters + (char,))
+        rebuild_us = (time.perf_counter() - start) * 1e6 / max(1, ops // 10)
+        reference = Roster(grown.characters)
+        assert grown.index_by_name == reference.index_by_name and grown.index_by_pid == reference.index_by_pid
+        
+        # Suppression et renommage au milieu du roster: seules les entrées décalées sont réécrites
+        middle = size // 2
+        remove_us = _timeit(lambda: roster.removed(middle), 200) * 1000
+        rename_us = _timeit(lambda: roster.renamed(middle, "Renommé"), 200) * 1000
+        shrunk = roster.removed(middle)
+        assert shrunk.index_by_hwnd == Roster(shrunk.characters).index_by_hwnd
+        assert roster.renamed(middle, "Renommé").by_name("RENOMMÉ").position == middle
+        
+        print(f"  {size:5d} personnages: from_dict {load_ms:7.1f} ms (index {build_ms:5.2f} ms), "
+              f"recherche (µs) {', '.join(timings)}")
+        print(f"         nom par parcours linéaire {linear_us:8.2f} µs | ajout {add_us:6.1f} µs "
+              f"(retri complet {rebuild_us:7.1f} µs), suppression {remove_us:6.1f} µs, renommage {rename_us:6.1f} µs")
+    
+    record = CharacterWindow("Perso", 1, 0)
+    assert not hasattr(record, "__dict__") and not hasattr(windows[0], "__dict__")
+    print(f"  ✓ Index identiques à une reconstruction complète; enregistrements à __slots__ "
+          f"({sys.getsizeof(record)} octets par CharacterWindow)\n")
+
+
+BENCHMARKS = {
+    "detection": bench_detection,
+    "events": bench_events,
+    "warm_start": bench_warm_start,
+    "hook_dispatch": bench_hook_dispatch,
+    "turn_order": bench_turn_order,
+    "focus_strategies": bench_focus_strategies,
+    "focus_verification": bench_focus_verification,
+    "prefetch": bench_prefetch,
+    "hook_watchdog": bench_hook_watchdog,
+    "hotkey_table": bench_hotkey_table,
+    "hotkey_diff": bench_hotkey_diff,
+    "mouse_input": bench_mouse_input,
+    "large_roster": bench_large_roster,
+    "overlay_layout": bench_overlay_layout,
+    "overlay_diff": bench_overlay_diff,
+    "overlay_handoff": bench_overlay_handoff,
+    "thumbnails": bench_thumbnails,
+    "process_scheduler": bench_process_scheduler,
+    "memory_manager": bench_memory_manager,
+    "focus_mode": bench_focus_mode,
+    "resource_monitor": bench_resource_monitor,
+    "roster_stress": bench_roster_stress,
+    "core_loop": bench_core_loop,
+    "roster_index": bench_roster_index,
+}
+
+
+def main():
+    """Point d'entrée principal."""
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Mesure inconnue: {name} (disponibles: {', '.join(BENCHMARKS)})")
+            continue
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
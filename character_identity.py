@@ -0,0 +1,162 @@
+"""Identité stable des personnages pour retrouver leur fenêtre après un redémarrage."""
+from typing import Dict, List, Optional, Tuple
+
+from window_detector import WindowInfo, ProcessCache
+
+
+def parse_window_title(title: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extrait (nom du personnage, classe) depuis le titre d'une fenêtre DOFUS.
+    
+    Format attendu: "NomPerso - Classe - Version". Retourne (None, None) si le
+    titre ne suit pas ce format (écran de connexion par exemple).
+    """
+    parts = title.split(" - ")
+    if len(parts) >= 2:
+        return parts[0].strip() or None, parts[1].strip() or None
+    return None, None
+
+
+def extract_character_class(title: str, fallback: str) -> str:
+    """Retourne la classe lue dans le titre, ou `fallback` si le format n'est pas reconnu."""
+    _, character_class = parse_window_title(title)
+    return character_class or fallback
+
+
+class CharacterFingerprint:
+    """Empreinte d'un personnage: nom et classe lus dans le titre + processus."""
+    
+    __slots__ = ("character", "character_class", "pid", "create_time")
+    
+    def __init__(self, character: Optional[str] = None, character_class: Optional[str] = None,
+                 pid: int = 0, create_time: float = 0.0):
+        self.character = character
+        self.character_class = character_class
+        self.pid = pid
+        self.create_time = create_time
+    
+    @staticmethod
+    def from_window(window: WindowInfo, process_cache: Optional[ProcessCache] = None) -> 'CharacterFingerprint':
+        """Construit l'empreinte d'une fenêtre détectée."""
+        character, character_class = parse_window_title(window.title)
+        create_time = 0.0
+        if process_cache is not None:
+            entry = process_cache.get(window.pid)
+            if entry is not None:
+                create_time = entry[1]
+        return CharacterFingerprint(character, character_class, window.pid, create_time)
+    
+    def to_dict(self) -> Dict:
+        """Convertit en dictionnaire pour la sérialisation."""
+        return {
+            "character": self.character,
+            "class": self.character_class,
+            "pid": self.pid,
+            "create_time": self.create_time
+        }
+    
+    @staticmethod
+    def from_dict(data: Dict) -> 'CharacterFingerprint':
+        """Crée une instance depuis un dictionnaire."""
+        return CharacterFingerprint(
+            character=data.get("character"),
+            character_class=data.get("class"),
+            pid=data.get("pid", 0),
+            create_time=data.get("create_time", 0.0)
+        )
+    
+    def __repr__(self):
+        return f"CharacterFingerprint('{self.character}', '{self.character_class}', pid={self.pid})"
+
+
+class RebindReport:
+    """Résultat d'un rattachement des personnages aux fenêtres vivantes."""
+    
+    def __init__(self):
+        self.matched: Dict[int, int] = {}  # position → hwnd
+        self.unmatched: List[str] = []
+        self.ambiguous: List[str] = []
+    
+    @property
+    def complete(self) -> bool:
+        """Vrai si tous les personnages ont retrouvé une fenêtre sans ambiguïté."""
+        return not self.unmatched and not self.ambiguous
+
+
+class IdentityResolver:
+    """Associe des empreintes de personnages aux fenêtres DOFUS vivantes.
+    
+    Les fenêtres sont indexées une fois par processus (pid + date de création),
+    par nom de personnage et par classe; chaque résolution est une recherche
+    dans ces index, et une fenêtre attribuée n'est plus proposée ensuite.
+    """
+    
+    def __init__(self, windows: List[WindowInfo], process_cache: Optional[ProcessCache] = None):
+        self.fingerprints: Dict[int, CharacterFingerprint] = {}
+        self._by_process: Dict[Tuple[int, float], List[WindowInfo]] = {}
+        self._by_character: Dict[str, List[WindowInfo]] = {}
+        self._by_class: Dict[str, List[WindowInfo]] = {}
+        self._claimed: set = set()
+        
+        for window in windows:
+            fingerprint = CharacterFingerprint.from_window(window, process_cache)
+            self.fingerprints[window.hwnd] = fingerprint
+            self._by_process.setdefault((fingerprint.pid, fingerprint.create_time), []).append(window)
+            if fingerprint.character:
+                self._by_character.setdefault(fingerprint.character.casefold(), []).append(window)
+            if fingerprint.character_class:
+                self._by_class.setdefault(fingerprint.character_class.casefold(), []).append(window)
+    
+    def _take(self, candidates: Optional[List[WindowInfo]], unique: bool = True) -> Optional[WindowInfo]:
+        """Retourne le premier candidat libre (le seul si `unique`) et le réserve."""
+        if not candidates:
+            return None
+        free = [w for w in candidates if w.hwnd not in self._claimed]
+        if not free or (unique and len(free) > 1):
+            return None
+        self._claimed.add(free[0].hwnd)
+        return free[0]
+    
+    def _resolve_exact(self, fingerprint: Optional[CharacterFingerprint], label: str) -> Optional[WindowInfo]:
+        """Recherche par processus puis par nom de personnage."""
+        if fingerprint is None:
+            # Ancienne configuration: le nom saisi peut être le personnage lui-même
+            return self._take(self._by_character.get(label.casefold()))
+        if fingerprint.pid and fingerprint.create_time:
+            window = self._take(self._by_process.get((fingerprint.pid, fingerprint.create_time)))
+            if window is not None:
+                return window
+        if fingerprint.character:
+            return self._take(self._by_character.get(fingerprint.character.casefold()))
+        return None
+    
+    def _resolve_by_class(self, fingerprint: Optional[CharacterFingerprint], label: str) -> Tuple[Optional[WindowInfo], bool]:
+        """Recherche par classe (ou par `label` sans empreinte). Retourne (fenêtre, ambigu)."""
+        if fingerprint is not None and fingerprint.character_class:
+            class_key = fingerprint.character_class.casefold()
+        else:
+            class_key = label.casefold()
+        candidates = self._by_class.get(class_key)
+        window = self._take(candidates)
+        if window is not None:
+            return window, False
+        # Plusieurs fenêtres libres de la même classe: attribution dans l'ordre de détection
+        window = self._take(candidates, unique=False)
+        return window, window is not None
+    
+    def rebind(self, characters: List[Tuple[int, Optional[CharacterFingerprint], str]]) -> Dict[int, Tuple[Optional[WindowInfo], bool]]:
+        """Trouve la fenêtre de chaque personnage (position, empreinte, nom saisi).
+        
+        Les correspondances exactes (même processus, même nom de personnage) sont
+        résolues pour tous avant de se rabattre sur la classe, afin qu'un repli
+        ne prenne pas la fenêtre d'un autre personnage. Retourne, par position,
+        (fenêtre ou None, ambigu).
+        """
+        results: Dict[int, Tuple[Optional[WindowInfo], bool]] = {}
+        for position, fingerprint, label in characters:
+            window = self._resolve_exact(fingerprint, label)
+            if window is not None:
+                results[position] = (window, False)
+        for position, fingerprint, label in characters:
+            if position not in results:
+                results[position] = self._resolve_by_class(fingerprint, label)
+        return results
@@ -5,13 +5,17 @@ import subprocess
 import sys
 from typing import List, Callable, Optional, Dict
 from window_detector import WindowDetector, WindowInfo
+from window_registry import WindowRegistry
+from character_identity import CharacterFingerprint, extract_character_class, parse_window_title
+from hotkey_manager import HotkeyManager, position_binding
 
 
 class ConfigWindow:
     """Fenêtre de configuration pour assigner les personnages."""
     
-    def __init__(self, detector: WindowDetector, on_save: Callable, allow_launch: bool = True, current_hotkeys: Optional[Dict] = None, previous_config: Optional[Dict] = None):
+    def __init__(self, detector: WindowDetector, on_save: Callable, allow_launch: bool = True, current_hotkeys: Optional[Dict] = None, previous_config: Optional[Dict] = None, registry: Optional[WindowRegistry] = None):
         self.detector = detector
+        self.registry = registry
         self.on_save = on_save
         self.allow_launch = allow_launch
         self.current_hotkeys = current_hotkeys or {}
@@ -27,8 +31,11 @@ class ConfigWindow:
         
     def show(self):
         """Affiche la fenêtre de configuration."""
-        # Détecter les fenêtres DOFUS
-        self.windows = self.detector.detect_windows()
+        # Détecter les fenêtres DOFUS (le registre est déjà à jour si l'app tourne)
+        if self.registry is not None:
+            self.windows = self.registry.get_windows()
+        else:
+            self.windows = self.detector.detect_windows()
         
         if not self.windows:
             messagebox.showerror("Erreur", "Aucune fenêtre DOFUS détectée!\nLancez DOFUS d'abord.")
@@ -100,9 +107,9 @@ class ConfigWindow:
         self.position_combos = []
         self.name_entries = []
         
-        positions = [f"Position {i+1} (F{i+1})" for i in range(8)]
+        positions = [self._position_label(i) for i in range(len(self.windows))]
         
-        for i, window in enumerate(self.windows[:8]):  # Max 8 fenêtres
+        for i, window in enumerate(self.windows):
             frame = tk.Frame(scrollable_frame, bg="white", pady=5)
             frame.pack(fill=tk.X, padx=10, pady=5)
             
@@ -124,10 +131,9 @@ class ConfigWindow:
             pos_combo = ttk.Combobox(frame, values=positions, state="readonly", width=18)
             
             # Essayer de récupérer la position précédente pour ce personnage
-            char_name = self._extract_character_name(window.title)
-            prev_position = self._get_previous_position(char_name)
+            prev_position = self._get_previous_position(window)
             
-            if prev_position is not None:
+            if prev_position is not None and prev_position < len(positions):
                 # Utiliser la position précédente
                 pos_combo.current(prev_position)
             else:
@@ -288,19 +294,24 @@ class ConfigWindow:
     
     def _extract_character_name(self, title: str) -> str:
         """Extrait le nom de la classe depuis le titre de la fenêtre."""
-        # Format: "NomPerso - Classe - Version"
-        parts = title.split(" - ")
-        if len(parts) >= 2:
-            # Retourner la classe (2ème élément) au lieu du nom
-            return parts[1].strip()
-        return "Perso"
+        return extract_character_class(title, "Perso")
     
-    def _get_previous_position(self, character_name: str) -> Optional[int]:
+    def _get_previous_position(self, window: WindowInfo) -> Optional[int]:
         """Récupère la position précédente d'un personnage depuis la config."""
         if not self.previous_config:
             return None
         
         characters = self.previous_config.get("characters", [])
+        
+        # D'abord par nom de personnage (empreinte sauvegardée), fiable même avec deux classes identiques
+        character, _ = parse_window_title(window.title)
+        if character:
+            for char in characters:
+                identity = char.get("identity") or {}
+                if (identity.get("character") or "").lower() == character.lower():
+                    return char.get("position")
+        
+        character_name = self._extract_character_name(window.title)
         for char in characters:
             # Comparer les noms (ignorer la casse)
             if char.get("name", "").lower() == character_name.lower():
@@ -332,6 +343,17 @@ class ConfigWindow:
             traceback.print_exc()
             messagebox.showerror("Erreur", f"Impossible de lancer l'application:\n{e}")
     
+    def _position_label(self, position: int) -> str:
+        """Libellé d'une position avec son raccourci direct (ex: "Position 9 (SHIFT+F1)")."""
+        binding = position_binding(
+            position,
+            self.current_hotkeys.get("position_keys", HotkeyManager.DEFAULT_POSITION_KEYS),
+            self.current_hotkeys.get("page_modifiers", HotkeyManager.DEFAULT_PAGE_MODIFIERS)
+        )
+        if binding is None:
+            return f"Position {position + 1}"
+        return f"Position {position + 1} ({binding.upper()})"
+    
     def _save_config_internal(self) -> bool:
         """Sauvegarde la configuration (version interne sans message)."""
         # Vérifier les doublons de position
@@ -345,7 +367,7 @@ class ConfigWindow:
         
         # Créer la liste des personnages
         characters = []
-        for i, window in enumerate(self.windows[:8]):
+        for i, window in enumerate(self.windows):
             if i < len(self.position_combos):
                 position = self.position_combos[i].current()
                 name = self.name_entries[i].get().strip() or f"Perso{position+1}"
@@ -353,7 +375,8 @@ class ConfigWindow:
                 characters.append({
                     "name": name,
                     "hwnd": window.hwnd,
-                    "position": position
+                    "position": position,
+                    "identity": CharacterFingerprint.from_window(window, self.detector.process_cache).to_dict()
                 })
         
         # Récupérer les raccourcis personnalisés
@@ -63,7 +63,10 @@ class ConfigManager:
                 "next_key": "tab",
                 "previous_key": "shift+tab",
                 "toggle_overlay_key": "ctrl+alt+o",
-                "quit_key": "ctrl+alt+q"
+                "quit_key": "ctrl+alt+q",
+                "toggle_skip_key": "ctrl+alt+x",
+                "page_modifiers": ["", "shift"],
+                "page_key": ""
             },
             "overlay": {
                 "enabled": True,
@@ -72,15 +75,68 @@ class ConfigManager:
                 "width": 800,
                 "height": 60,
                 "opacity": 0.9,
-                "font_size": 14
+                "font_size": 14,
+                "max_fps": 30
+            },
+            "switching": {
+                "prefetch_next": False
+            },
+            "thumbnails": {
+                "enabled": False,
+                "width": 160,
+                "height": 90,
+                "captures_per_second": 8
+            },
+            "processes": {
+                "enabled": False,
+                "focused_priority": "above_normal",
+                "background_priority": "below_normal",
+                "default_cores": None,
+                "client_cores": {}
+            },
+            "memory": {
+                "enabled": False,
+                "interval_s": 60,
+                "client_interval_s": 300,
+                "max_trims_per_tick": 2,
+                "min_rss_mb": 200
+            },
+            "focus_mode": {
+                "enabled": False,
+                "method": "minimize",
+                "budget_ms": 4.0
+            },
+            "resources": {
+                "enabled": False,
+                "interval_s": 1.0,
+                "history": 120
             }
         }
     
-    def get_full_config(self, window_manager_dict: Dict, hotkeys_dict: Dict, overlay_dict: Dict) -> Dict:
+    def get_full_config(self, window_manager_dict: Dict, hotkeys_dict: Dict, overlay_dict: Dict,
+                        focus_dict: Optional[Dict] = None, switching_dict: Optional[Dict] = None,
+                        thumbnails_dict: Optional[Dict] = None, processes_dict: Optional[Dict] = None,
+                        memory_dict: Optional[Dict] = None, focus_mode_dict: Optional[Dict] = None,
+                        resources_dict: Optional[Dict] = None) -> Dict:
         """Crée un dictionnaire de configuration complet."""
-        return {
+        config = {
             "version": "0.1.0",
             "window_manager": window_manager_dict,
             "hotkeys": hotkeys_dict,
             "overlay": overlay_dict
         }
+        if focus_dict is not None:
+            config["focus"] = focus_dict
+        if switching_dict is not None:
+            config["switching"] = switching_dict
+        if thumbnails_dict is not None:
+            config["thumbnails"] = thumbnails_dict
+        if processes_dict is not None:
+            config["processes"] = processes_dict
+        if memory_dict is not None:
+            config["memory"] = memory_dict
+        if focus_mode_dict is not None:
+            config["focus_mode"] = focus_mode_dict
+        if resources_dict is not None:
+            config["resources"] = resources_dict
+        return config
@@ -1,5 +1,7 @@
 """Script pour lancer la fenêtre de configuration GUI."""
 from window_detector import WindowDetector
+from window_registry import WindowRegistry
+from detection_snapshot import DetectionSnapshot
 from config_gui import ConfigWindow
 from config_manager import ConfigManager
 
@@ -28,7 +30,10 @@ def save_configuration(characters, hotkeys=None):
             "previous_key": hotkeys.get("previous_key", "\\"),
             "toggle_overlay_key": "ctrl+alt+o",
             "open_config_key": "ctrl+alt+c",
-            "quit_key": "ctrl+alt+q"
+            "quit_key": "ctrl+alt+q",
+            "toggle_skip_key": "ctrl+alt+x",
+            "page_modifiers": ["", "shift"],
+            "page_key": ""
         },
         "overlay": {
             "enabled": True,
@@ -37,10 +42,20 @@ def save_configuration(characters, hotkeys=None):
             "width": 855,
             "height": 50,
             "opacity": 0.9,
-            "font_size": 14
+            "font_size": 14,
+            "max_fps": 30
         }
     }
     
+    # Conserver ce que l'application a appris sur cette machine et ses réglages
+    existing_config = config_manager.load() or {}
+    for section in ("focus", "switching", "thumbnails", "processes", "memory", "focus_mode", "resources"):
+        if section in existing_config:
+            config[section] = existing_config[section]
+    for key in ("page_modifiers", "page_key"):
+        if key in existing_config.get("hotkeys", {}):
+            config["hotkeys"][key] = existing_config["hotkeys"][key]
+    
     config_manager.save(config)
     print("✓ Configuration sauvegardée dans config.json")
 
@@ -52,6 +67,10 @@ def main():
     detector = WindowDetector()
     config_manager = ConfigManager()
     
+    # Démarrage à chaud: réutiliser la dernière détection si elle est toujours valide
+    registry = WindowRegistry(detector)
+    registry.seed(DetectionSnapshot().load_windows(detector))
+    
     # Charger la config existante pour récupérer les hotkeys ET l'ordre précédent
     existing_config = config_manager.load()
     current_hotkeys = existing_config.get("hotkeys", {}) if existing_config else {}
@@ -64,7 +83,8 @@ def main():
         detector, 
         save_configuration, 
         current_hotkeys=current_hotkeys,
-        previous_config=previous_window_config
+        previous_config=previous_window_config,
+        registry=registry
     )
     config_window.show()
 
@@ -0,0 +1,214 @@
+"""Boucle asyncio unique du cœur de l'application."""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Union
+
+
+Interval = Union[float, Callable[[], float]]
+
+
+class Periodic:
+    """Appel périodique planifié sur la boucle, annulable depuis n'importe quel thread.
+    
+    `interval` peut être une fonction: il est relu à chaque période, ce qui
+    applique un changement de configuration sans replanifier. Avec `lane`,
+    l'appel est confié à ce couloir; une période est sautée si le
+    précédent n'est pas terminé.
+    
+    Les échéances tombent sur les multiples de la période (horloge de la
+    boucle): deux minuteries dont les périodes sont multiples l'une de
+    l'autre se déclenchent au même instant, en un seul réveil de la boucle.
+    """
+    
+    def __init__(self, core: 'CoreLoop', interval: Interval, callback: Callable, lane: Optional[str] = None):
+        self.core = core
+        self.interval = interval
+        self.callback = callback
+        self.lane = lane
+        self.cancelled = False
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._future: Optional[Future] = None
+        self._cancelled: Future = Future()  # terminé quand la boucle a retiré la minuterie
+    
+    def _delay(self) -> float:
+        return self.interval() if callable(self.interval) else self.interval
+    
+    def _arm(self):
+        if not self.cancelled:
+            delay = self._delay()
+            # Multiple suivant de la période (arrondi: un déclenchement un peu en avance ne se répète pas)
+            when = (round(self.core.loop.time() / delay) + 1) * delay
+            self._handle = self.core.loop.call_at(when, self._fire)
+    
+    def _fire(self):
+        if self.lane is None:
+            self.core._run(self.callback)
+        elif self._future is None or self._future.done():
+            self.core.wakeups += 1
+            self._future = self.core.offload(self.lane, self.callback)
+        self._arm()
+    
+    def cancel(self):
+        self.cancelled = True
+        self.core.call(self._cancel)
+    
+    def join(self, timeout: Optional[float] = None):
+        """Attend la fin d'un appel en cours après `cancel` (sans effet depuis la boucle ou le couloir)."""
+        if not self.core.running or self.core.in_loop() or self.core.in_lane(self.lane):
+            return
+        done, _ = wait([self._cancelled], timeout)
+        future = self._future
+        if done and future is not None:
+            wait([future], timeout)
+    
+    def _cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._cancelled.done():
+            self._cancelled.set_result(None)
+
+
+class CoreLoop:
+    """Boucle asyncio unique, dans un thread dédié, qui exécute le cœur de l'application.
+    
+    La boucle ne porte que le travail court: relais des événements fenêtres,
+    minuteries, regroupement des demandes. Tout ce qui peut attendre un appel
+    système (switch et vérification du focus, sonde du hook clavier, appels
+    psutil, écriture de la configuration) est confié à un couloir
+    (`offload`): un thread par couloir, créé au premier appel, qui exécute
+    ses tâches dans l'ordre. Une attente dans un couloir ne retarde ni la
+    boucle ni les autres couloirs; les switchs ont le leur.
+    
+    Les bibliothèques liées à leur propre thread (hook clavier, hook
+    d'événements fenêtres, icône de la barre système, fenêtre de
+    configuration) n'entrent dans la boucle que par `call`, qui est
+    thread-safe. Au repos, la boucle dort jusqu'à la prochaine minuterie et
+    les couloirs attendent leur prochaine tâche: aucune attente active.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+        self._later: Dict[str, asyncio.TimerHandle] = {}
+        self._lanes: Dict[str, ThreadPoolExecutor] = {}
+        self._last: Dict[str, Future] = {}  # dernière tâche confiée à chaque couloir
+        self._lane_threads: Dict[int, str] = {}  # ident du thread → couloir
+        self._lanes_lock = threading.Lock()
+        self._closed = False
+        self.wakeups = 0  # réveils de la boucle (callbacks exécutés ou confiés à un couloir)
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """Lance la boucle (sans effet si elle tourne déjà)."""
+        if self.running:
+            return
+        self._closed = False
+        self._thread = threading.Thread(target=self._run_forever, name="core", daemon=True)
+        self._thread.start()
+    
+    def _run_forever(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def stop(self, timeout: float = 1.0):
+        """Arrête la boucle et attend la fin des tâches déjà confiées aux couloirs.
+        
+        Appelable depuis la boucle ou un couloir: ni la boucle ni le couloir
+        appelant ne sont alors attendus.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._thread = None
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        with self._lanes_lock:
+            self._closed = True
+            lanes = list(self._lanes.values())
+            pending = [future for lane, future in self._last.items() if not self.in_lane(lane)]
+            self._lanes.clear()
+            self._last.clear()
+        for executor in lanes:
+            executor.shutdown(wait=False)
+        if pending:
+            wait(pending, timeout)
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+    
+    def in_loop(self) -> bool:
+        """Vrai si l'appelant est le thread de la boucle."""
+        return self._thread is threading.current_thread()
+    
+    def in_lane(self, lane: Optional[str]) -> bool:
+        """Vrai si l'appelant est le thread du couloir `lane`."""
+        return lane is not None and self._lane_threads.get(threading.get_ident()) == lane
+    
+    def drain(self, lane: str, timeout: Optional[float] = None):
+        """Attend la fin des tâches déjà confiées au couloir `lane` (sans effet depuis ce couloir)."""
+        future = self._last.get(lane)
+        if future is not None and not self.in_lane(lane):
+            wait([future], timeout)
+    
+    def call(self, callback: Callable, *args):
+        """Exécute `callback(*args)` dans la boucle (appelable depuis n'importe quel thread)."""
+        self.loop.call_soon_threadsafe(self._run, callback, *args)
+    
+    def offload(self, lane: str, callback: Callable, *args) -> Future:
+        """Exécute `callback(*args)` dans le thread du couloir `lane` (appelable depuis n'importe quel thread)."""
+        with self._lanes_lock:
+            if self._closed:
+                # Boucle arrêtée: la tâche est abandonnée
+                future: Future = Future()
+                future.cancel()
+                return future
+            executor = self._lanes.get(lane)
+            if executor is None:
+                executor = self._lanes[lane] = ThreadPoolExecutor(1, thread_name_prefix=f"core-{lane}",
+                                                                  initializer=self._enter_lane, initargs=(lane,))
+            future = self._last[lane] = executor.submit(self._run_offloaded, callback, *args)
+            return future
+    
+    def _enter_lane(self, lane: str):
+        self._lane_threads[threading.get_ident()] = lane
+    
+    def every(self, interval: Interval, callback: Callable, lane: Optional[str] = None) -> Periodic:
+        """Exécute `callback` toutes les `interval` secondes (premier appel au multiple suivant de la période)."""
+        periodic = Periodic(self, interval, callback, lane)
+        self.loop.call_soon_threadsafe(periodic._arm)
+        return periodic
+    
+    def later(self, key: str, delay: float, callback: Callable, lane: Optional[str] = None):
+        """Exécute `callback` dans `delay` secondes; un nouvel appel avec la même clé remplace le précédent."""
+        self.loop.call_soon_threadsafe(self._schedule_later, key, delay, callback, lane)
+    
+    def _schedule_later(self, key: str, delay: float, callback: Callable, lane: Optional[str]):
+        handle = self._later.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        self._later[key] = self.loop.call_later(delay, self._run_later, key, callback, lane)
+    
+    def _run_later(self, key: str, callback: Callable, lane: Optional[str]):
+        self._later.pop(key, None)
+        if lane is None:
+            self._run(callback)
+        else:
+            self.wakeups += 1
+            self.offload(lane, callback)
+    
+    def _run(self, callback: Callable, *args):
+        self.wakeups += 1
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Erreur dans la boucle principale: {e}")
+    
+    @staticmethod
+    def _run_offloaded(callback: Callable, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Erreur dans un couloir de la boucle principale: {e}")
@@ -0,0 +1,94 @@
+"""Instantané persistant de la dernière détection pour des démarrages à chaud."""
+import json
+from pathlib import Path
+from typing import List, Optional
+
+from window_detector import WindowDetector, WindowInfo
+
+
+class DetectionSnapshot:
+    """Sauvegarde (pid, date de création, hwnd, titre) de chaque client DOFUS.
+    
+    Au démarrage, l'instantané est vérifié fenêtre par fenêtre; l'énumération
+    complète du bureau n'est relancée que s'il n'est plus valide.
+    """
+    
+    DEFAULT_SNAPSHOT_FILE = "detection_cache.json"
+    VERSION = 1
+    
+    def __init__(self, snapshot_file: Optional[str] = None):
+        self.snapshot_file = snapshot_file or self.DEFAULT_SNAPSHOT_FILE
+        self.snapshot_path = Path(self.snapshot_file)
+        self.last_load_was_warm = False
+    
+    def save(self, detector: WindowDetector, windows: List[WindowInfo]) -> bool:
+        """Sauvegarde les fenêtres détectées."""
+        clients = []
+        for window in windows:
+            entry = detector.process_cache.get(window.pid)
+            if entry is None:
+                continue
+            clients.append([window.pid, entry[1], window.hwnd, window.title])
+        try:
+            with open(self.snapshot_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.VERSION, "clients": clients}, f, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde de l'instantané de détection: {e}")
+            return False
+    
+    def load(self) -> Optional[List[list]]:
+        """Charge les entrées brutes de l'instantané."""
+        if not self.snapshot_path.exists():
+            return None
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return None
+        if data.get("version") != self.VERSION:
+            return None
+        return data.get("clients") or None
+    
+    def restore(self, detector: WindowDetector) -> Optional[List[WindowInfo]]:
+        """Retourne les fenêtres de l'instantané si elles sont toutes encore valides.
+        
+        Vérifications: l'ensemble des PID DOFUS est inchangé (un seul instantané
+        des processus), puis pour chaque fenêtre le handle existe, est visible,
+        appartient au même PID et ce processus a la même date de création.
+        """
+        clients = self.load()
+        if not clients:
+            return None
+        backend = detector.backend
+        names = set(detector.DOFUS_PROCESS_NAMES)
+        try:
+            live_pids = {pid for pid, name in backend.iter_processes() if name in names}
+            if live_pids != {client[0] for client in clients}:
+                return None
+            windows = []
+            for pid, create_time, hwnd, _title in clients:
+                if not backend.is_window(hwnd) or backend.get_window_pid(hwnd) != pid:
+                    return None
+                if backend.get_process_create_time(pid) != create_time:
+                    return None
+                if not backend.is_window_visible(hwnd):
+                    return None
+                windows.append(WindowInfo(hwnd, backend.get_window_text(hwnd), pid))
+        except Exception:
+            # Processus disparu, accès refusé, handle invalide...
+            return None
+        
+        for pid, create_time, _hwnd, _title in clients:
+            detector.process_cache.remember(pid, detector.DOFUS_PROCESS_NAMES[0], create_time)
+        detector.windows = windows
+        return windows
+    
+    def load_windows(self, detector: WindowDetector) -> List[WindowInfo]:
+        """Démarrage à chaud si possible, sinon détection complète puis sauvegarde."""
+        windows = self.restore(detector)
+        self.last_load_was_warm = windows is not None
+        if windows is None:
+            windows = detector.detect_windows()
+            self.save(detector, windows)
+        return windows
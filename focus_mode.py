@@ -0,0 +1,157 @@
+"""Mode focus: seuls le personnage actif et le suivant restent affichés."""
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Set, Tuple
+
+from win32_backend import SW_SHOWMINNOACTIVE, SW_SHOWNOACTIVATE
+
+
+class FocusMode:
+    """Minimise (ou masque via DWM) les clients qui ne jouent pas.
+    
+    Un client minimisé ou masqué cesse d'être rendu, ce qui libère CPU et
+    GPU pour le personnage actif. Après chaque switch, le client actif et le
+    suivant sont réaffichés (sans activation) et les autres masqués.
+    
+    Le coût par switch est plafonné à `budget_ms`: les opérations sont faites
+    dans l'ordre (réaffichages d'abord) tant que leur coût estimé tient dans
+    le budget, et le reste est terminé quand le thread de switch est au
+    repos (`run(limited=False)`). Le coût estimé d'une opération est celui
+    de la plus lente des `HISTORY` dernières (INITIAL_OP_MS avant toute
+    mesure); le réaffichage de la cible d'un saut direct (`reveal_target`)
+    est imputé au même budget.
+    """
+    
+    MINIMIZE = "minimize"
+    CLOAK = "cloak"
+    DEFAULT_BUDGET_MS = 4.0
+    HISTORY = 16
+    INITIAL_OP_MS = 2.0  # ShowWindow coûte 1 à 2 ms: estimation avant toute mesure
+    
+    def __init__(self, backend, method: str = MINIMIZE, budget_ms: float = DEFAULT_BUDGET_MS,
+                 enabled: bool = False, clock: Callable[[], float] = time.perf_counter):
+        self.backend = backend
+        self.clock = clock
+        self.method = method
+        self.budget_ms = budget_ms
+        self.enabled = enabled
+        self.hidden: Dict[int, str] = {}  # hwnd → méthode utilisée pour le masquer
+        self._pending: List[Tuple[bool, int]] = []  # (réafficher, hwnd)
+        # Dernières durées par type d'opération (réafficher: True, masquer: False)
+        self._op_ms: Dict[bool, Deque[float]] = {
+            show: deque([self.INITIAL_OP_MS], maxlen=self.HISTORY) for show in (True, False)
+        }
+        
+        # Statistiques: coût par switch et switchs dont une partie a été différée
+        self.costs: Deque[float] = deque(maxlen=200)
+        self.deferred = 0
+        self.errors = 0
+    
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+    
+    def reveal(self, hwnd: int) -> bool:
+        """Réaffiche (sans l'activer) une fenêtre masquée par le mode focus."""
+        method = self.hidden.pop(hwnd, None)
+        if method is None:
+            return False
+        try:
+            if method == self.CLOAK:
+                self.backend.cloak_window(hwnd, False)
+            else:
+                self.backend.show_window(hwnd, SW_SHOWNOACTIVATE)
+        except Exception:
+            self.errors += 1
+        return True
+    
+    def reveal_target(self, hwnd: int) -> float:
+        """Réaffiche la cible d'un switch avant son focus; retourne le coût (ms) à imputer au budget."""
+        if hwnd not in self.hidden:
+            return 0.0
+        start = self.clock()
+        self.reveal(hwnd)
+        op_ms = (self.clock() - start) * 1000
+        self._record(True, op_ms)
+        return op_ms
+    
+    def _record(self, show: bool, op_ms: float):
+        self._op_ms[show].append(op_ms)
+    
+    def estimate(self, show: bool) -> float:
+        """Coût prévu d'une opération: la plus lente des dernières mesurées."""
+        return max(self._op_ms[show])
+    
+    def _hide(self, hwnd: int):
+        try:
+            if self.method == self.CLOAK:
+                self.backend.cloak_window(hwnd, True)
+            else:
+                self.backend.show_window(hwnd, SW_SHOWMINNOACTIVE)
+            self.hidden[hwnd] = self.method
+        except Exception:
+            self.errors += 1
+    
+    def plan(self, hwnds: Iterable[int], keep: Set[int]):
+        """Prépare les opérations: réafficher `keep`, masquer les autres fenêtres de `hwnds`."""
+        if not self.enabled:
+            self._pending = []
+            return
+        shows = [(True, hwnd) for hwnd in keep if hwnd in self.hidden]
+        hides = [(False, hwnd) for hwnd in hwnds if hwnd and hwnd not in keep and hwnd not in self.hidden]
+        self._pending = shows + hides
+    
+    def run(self, limited: bool = True, spent_ms: float = 0.0) -> float:
+        """Exécute les opérations prévues, dans le budget si `limited`.
+        
+        `spent_ms` est la part du budget déjà consommée par ce switch
+        (`reveal_target`). Retourne la durée totale en millisecondes.
+        """
+        budget_ms = self.budget_ms if limited else None
+        start = self.clock()
+        elapsed = spent_ms
+        while self._pending:
+            show, hwnd = self._pending[0]
+            if budget_ms is not None and elapsed + self.estimate(show) > budget_ms:
+                break
+            self._pending.pop(0)
+            op_start = self.clock()
+            if show:
+                self.reveal(hwnd)
+            else:
+                self._hide(hwnd)
+            self._record(show, (self.clock() - op_start) * 1000)
+            elapsed = spent_ms + (self.clock() - start) * 1000
+        if limited:
+            self.costs.append(elapsed)
+            if self._pending:
+                self.deferred += 1
+        return elapsed
+    
+    def forget(self, hwnd: int):
+        """Oublie une fenêtre fermée."""
+        self.hidden.pop(hwnd, None)
+        self._pending = [op for op in self._pending if op[1] != hwnd]
+    
+    def restore_all(self):
+        """Réaffiche toutes les fenêtres masquées (désactivation, fermeture)."""
+        self._pending = []
+        for hwnd in list(self.hidden):
+            self.reveal(hwnd)
+    
+    def to_dict(self) -> Dict:
+        """Convertit la configuration en dictionnaire."""
+        return {
+            "enabled": self.enabled,
+            "method": self.method,
+            "budget_ms": self.budget_ms
+        }
+    
+    def from_dict(self, data: Dict):
+        """Charge la configuration depuis un dictionnaire."""
+        self.enabled = data.get("enabled", False)
+        method = data.get("method", self.MINIMIZE)
+        if method != self.method or not self.enabled:
+            self.restore_all()
+        self.method = method if method in (self.MINIMIZE, self.CLOAK) else self.MINIMIZE
+        self.budget_ms = data.get("budget_ms", self.DEFAULT_BUDGET_MS)
@@ -0,0 +1,317 @@
+"""Stratégies de mise au premier plan et sélection automatique de la meilleure."""
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from win32_backend import SW_MINIMIZE, SW_RESTORE, VK_MENU, KEYEVENTF_KEYUP
+
+
+class FocusStrategy:
+    """Méthode pour passer une fenêtre au premier plan.
+    
+    `apply` lève une exception si un appel échoue; le succès réel est vérifié
+    ensuite par le moteur en lisant la fenêtre au premier plan.
+    """
+    
+    name = "base"
+    
+    def apply(self, backend, hwnd: int):
+        raise NotImplementedError
+
+
+class AltKeyStrategy(FocusStrategy):
+    """Simule un appui sur Alt pour lever le verrou, puis SetForegroundWindow."""
+    
+    name = "alt_key"
+    
+    def apply(self, backend, hwnd: int):
+        backend.keybd_event(VK_MENU, 0)
+        try:
+            backend.set_foreground_window(hwnd)
+        finally:
+            backend.keybd_event(VK_MENU, KEYEVENTF_KEYUP)
+
+
+class AttachThreadInputStrategy(FocusStrategy):
+    """Attache notre file d'entrée à celle de la fenêtre active le temps du switch."""
+    
+    name = "attach_thread_input"
+    
+    def apply(self, backend, hwnd: int):
+        current_thread = backend.get_current_thread_id()
+        foreground_thread = backend.get_window_thread_id(backend.get_foreground_window())
+        attached = bool(foreground_thread) and foreground_thread != current_thread
+        if attached:
+            backend.attach_thread_input(current_thread, foreground_thread, True)
+        try:
+            backend.set_foreground_window(hwnd)
+            backend.bring_window_to_top(hwnd)
+        finally:
+            if attached:
+                backend.attach_thread_input(current_thread, foreground_thread, False)
+
+
+class SwitchToThisWindowStrategy(FocusStrategy):
+    """SwitchToThisWindow, l'appel utilisé par Alt+Tab."""
+    
+    name = "switch_to_this_window"
+    
+    def apply(self, backend, hwnd: int):
+        backend.switch_to_this_window(hwnd)
+
+
+class MinimizeRestoreStrategy(FocusStrategy):
+    """Minimise puis restaure la fenêtre: Windows active une fenêtre restaurée.
+    
+    Visible à l'écran (animation, client redessiné): le moteur ne l'utilise
+    qu'en dernier recours et seulement si `minimize_fallback` est activé.
+    """
+    
+    name = "minimize_restore"
+    
+    def apply(self, backend, hwnd: int):
+        backend.show_window(hwnd, SW_MINIMIZE)
+        backend.show_window(hwnd, SW_RESTORE)
+
+
+class StrategyStats:
+    """Taux de succès et latence (moyenne mobile exponentielle) d'une stratégie."""
+    
+    EMA_ALPHA = 0.2
+    
+    def __init__(self, attempts: int = 0, successes: int = 0, latency_ms: float = 0.0,
+                 errors: int = 0, last_error: Optional[str] = None):
+        self.attempts = attempts
+        self.successes = successes
+        self.latency_ms = latency_ms
+        self.errors = errors
+        self.last_error = last_error
+    
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.attempts if self.attempts else 0.0
+    
+    def record(self, success: bool, latency_ms: float):
+        self.attempts += 1
+        if success:
+            self.successes += 1
+            if self.successes == 1:
+                self.latency_ms = latency_ms
+            else:
+                self.latency_ms += self.EMA_ALPHA * (latency_ms - self.latency_ms)
+    
+    def to_dict(self) -> Dict:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "latency_ms": round(self.latency_ms, 3),
+            "errors": self.errors,
+            "last_error": self.last_error
+        }
+    
+    @staticmethod
+    def from_dict(data: Dict) -> 'StrategyStats':
+        return StrategyStats(
+            attempts=data.get("attempts", 0),
+            successes=data.get("successes", 0),
+            latency_ms=data.get("latency_ms", 0.0),
+            errors=data.get("errors", 0),
+            last_error=data.get("last_error")
+        )
+
+
+class FocusMetrics:
+    """Temps jusqu'au focus confirmé (du début du switch à la vérification)."""
+    
+    def __init__(self, history: int = 200):
+        self.samples: Deque[float] = deque(maxlen=history)
+        self.confirmed = 0
+        self.failed = 0
+    
+    def record_confirmed(self, latency_ms: float):
+        self.confirmed += 1
+        self.samples.append(latency_ms)
+    
+    def record_failed(self):
+        self.failed += 1
+    
+    def percentile(self, fraction: float) -> float:
+        """Retourne le percentile `fraction` (0-1) des derniers temps mesurés."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+    
+    def snapshot(self) -> Dict:
+        """Résumé des mesures (en millisecondes)."""
+        return {
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "mean_ms": sum(self.samples) / len(self.samples) if self.samples else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95)
+        }
+
+
+class FocusStrategyEngine:
+    """Essaie les stratégies dans l'ordre de préférence appris sur cette machine.
+    
+    Tant qu'une stratégie a moins de MIN_SAMPLES essais, elle passe en premier
+    (phase d'apprentissage). Ensuite, les stratégies fiables (taux de succès
+    ≥ RELIABILITY_THRESHOLD) sont classées par latence, puis les autres par
+    taux de succès. Une stratégie qui échoue laisse la place à la suivante dans
+    le même appel; les statistiques sont persistées via to_dict/from_dict.
+    Tous les EXPLORE_INTERVAL focus, la stratégie la moins essayée repasse en
+    tête une fois, pour qu'une mauvaise série initiale ne l'écarte pas à vie.
+    
+    `fallback` (MinimizeRestoreStrategy par défaut) ne fait pas partie du
+    classement: il n'est essayé qu'après l'échec de toutes les stratégies, et
+    seulement si `minimize_fallback` est activé. Sa vérification est alors
+    réservée à la fin du budget.
+    
+    Le changement de premier plan est asynchrone: après chaque stratégie, la
+    fenêtre active est relue jusqu'à `verify_timeout_ms`, à un intervalle qui
+    double jusqu'à MAX_POLL_INTERVAL. En cas d'échec, la stratégie suivante
+    est essayée après un délai qui double à chaque essai. L'ensemble (essais,
+    vérifications et délais) tient dans `focus_budget_ms`: une fois le budget
+    épuisé, le focus est déclaré en échec sans essayer les stratégies
+    restantes. Ces attentes doivent se faire hors du thread du hook clavier
+    (voir SwitchDispatcher).
+    """
+    
+    MIN_SAMPLES = 3
+    RELIABILITY_THRESHOLD = 0.9
+    EXPLORE_INTERVAL = 50
+    DEFAULT_VERIFY_TIMEOUT_MS = 100
+    DEFAULT_RETRY_BACKOFF_MS = 5
+    DEFAULT_FOCUS_BUDGET_MS = 250
+    POLL_INTERVAL = 0.002
+    MAX_POLL_INTERVAL = 0.016
+    # Statistiques plafonnées pour que le moteur s'adapte si la machine change
+    MAX_ATTEMPTS_MEMORY = 200
+    
+    def __init__(self, backend, strategies: Optional[List[FocusStrategy]] = None):
+        self.backend = backend
+        self.strategies: List[FocusStrategy] = strategies or [
+            AltKeyStrategy(),
+            AttachThreadInputStrategy(),
+            SwitchToThisWindowStrategy(),
+        ]
+        self.fallback: Optional[FocusStrategy] = MinimizeRestoreStrategy()
+        self.minimize_fallback = False
+        self.stats: Dict[str, StrategyStats] = {s.name: StrategyStats() for s in self.strategies}
+        self.stats[self.fallback.name] = StrategyStats()
+        self.last_strategy: Optional[str] = None
+        self.verify_timeout_ms = self.DEFAULT_VERIFY_TIMEOUT_MS
+        self.retry_backoff_ms = self.DEFAULT_RETRY_BACKOFF_MS
+        self.focus_budget_ms = self.DEFAULT_FOCUS_BUDGET_MS
+        self.metrics = FocusMetrics()
+        self._focus_count = 0
+    
+    def ranked(self) -> List[FocusStrategy]:
+        """Retourne les stratégies dans l'ordre où elles seront essayées."""
+        def key(strategy: FocusStrategy):
+            stats = self.stats[strategy.name]
+            if stats.attempts < self.MIN_SAMPLES:
+                return (0, stats.attempts, 0.0)
+            if stats.success_rate >= self.RELIABILITY_THRESHOLD:
+                return (1, 0, stats.latency_ms)
+            return (2, 0, -stats.success_rate)
+        return sorted(self.strategies, key=key)
+    
+    def preferred(self) -> Optional[str]:
+        """Nom de la stratégie actuellement préférée."""
+        ranked = self.ranked()
+        return ranked[0].name if ranked else None
+    
+    def _wait_for_foreground(self, hwnd: int, deadline: float) -> bool:
+        """Relit la fenêtre au premier plan jusqu'à confirmation ou échéance."""
+        backend = self.backend
+        interval = self.POLL_INTERVAL
+        while True:
+            if backend.get_foreground_window() == hwnd:
+                return True
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+    
+    def attempt(self, strategy: FocusStrategy, hwnd: int, deadline: Optional[float] = None) -> bool:
+        """Applique une stratégie, attend la confirmation (au plus jusqu'à `deadline`) et enregistre le résultat."""
+        stats = self.stats[strategy.name]
+        start = time.perf_counter()
+        verify_deadline = start + self.verify_timeout_ms / 1000
+        if deadline is not None:
+            verify_deadline = min(verify_deadline, deadline)
+        try:
+            strategy.apply(self.backend, hwnd)
+            success = self._wait_for_foreground(hwnd, verify_deadline)
+        except Exception as e:
+            success = False
+            stats.errors += 1
+            stats.last_error = str(e)
+        stats.record(success, (time.perf_counter() - start) * 1000)
+        if stats.attempts > self.MAX_ATTEMPTS_MEMORY:
+            stats.attempts //= 2
+            stats.successes //= 2
+        if success:
+            self.last_strategy = strategy.name
+        return success
+    
+    def focus(self, hwnd: int) -> bool:
+        """Met une fenêtre au premier plan et ne retourne True qu'une fois le focus confirmé."""
+        start = time.perf_counter()
+        deadline = start + self.focus_budget_ms / 1000
+        fallback = self.fallback if self.minimize_fallback else None
+        ranked_deadline = deadline - self.verify_timeout_ms / 1000 if fallback else deadline
+        try:
+            if not self.backend.is_window(hwnd):
+                self.metrics.record_failed()
+                return False
+        except Exception:
+            self.metrics.record_failed()
+            return False
+        ranked = self.ranked()
+        self._focus_count += 1
+        if self._focus_count % self.EXPLORE_INTERVAL == 0 and len(ranked) > 1:
+            explored = min(ranked[1:], key=lambda s: self.stats[s.name].attempts)
+            ranked.remove(explored)
+            ranked.insert(0, explored)
+        backoff = self.retry_backoff_ms / 1000
+        for i, strategy in enumerate(ranked):
+            if i and backoff:
+                if time.perf_counter() + backoff >= ranked_deadline:
+                    break
+                time.sleep(backoff)
+                backoff *= 2
+            if time.perf_counter() >= ranked_deadline:
+                break
+            if self.attempt(strategy, hwnd, ranked_deadline):
+                self.metrics.record_confirmed((time.perf_counter() - start) * 1000)
+                return True
+        if fallback and self.attempt(fallback, hwnd, deadline):
+            self.metrics.record_confirmed((time.perf_counter() - start) * 1000)
+            return True
+        self.metrics.record_failed()
+        return False
+    
+    def to_dict(self) -> Dict:
+        """Convertit les statistiques apprises en dictionnaire."""
+        return {
+            "verify_timeout_ms": self.verify_timeout_ms,
+            "retry_backoff_ms": self.retry_backoff_ms,
+            "focus_budget_ms": self.focus_budget_ms,
+            "minimize_fallback": self.minimize_fallback,
+            "strategies": {name: stats.to_dict() for name, stats in self.stats.items()}
+        }
+    
+    def from_dict(self, data: Dict):
+        """Recharge les réglages et les statistiques apprises."""
+        self.verify_timeout_ms = data.get("verify_timeout_ms", self.DEFAULT_VERIFY_TIMEOUT_MS)
+        self.retry_backoff_ms = data.get("retry_backoff_ms", self.DEFAULT_RETRY_BACKOFF_MS)
+        self.focus_budget_ms = data.get("focus_budget_ms", self.DEFAULT_FOCUS_BUDGET_MS)
+        self.minimize_fallback = data.get("minimize_fallback", False)
+        for name, stats in data.get("strategies", {}).items():
+            if name in self.stats:
+                self.stats[name] = StrategyStats.from_dict(stats)
@@ -0,0 +1,286 @@
+"""Surveillance du temps passé dans le hook clavier bas niveau.
+
+Windows retire silencieusement un hook bas niveau dont le callback dépasse
+LowLevelHooksTimeout: les raccourcis cessent alors de fonctionner sans
+aucune erreur. Ce module chronomètre chaque callback, déporte hors du thread
+du hook ceux qui s'approchent régulièrement de la limite, et réinstalle le
+hook s'il a disparu.
+"""
+import ctypes
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+import keyboard
+
+try:
+    import winreg
+except ImportError:  # Hors Windows: le délai par défaut s'applique
+    winreg = None
+
+
+VK_CANARY = 0x88  # Code de touche non attribué, utilisé pour sonder le hook
+KEYEVENTF_KEYUP = 0x0002
+
+
+def read_hook_timeout_ms(default: int) -> int:
+    """Lit LowLevelHooksTimeout dans le registre (HKCU\\Control Panel\\Desktop)."""
+    if winreg is None:
+        return default
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\Desktop") as key:
+            value, _ = winreg.QueryValueEx(key, "LowLevelHooksTimeout")
+            return int(value)
+    except (OSError, ValueError):
+        return default
+
+
+class HookStats:
+    """Durées mesurées pour un callback du hook."""
+    
+    def __init__(self):
+        self.calls = 0
+        self.overruns = 0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+        self.offloaded = False
+        self.offloaded_calls = 0
+        self.slow_streak = 0  # appels lents consécutifs dans le hook
+        self.fast_streak = 0  # appels rapides consécutifs une fois déporté
+    
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+    
+    def record(self, elapsed_ms: float, budget_ms: float):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if elapsed_ms >= budget_ms:
+            self.overruns += 1
+
+
+class KeyboardHookSource:
+    """Hook clavier réel (bibliothèque `keyboard`) vu par le chien de garde.
+    
+    Un hook d'observation note chaque événement reçu; l'heure de la dernière
+    entrée système (GetLastInputInfo) permet de voir si des touches ont été
+    frappées sans que le hook ne les reçoive.
+    """
+    
+    def __init__(self):
+        self.on_event: Callable = lambda: None
+        self._events = 0
+        self._observer = None
+    
+    def install(self):
+        """Installe le hook d'observation."""
+        self._observer = keyboard.hook(self._on_raw_event)
+    
+    def reinstall(self):
+        """Retire tous les hooks (`keyboard.unhook_all`) et réinstalle l'observateur.
+        
+        Les raccourcis sont ensuite réenregistrés par `on_hook_reinstalled`,
+        toujours via l'API publique de `keyboard`.
+        """
+        keyboard.unhook_all()
+        self._observer = None
+        self.install()
+    
+    def last_input_time(self) -> float:
+        """Heure (time.monotonic) de la dernière entrée clavier ou souris du système."""
+        if sys.platform != "win32":
+            return 0.0
+        
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+        
+        info = LASTINPUTINFO()
+        info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return 0.0
+        idle_ms = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+        return time.monotonic() - idle_ms / 1000
+    
+    def probe(self, timeout: float) -> bool:
+        """Injecte une touche témoin et vérifie que le hook la reçoit."""
+        if sys.platform != "win32":
+            return True
+        before = self._events
+        user32 = ctypes.windll.user32
+        user32.keybd_event(VK_CANARY, 0, 0, 0)
+        user32.keybd_event(VK_CANARY, 0, KEYEVENTF_KEYUP, 0)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._events != before:
+                return True
+            time.sleep(0.01)
+        return False
+    
+    def _on_raw_event(self, _event):
+        self._events += 1
+        self.on_event()
+
+
+class HookWatchdog:
+    """Chronomètre les callbacks du hook et le réinstalle s'il a été retiré.
+    
+    - chaque callback enveloppé par `wrap` est chronométré; au-delà du budget
+      (LowLevelHooksTimeout) c'est un dépassement;
+    - un callback qui consomme plus de OFFLOAD_FRACTION du budget OFFLOAD_STREAK
+      fois de suite est ensuite exécuté dans le couloir OFFLOAD_LANE: le hook
+      ne fait plus que le déposer. Après RECOVER_STREAK exécutions rapides
+      d'affilée, il revient dans le hook;
+    - `check` compare la dernière entrée système au dernier événement reçu par
+      le hook; si des touches ont été frappées depuis, une touche témoin est
+      injectée et, sans réponse, le hook est réinstallé puis
+      `on_hook_reinstalled` est appelé pour réenregistrer les raccourcis.
+    
+    La vérification périodique est planifiée par la boucle du cœur (`core`):
+    la comparaison se fait dans la boucle, et seule la sonde, qui attend la
+    touche témoin, passe dans le couloir `LANE`.
+    """
+    
+    # Valeur utilisée par Windows quand LowLevelHooksTimeout est absent
+    DEFAULT_BUDGET_MS = 300
+    OFFLOAD_FRACTION = 0.25
+    CHECK_INTERVAL = 2.0
+    # Écart toléré entre dernière entrée système et dernier événement du hook
+    INPUT_TOLERANCE = 1.0
+    PROBE_TIMEOUT = 0.5
+    LANE = "watchdog"
+    OFFLOAD_LANE = "hook_callbacks"
+    OFFLOAD_STREAK = 3
+    RECOVER_STREAK = 5
+    MIN_PROBE_INTERVAL = 10.0
+    
+    def __init__(self, hook_source=None, budget_ms: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.hook_source = hook_source if hook_source is not None else KeyboardHookSource()
+        self.hook_source.on_event = self.record_event
+        self.budget_ms = budget_ms if budget_ms is not None else read_hook_timeout_ms(self.DEFAULT_BUDGET_MS)
+        self.clock = clock
+        self.stats: Dict[str, HookStats] = {}
+        self.last_event = clock()
+        self.last_probe = float("-inf")
+        self.reinstalls = 0
+        
+        self.core = None
+        self._check_timer = None
+        
+        # Callback appelé après la réinstallation du hook (réenregistrer les raccourcis)
+        self.on_hook_reinstalled: Callable = lambda: None
+    
+    def start(self):
+        """Installe le hook d'observation et lance la vérification périodique."""
+        if self._check_timer is not None:
+            return
+        try:
+            self.hook_source.install()
+        except Exception as e:
+            print(f"⚠ Surveillance du hook clavier indisponible: {e}")
+            return
+        self.last_event = self.clock()
+        self._check_timer = self.core.every(self.CHECK_INTERVAL, self._tick)
+    
+    def stop(self, timeout: float = 1.0):
+        """Arrête la vérification périodique et attend la sonde et les raccourcis déportés en cours."""
+        timer = self._check_timer
+        if timer is not None:
+            self._check_timer = None
+            timer.cancel()
+            timer.join(timeout)
+            self.core.drain(self.LANE, timeout)
+        if self.core is not None:
+            self.core.drain(self.OFFLOAD_LANE, timeout)
+    
+    def record_event(self):
+        """Note qu'un événement a traversé le hook."""
+        self.last_event = self.clock()
+    
+    def wrap(self, name: str, callback: Callable) -> Callable:
+        """Retourne `callback` chronométré (et déporté tant qu'il reste trop lent)."""
+        stats = self.stats.setdefault(name, HookStats())
+        
+        def run(*args) -> float:
+            start = time.perf_counter()
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Erreur dans le raccourci {name}: {e}")
+            return (time.perf_counter() - start) * 1000
+        
+        def offloaded(*args):
+            # Dans le couloir: un callback redevenu rapide retourne dans le hook
+            if run(*args) < self.budget_ms * self.OFFLOAD_FRACTION:
+                stats.fast_streak += 1
+                if stats.fast_streak >= self.RECOVER_STREAK:
+                    stats.offloaded = False
+                    stats.fast_streak = 0
+                    print(f"✓ Raccourci {name} de nouveau rapide: exécuté dans le hook")
+            else:
+                stats.fast_streak = 0
+        
+        def guarded(*args):
+            self.record_event()
+            if stats.offloaded:
+                stats.offloaded_calls += 1
+                self.core.offload(self.OFFLOAD_LANE, offloaded, *args)
+                return
+            elapsed_ms = run(*args)
+            stats.record(elapsed_ms, self.budget_ms)
+            if elapsed_ms < self.budget_ms * self.OFFLOAD_FRACTION:
+                stats.slow_streak = 0
+                return
+            stats.slow_streak += 1
+            if stats.slow_streak >= self.OFFLOAD_STREAK:
+                stats.offloaded = True
+                stats.slow_streak = 0
+                print(f"⚠ Raccourci {name} trop lent ({elapsed_ms:.0f} ms): exécuté hors du hook désormais")
+        
+        return guarded
+    
+    def check(self) -> bool:
+        """Vérifie que le hook reçoit toujours les touches; le réinstalle sinon.
+        
+        Retourne True si le hook a été réinstallé.
+        """
+        if not self._probe_due():
+            return False
+        source = self.hook_source
+        self.last_probe = self.clock()
+        if source.probe(self.PROBE_TIMEOUT):
+            return False
+        
+        self.reinstalls += 1
+        print("⚠ Hook clavier retiré par Windows: réinstallation des raccourcis")
+        try:
+            source.reinstall()
+        except Exception as e:
+            print(f"Erreur lors de la réinstallation du hook clavier: {e}")
+            return False
+        self.record_event()
+        self.on_hook_reinstalled()
+        return True
+    
+    def _probe_due(self) -> bool:
+        """Vrai si une entrée récente n'a pas traversé le hook et qu'une sonde est permise."""
+        if self.hook_source.last_input_time() <= self.last_event + self.INPUT_TOLERANCE:
+            return False
+        # Entrée récente jamais vue par le hook (ou simple mouvement de souris)
+        return self.clock() - self.last_probe >= self.MIN_PROBE_INTERVAL
+    
+    def total_overruns(self) -> int:
+        """Nombre total de dépassements du budget."""
+        return sum(stats.overruns for stats in self.stats.values())
+    
+    def _tick(self):
+        # Dans la boucle: la comparaison ne coûte rien, la sonde attend dans le couloir
+        if self._probe_due():
+            self.core.offload(self.LANE, self._safe_check)
+    
+    def _safe_check(self):
+        try:
+            self.check()
+        except Exception as e:
+            print(f"Erreur lors de la vérification du hook clavier: {e}")
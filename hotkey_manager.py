@@ -1,11 +1,41 @@
 """Module pour gérer les raccourcis clavier globaux."""
 import keyboard
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional
 from window_manager import WindowManager
+from switch_dispatcher import SwitchDispatcher
+from hook_watchdog import HookWatchdog
+from hotkey_table import BindingDiff, HotkeyTable
+from mouse_input import MouseHookSource
+
+
+def layered_binding(modifier: str, key: str) -> str:
+    """Combine le modificateur d'une page et une touche de position ("shift" + "f1")."""
+    return f"{modifier}+{key}" if modifier else key
+
+
+def position_binding(position: int, position_keys: List[str], page_modifiers: List[str]) -> Optional[str]:
+    """Raccourci direct d'une position (page = position // nombre de touches), None si hors pages."""
+    if not position_keys:
+        return None
+    layer, slot = divmod(position, len(position_keys))
+    if layer >= len(page_modifiers):
+        return None
+    return layered_binding(page_modifiers[layer], position_keys[slot])
 
 
 class HotkeyManager:
-    """Gère les raccourcis clavier pour le switching de fenêtres."""
+    """Gère les raccourcis clavier et souris pour le switching de fenêtres.
+    
+    Une touche se note comme pour `keyboard` ("f1", "ctrl+alt+o") et un
+    bouton de souris avec le préfixe "mouse:" ("mouse:x1", "mouse:x2",
+    "mouse:middle", "mouse:tilt_left", "mouse:tilt_right"), modificateurs
+    compris ("ctrl+mouse:x1").
+    
+    Au-delà de len(position_keys) personnages, les positions sont réparties
+    en pages: chaque modificateur de `page_modifiers` adresse une page (F1,
+    shift+F1...), et la touche `page_key`, si définie, fait défiler la page
+    de départ (touche « leader »).
+    """
     
     DEFAULT_POSITION_KEYS = ['f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8']
     DEFAULT_NEXT_KEY = '`'  # Backtick/accent grave
@@ -13,15 +43,33 @@ class HotkeyManager:
     DEFAULT_TOGGLE_OVERLAY_KEY = 'ctrl+alt+o'
     DEFAULT_OPEN_CONFIG_KEY = 'ctrl+alt+c'
     DEFAULT_QUIT_KEY = 'ctrl+alt+q'
+    DEFAULT_TOGGLE_SKIP_KEY = 'ctrl+alt+x'
+    DEFAULT_PAGE_MODIFIERS = ['', 'shift']  # F1-F8 puis Shift+F1-F8
+    DEFAULT_PAGE_KEY = ''  # Touche « leader » de changement de page (désactivée)
     
-    def __init__(self, window_manager: WindowManager):
+    def __init__(self, window_manager: WindowManager, dispatcher: Optional[SwitchDispatcher] = None,
+                 watchdog: Optional[HookWatchdog] = None, keyboard_module=keyboard, mouse_module=None):
         self.window_manager = window_manager
+        self.keyboard = keyboard_module
+        # Les switchs sont exécutés hors du thread du hook clavier
+        self.dispatcher = dispatcher or SwitchDispatcher(window_manager)
+        # Chronomètre les callbacks et réinstalle le hook si Windows le retire
+        self.watchdog = watchdog or HookWatchdog()
+        self.watchdog.on_hook_reinstalled = self._on_hook_reinstalled
         self.registered_hotkeys: List[str] = []
+        # Un seul hook: chaque touche est une recherche dans la table compilée
+        self.table = HotkeyTable(self.keyboard.key_to_scan_codes)
+        self._hook = None
+        self._active: Dict[str, str] = {}  # touche → action actuellement compilée
+        # Boutons de souris dans la même table, hook installé seulement s'il sert
+        self.mouse = MouseHookSource(self.table.handle_mouse, mouse_module)
         
         # Callbacks personnalisables
         self.on_toggle_overlay: Callable = lambda: None
         self.on_open_config: Callable = lambda: None
         self.on_quit: Callable = lambda: None
+        self.on_skip_changed: Callable = lambda: None
+        self.on_page_changed: Callable = lambda: None
         
         # Configuration des touches
         self.position_keys = self.DEFAULT_POSITION_KEYS.copy()
@@ -30,74 +78,138 @@ class HotkeyManager:
         self.toggle_overlay_key = self.DEFAULT_TOGGLE_OVERLAY_KEY
         self.open_config_key = self.DEFAULT_OPEN_CONFIG_KEY
         self.quit_key = self.DEFAULT_QUIT_KEY
-        
+        self.toggle_skip_key = self.DEFAULT_TOGGLE_SKIP_KEY
+        self.page_modifiers = self.DEFAULT_PAGE_MODIFIERS.copy()
+        self.page_key = self.DEFAULT_PAGE_KEY
+        self.page = 0
+    
+    def _actions(self) -> Dict[str, Callable]:
+        """Associe chaque action à son callback."""
+        actions = {
+            "next": self._switch_to_next,
+            "previous": self._switch_to_previous,
+            # Passer/réintégrer le personnage actif (mort pendant le combat)
+            "toggle_skip": self._toggle_skip,
+            "toggle_overlay": self._toggle_overlay,
+            "open_config": self._open_config,
+            "quit": self._quit,
+        }
+        # Raccourcis de position, une couche par page (F1-F8, Shift+F1-F8...)
+        for layer in range(len(self.page_modifiers)):
+            for slot in range(len(self.position_keys)):
+                actions[f"position:{layer}:{slot}"] = lambda layer=layer, slot=slot: self._switch_to_slot(layer, slot)
+        if self.page_key:
+            actions["next_page"] = self._next_page
+        return actions
+    
+    def _bindings(self) -> Dict[str, str]:
+        """Associe chaque touche configurée à son action."""
+        bindings = {}
+        for layer, modifier in enumerate(self.page_modifiers):
+            for slot, key in enumerate(self.position_keys):
+                bindings[layered_binding(modifier, key)] = f"position:{layer}:{slot}"
+        if self.page_key:
+            bindings[self.page_key] = "next_page"
+        bindings[self.next_key] = "next"
+        bindings[self.previous_key] = "previous"
+        bindings[self.toggle_skip_key] = "toggle_skip"
+        bindings[self.toggle_overlay_key] = "toggle_overlay"
+        bindings[self.open_config_key] = "open_config"
+        bindings[self.quit_key] = "quit"
+        return bindings
+    
     def register_all(self):
-        """Enregistre tous les raccourcis clavier et souris."""
-        self.unregister_all()
-        
-        # Raccourcis pour chaque position (F1-F8)
-        for i, key in enumerate(self.position_keys):
+        """Installe le hook clavier (une seule fois) et applique les raccourcis configurés."""
+        self.watchdog.start()
+        if self._hook is None:
             try:
-                keyboard.add_hotkey(key, lambda pos=i: self._switch_to_position(pos))
-                self.registered_hotkeys.append(key)
+                self._hook = self.keyboard.hook(self.table.handle)
             except Exception as e:
-                print(f"Erreur lors de l'enregistrement de {key}: {e}")
-        
-        # Raccourci pour passer au suivant
-        try:
-            keyboard.add_hotkey(self.next_key, self._switch_to_next)
-            self.registered_hotkeys.append(self.next_key)
-        except Exception as e:
-            print(f"Erreur lors de l'enregistrement de {self.next_key}: {e}")
-        
-        # Raccourci pour passer au précédent
-        try:
-            keyboard.add_hotkey(self.previous_key, self._switch_to_previous)
-            self.registered_hotkeys.append(self.previous_key)
-        except Exception as e:
-            print(f"Erreur lors de l'enregistrement de {self.previous_key}: {e}")
-        
-        # Raccourci pour afficher/masquer l'overlay
-        try:
-            keyboard.add_hotkey(self.toggle_overlay_key, self._toggle_overlay)
-            self.registered_hotkeys.append(self.toggle_overlay_key)
-        except Exception as e:
-            print(f"Erreur lors de l'enregistrement de {self.toggle_overlay_key}: {e}")
-        
-        # Raccourci pour ouvrir la configuration
-        try:
-            keyboard.add_hotkey(self.open_config_key, self._open_config)
-            self.registered_hotkeys.append(self.open_config_key)
-        except Exception as e:
-            print(f"Erreur lors de l'enregistrement de {self.open_config_key}: {e}")
+                print(f"Erreur lors de l'installation du hook clavier: {e}")
+                return
+        self.apply_bindings()
+    
+    def apply_bindings(self) -> BindingDiff:
+        """Applique uniquement les différences avec les raccourcis actifs.
         
-        # Raccourci pour quitter
+        Les ajouts, retraits et réaffectations sont publiés d'un bloc dans la
+        table: les raccourcis inchangés restent actifs pendant la mise à jour.
+        """
+        desired = self._bindings()
+        diff = BindingDiff.between(self._active, desired)
+        # Les raccourcis en erreur sont retentés à chaque application
+        diff.added += [key for key in self.table.errors if key in desired and key not in diff.added]
+        if diff.empty:
+            return diff
+        actions = self._actions()
+        changed = {key: self.watchdog.wrap(key, actions[desired[key]]) for key in diff.added + diff.rebound}
+        self.table.update(changed, diff.removed)
+        for key, error in self.table.errors.items():
+            if key in changed:
+                print(f"Erreur lors de l'enregistrement de {key}: {error}")
+        self._active = {key: action for key, action in desired.items() if key not in self.table.errors}
+        self.registered_hotkeys = list(self._active)
+        self._sync_mouse_hook()
+        return diff
+    
+    def _sync_mouse_hook(self):
+        """Installe le hook souris si un raccourci l'utilise, le retire sinon."""
         try:
-            keyboard.add_hotkey(self.quit_key, self._quit)
-            self.registered_hotkeys.append(self.quit_key)
+            if self.table.uses_mouse():
+                self.mouse.start()
+            else:
+                self.mouse.stop()
         except Exception as e:
-            print(f"Erreur lors de l'enregistrement de {self.quit_key}: {e}")
+            print(f"Erreur lors de l'installation du hook souris: {e}")
     
     def unregister_all(self):
-        """Désenregistre tous les raccourcis clavier."""
-        for hotkey in self.registered_hotkeys:
+        """Retire le hook clavier et vide la table des raccourcis."""
+        if self._hook is not None:
             try:
-                keyboard.remove_hotkey(hotkey)
+                self.keyboard.unhook(self._hook)
             except Exception:
                 pass
+            self._hook = None
+        self.table.compile({})
+        self._active = {}
         self.registered_hotkeys.clear()
+        self._sync_mouse_hook()
+    
+    def _on_hook_reinstalled(self):
+        """Le hook a été recréé (unhook_all): réinstaller le nôtre avec la même table."""
+        self._hook = None
+        self.register_all()
     
     def _switch_to_position(self, position: int):
-        """Callback pour switcher vers une position."""
-        self.window_manager.switch_to_position(position)
+        """Callback pour switcher vers une position (dépose l'intention et rend la main)."""
+        self.dispatcher.submit_position(position)
+    
+    def _switch_to_slot(self, layer: int, slot: int):
+        """Callback d'une touche de position: page courante + couche du modificateur."""
+        self._switch_to_position((self.page + layer) * len(self.position_keys) + slot)
+    
+    def page_count(self) -> int:
+        """Nombre de pages nécessaires pour le roster actuel."""
+        size = len(self.position_keys) or 1
+        return max(1, -(-len(self.window_manager.characters) // size))
+    
+    def _next_page(self):
+        """Callback de la touche « leader »: passe à la page suivante."""
+        self.page = (self.page + 1) % self.page_count()
+        self.on_page_changed()
     
     def _switch_to_next(self):
         """Callback pour switcher vers le suivant."""
-        self.window_manager.switch_to_next()
+        self.dispatcher.submit_next()
     
     def _switch_to_previous(self):
         """Callback pour switcher vers le précédent."""
-        self.window_manager.switch_to_previous()
+        self.dispatcher.submit_previous()
+    
+    def _toggle_skip(self):
+        """Callback pour passer/réintégrer le personnage actif."""
+        self.window_manager.toggle_skip_current()
+        self.on_skip_changed()
     
     def _toggle_overlay(self):
         """Callback pour afficher/masquer l'overlay."""
@@ -112,11 +224,22 @@ class HotkeyManager:
         self.on_quit()
     
     def set_position_keys(self, keys: List[str]):
-        """Configure les touches pour les positions."""
-        if len(keys) >= 8:
-            self.position_keys = keys[:8]
+        """Configure les touches pour les positions (une page)."""
+        if keys:
+            self.position_keys = list(keys)
             self.register_all()
     
+    def set_page_modifiers(self, modifiers: List[str]):
+        """Configure les modificateurs des pages (le premier est en général vide)."""
+        self.page_modifiers = list(modifiers) or ['']
+        self.register_all()
+    
+    def set_page_key(self, key: str):
+        """Configure la touche « leader » de changement de page (vide pour désactiver)."""
+        self.page_key = key
+        self.page = 0
+        self.register_all()
+    
     def set_next_key(self, key: str):
         """Configure la touche pour passer au suivant."""
         self.next_key = key
@@ -137,6 +260,11 @@ class HotkeyManager:
         self.open_config_key = key
         self.register_all()
     
+    def set_toggle_skip_key(self, key: str):
+        """Configure la touche pour passer/réintégrer le personnage actif."""
+        self.toggle_skip_key = key
+        self.register_all()
+    
     def set_quit_key(self, key: str):
         """Configure la touche pour quitter."""
         self.quit_key = key
@@ -150,7 +278,10 @@ class HotkeyManager:
             "previous_key": self.previous_key,
             "toggle_overlay_key": self.toggle_overlay_key,
             "open_config_key": self.open_config_key,
-            "quit_key": self.quit_key
+            "quit_key": self.quit_key,
+            "toggle_skip_key": self.toggle_skip_key,
+            "page_modifiers": self.page_modifiers,
+            "page_key": self.page_key
         }
     
     def from_dict(self, data: Dict):
@@ -161,3 +292,6 @@ class HotkeyManager:
         self.toggle_overlay_key = data.get("toggle_overlay_key", self.DEFAULT_TOGGLE_OVERLAY_KEY)
         self.open_config_key = data.get("open_config_key", self.DEFAULT_OPEN_CONFIG_KEY)
         self.quit_key = data.get("quit_key", self.DEFAULT_QUIT_KEY)
+        self.toggle_skip_key = data.get("toggle_skip_key", self.DEFAULT_TOGGLE_SKIP_KEY)
+        self.page_modifiers = data.get("page_modifiers", self.DEFAULT_PAGE_MODIFIERS) or ['']
+        self.page_key = data.get("page_key", self.DEFAULT_PAGE_KEY)
@@ -0,0 +1,219 @@
+"""Table de raccourcis précompilée, distribuée par un seul hook clavier."""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import keyboard
+
+
+# Bits de l'état des modificateurs
+MOD_CTRL = 1
+MOD_SHIFT = 2
+MOD_ALT = 4
+MOD_WIN = 8
+
+# Boutons de souris: codes négatifs pour ne jamais croiser un scan code
+MOUSE_X1 = -1
+MOUSE_X2 = -2
+MOUSE_MIDDLE = -3
+MOUSE_TILT_LEFT = -4
+MOUSE_TILT_RIGHT = -5
+MOUSE_PREFIX = "mouse:"
+
+MOUSE_BUTTONS = {
+    "mouse:x1": MOUSE_X1,
+    "mouse:x2": MOUSE_X2,
+    "mouse:middle": MOUSE_MIDDLE,
+    "mouse:tilt_left": MOUSE_TILT_LEFT,
+    "mouse:tilt_right": MOUSE_TILT_RIGHT,
+}
+
+MODIFIER_NAMES = {
+    "ctrl": MOD_CTRL,
+    "control": MOD_CTRL,
+    "shift": MOD_SHIFT,
+    "alt": MOD_ALT,
+    "windows": MOD_WIN,
+    "win": MOD_WIN,
+    # Windows signale AltGr comme Ctrl+Alt
+    "alt gr": MOD_CTRL | MOD_ALT,
+}
+
+# Noms résolus pour suivre l'état de chaque modificateur
+MODIFIER_KEYS = {
+    MOD_CTRL: ("ctrl", "right ctrl"),
+    MOD_SHIFT: ("shift", "right shift"),
+    MOD_ALT: ("alt", "alt gr"),
+    MOD_WIN: ("windows", "right windows"),
+}
+
+
+def is_mouse_binding(binding: str) -> bool:
+    """Vrai si le raccourci utilise un bouton de souris (ex: "ctrl+mouse:x1")."""
+    return MOUSE_PREFIX in binding.lower()
+
+
+def split_binding(binding: str) -> List[str]:
+    """Découpe "ctrl+alt+o" en noms de touches (la touche « + » est acceptée)."""
+    names = []
+    for part in binding.replace("++", "+plus").split("+"):
+        part = part.strip().lower()
+        if part:
+            names.append("+" if part == "plus" else part)
+    return names
+
+
+class BindingDiff:
+    """Différence entre deux ensembles de raccourcis (touche → action)."""
+    
+    def __init__(self, added: List[str], removed: List[str], rebound: List[str]):
+        self.added = added
+        self.removed = removed
+        self.rebound = rebound
+    
+    @staticmethod
+    def between(old: Dict[str, str], new: Dict[str, str]) -> 'BindingDiff':
+        """Calcule les touches ajoutées, retirées et réaffectées à une autre action."""
+        return BindingDiff(
+            added=[key for key in new if key not in old],
+            removed=[key for key in old if key not in new],
+            rebound=[key for key in new if key in old and old[key] != new[key]]
+        )
+    
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.rebound)
+    
+    def __repr__(self):
+        return f"BindingDiff(added={self.added}, removed={self.removed}, rebound={self.rebound})"
+
+
+class HotkeyTable:
+    """Associe (scan code, état des modificateurs) → callback.
+    
+    Les boutons de souris ("mouse:x1", "ctrl+mouse:x2"...) partagent la même
+    table avec des codes négatifs: clavier et souris suivent le même chemin.
+    
+    Les noms de touches sont résolus une seule fois à la compilation avec la
+    disposition active (`é`, `&`... sur AZERTY); chaque événement ne coûte
+    ensuite qu'une recherche dans un dictionnaire, quel que soit le nombre de
+    raccourcis. La table compilée est remplacée d'un bloc, sans verrou: le
+    hook voit soit l'ancienne table, soit la nouvelle, jamais une table vide.
+    """
+    
+    def __init__(self, resolve: Callable[[str], Iterable[int]] = keyboard.key_to_scan_codes):
+        self.resolve = resolve
+        self.table: Dict[Tuple[int, int], Callable] = {}
+        self.errors: Dict[str, str] = {}
+        self._keys: Dict[str, List[Tuple[int, int]]] = {}  # raccourci → clés compilées
+        self._modifier_scan_codes: Dict[int, int] = {}
+        self._modifiers = 0
+        self._resolved: Dict[str, Tuple[int, ...]] = {}
+    
+    def _scan_codes(self, name: str) -> Tuple[int, ...]:
+        """Résout un nom de touche (mis en cache pour les recompilations)."""
+        codes = self._resolved.get(name)
+        if codes is None:
+            codes = tuple(self.resolve(name))
+            self._resolved[name] = codes
+        return codes
+    
+    def compile_binding(self, binding: str) -> List[Tuple[int, int]]:
+        """Retourne les clés (scan code, modificateurs) d'un raccourci.
+        
+        Lève ValueError si le raccourci n'a pas exactement une touche non
+        modificatrice ou si une touche est inconnue de la disposition.
+        """
+        mask = 0
+        keys = []
+        for name in split_binding(binding):
+            if name in MODIFIER_NAMES:
+                mask |= MODIFIER_NAMES[name]
+            else:
+                keys.append(name)
+        if len(keys) != 1:
+            raise ValueError(f"une seule touche non modificatrice attendue dans '{binding}'")
+        if keys[0].startswith(MOUSE_PREFIX):
+            if keys[0] not in MOUSE_BUTTONS:
+                raise ValueError(f"bouton de souris inconnu '{keys[0]}'")
+            return [(MOUSE_BUTTONS[keys[0]], mask)]
+        try:
+            codes = self._scan_codes(keys[0])
+        except Exception as e:
+            raise ValueError(f"touche inconnue '{keys[0]}': {e}")
+        if not codes:
+            raise ValueError(f"touche inconnue '{keys[0]}'")
+        return [(code, mask) for code in codes]
+    
+    def compile(self, bindings: Dict[str, Callable]) -> Dict[Tuple[int, int], Callable]:
+        """Compile tous les raccourcis et remplace la table active."""
+        self._keys = {}
+        self.errors = {}
+        return self.update(bindings, ())
+    
+    def update(self, added: Dict[str, Callable], removed: Iterable[str]) -> Dict[Tuple[int, int], Callable]:
+        """Retire puis (ré)ajoute des raccourcis et publie la nouvelle table d'un bloc.
+        
+        Un raccourci présent dans `added` et déjà compilé est simplement
+        réaffecté à son nouveau callback.
+        """
+        if not self._modifier_scan_codes:
+            self._modifier_scan_codes = self._compile_modifiers()
+        table = dict(self.table) if self._keys else {}
+        keys = dict(self._keys)
+        for binding in list(removed) + list(added):
+            for key in keys.pop(binding, ()):
+                table.pop(key, None)
+            self.errors.pop(binding, None)
+        for binding, callback in added.items():
+            try:
+                compiled = self.compile_binding(binding)
+            except ValueError as e:
+                self.errors[binding] = str(e)
+                continue
+            for key in compiled:
+                table[key] = callback
+            keys[binding] = compiled
+        self._keys = keys
+        self.table = table
+        return table
+    
+    def _compile_modifiers(self) -> Dict[int, int]:
+        scan_codes = {}
+        for bit, names in MODIFIER_KEYS.items():
+            for name in names:
+                try:
+                    for code in self._scan_codes(name):
+                        scan_codes[code] = bit
+                except Exception:
+                    pass
+        return scan_codes
+    
+    def handle(self, event) -> Optional[Callable]:
+        """Callback du hook: met à jour les modificateurs et déclenche le raccourci.
+        
+        Retourne le callback déclenché (None sinon).
+        """
+        scan_code = event.scan_code
+        bit = self._modifier_scan_codes.get(scan_code)
+        if bit is not None:
+            if event.event_type == "down":
+                self._modifiers |= bit
+            else:
+                self._modifiers &= ~bit
+            return None
+        if event.event_type != "down":
+            return None
+        callback = self.table.get((scan_code, self._modifiers))
+        if callback is not None:
+            callback()
+        return callback
+    
+    def handle_mouse(self, button: int) -> Optional[Callable]:
+        """Callback du hook souris: même recherche que pour une touche."""
+        callback = self.table.get((button, self._modifiers))
+        if callback is not None:
+            callback()
+        return callback
+    
+    def uses_mouse(self) -> bool:
+        """Vrai si au moins un raccourci compilé est un bouton de souris."""
+        return any(is_mouse_binding(binding) for binding in self._keys)
@@ -8,35 +8,89 @@ import pystray
 from pystray import MenuItem as item
 
 from window_detector import WindowDetector
+from window_registry import WindowRegistry, WindowChange, Win32EventSource
 from window_manager import WindowManager
 from hotkey_manager import HotkeyManager
+from switch_dispatcher import SwitchDispatcher
 from overlay import OverlayWindow
 from config_manager import ConfigManager
+from character_identity import extract_character_class
+from detection_snapshot import DetectionSnapshot
+from thumbnails import create_scheduler
+from process_scheduler import ProcessScheduler
+from memory_manager import MB, MemoryManager
+from resource_monitor import ResourceMonitor
+from core_loop import CoreLoop
 
 
 class DofusWindowSwitcher:
-    """Application principale pour le switching de fenêtres DOFUS."""
+    """Application principale pour le switching de fenêtres DOFUS.
+    
+    Le cœur est organisé autour d'une seule boucle asyncio (CoreLoop): elle
+    relaie les événements fenêtres et porte les minuteries. Les switchs, les
+    appels psutil (priorités, trims, mesures), la sonde du hook clavier et
+    la sauvegarde de la configuration s'exécutent dans ses couloirs, hors de
+    la boucle. Le hook clavier, le hook d'événements fenêtres, l'icône de la
+    barre système et la fenêtre de configuration gardent leur thread et
+    n'entrent dans la boucle que par `core.call`; Tk garde le thread principal,
+    où se déroule aussi la fermeture.
+    """
+    
+    SAVE_DELAY = 0.5  # sauvegardes rapprochées regroupées en une écriture
+    SAVE_LANE = "background"  # couloir du cœur partagé avec les appels psutil
     
     def __init__(self):
         # Composants principaux
         self.detector = WindowDetector()
+        self.registry = WindowRegistry(self.detector)
+        self.snapshot = DetectionSnapshot()
+        self.event_source = Win32EventSource(self.registry)
         self.window_manager = WindowManager(self.detector)
-        self.hotkey_manager = HotkeyManager(self.window_manager)
+        self.window_manager.attach_registry(self.registry)
+        self.dispatcher = SwitchDispatcher(self.window_manager)
+        self.hotkey_manager = HotkeyManager(self.window_manager, self.dispatcher)
         self.overlay = OverlayWindow()
+        self.process_scheduler = ProcessScheduler(self.detector.backend)
+        self.memory_manager = MemoryManager(self.detector.backend)
+        self.resources = ResourceMonitor(self.detector.backend)
         self.config_manager = ConfigManager()
         
+        # Boucle du cœur: remplace les threads dédiés et leurs attentes périodiques
+        self.core = CoreLoop()
+        for component in (self.dispatcher, self.process_scheduler, self.memory_manager, self.resources,
+                          self.hotkey_manager.watchdog, self.event_source):
+            component.core = self.core
+        
+        # Vignettes en direct des fenêtres (désactivées par défaut)
+        self.thumbnails = None
+        self.thumbnail_config = {"enabled": False}
+        
         # System tray
         self.tray_icon: Optional[pystray.Icon] = None
         self.running = False
         
         # Configurer les callbacks des hotkeys
         self.hotkey_manager.on_toggle_overlay = self._toggle_overlay
-        self.hotkey_manager.on_quit = self.quit
-        self.hotkey_manager.on_open_config = self._open_config
-        
+        self.hotkey_manager.on_quit = self.request_quit
+        self.hotkey_manager.on_open_config = lambda: self.core.call(self._open_config)
+        self.hotkey_manager.on_skip_changed = lambda: self.core.call(self._update_overlay)
+        self.hotkey_manager.on_page_changed = self._on_page_changed
+        
+        # Réagir aux fenêtres ouvertes/fermées/renommées sans re-scanner le bureau
+        self.window_manager.on_change = self._on_roster_changed
+        self.dispatcher.on_switched = self._on_roster_changed
+        self.registry.subscribe(self._on_window_change)
+    
     def initialize(self):
         """Initialise l'application."""
         print("🎮 DOFUS Window Switcher - Initialisation...")
+        self.core.start()
+        
+        # Démarrage à chaud via l'instantané de la dernière détection, sinon une
+        # seule énumération complète: le registre est ensuite tenu à jour par événements
+        self.registry.seed(self.snapshot.load_windows(self.detector))
+        if self.snapshot.last_load_was_warm:
+            print("✓ Fenêtres DOFUS restaurées depuis l'instantané")
         
         # Charger la configuration
         config = self.config_manager.load()
@@ -54,15 +108,17 @@ class DofusWindowSwitcher:
         # Enregistrer les hotkeys
         self.hotkey_manager.register_all()
         print("✓ Raccourcis clavier enregistrés")
+        self.dispatcher.submit_prefetch()
         
         # Mettre à jour l'overlay
-        self._update_overlay()
+        self._on_roster_changed()
         
         print("✓ Initialisation terminée")
         print("\nRaccourcis:")
-        print("  F1-F8      : Switch vers le personnage 1-8")
+        print("  F1-F8      : Switch vers le personnage 1-8 (Shift+F1-F8: 9-16)")
         print("  `          : Personnage suivant")
         print("  \\          : Personnage précédent")
+        print("  Ctrl+Alt+X : Passer/réintégrer le personnage actif")
         print("  Ctrl+Alt+O : Afficher/masquer l'overlay")
         print("  Ctrl+Alt+C : Modifier la configuration")
         print("  Ctrl+Alt+Q : Quitter")
@@ -70,7 +126,7 @@ class DofusWindowSwitcher:
     def _first_time_setup(self):
         """Configuration initiale au premier lancement."""
         print("\n🔍 Détection des fenêtres DOFUS...")
-        windows = self.detector.detect_windows()
+        windows = self.registry.get_windows()
         
         if not windows:
             print("⚠ Aucune fenêtre DOFUS détectée!")
@@ -80,29 +136,27 @@ class DofusWindowSwitcher:
         print(f"✓ {len(windows)} fenêtre(s) DOFUS détectée(s)")
         
         # Créer une configuration par défaut avec les fenêtres détectées
-        for i, window in enumerate(windows[:8]):  # Max 8 fenêtres
+        for i, window in enumerate(windows):
             # Extraire le nom de classe depuis le titre de la fenêtre
-            char_name = self._extract_character_class(window.title, i+1)
+            char_name = extract_character_class(window.title, f"PERSO{i+1}")
             self.window_manager.add_character(char_name, window.hwnd, i)
             print(f"  [{i+1}] {window.title} → {char_name}")
         
         print("\n💡 Pour personnaliser les noms, utilisez Ctrl+Alt+C ou lancez configure.py")
     
-    def _extract_character_class(self, title: str, fallback_number: int) -> str:
-        """Extrait le nom de la classe depuis le titre de la fenêtre DOFUS."""
-        # Format attendu: "NomPerso - Classe - Version"
-        parts = title.split(" - ")
-        if len(parts) >= 2:
-            # Retourner la classe (2ème élément)
-            return parts[1].strip()
-        # Fallback si le format n'est pas reconnu
-        return f"PERSO{fallback_number}"
+    def _on_window_change(self, change: WindowChange):
+        """Callback du registre pour les fenêtres DOFUS hors configuration."""
+        if change.kind == WindowChange.ADDED:
+            print(f"🪟 Nouvelle fenêtre DOFUS: {change.window.title}")
+        elif change.kind == WindowChange.REMOVED:
+            print(f"🪟 Fenêtre DOFUS fermée: {change.window.title}")
     
     def _load_config(self, config: dict):
         """Charge la configuration depuis un dictionnaire."""
         # Charger la configuration du window manager
         if "window_manager" in config:
             self.window_manager.from_dict(config["window_manager"])
+            self._report_rebind()
         
         # Charger la configuration des hotkeys
         if "hotkeys" in config:
@@ -111,34 +165,139 @@ class DofusWindowSwitcher:
         # Charger la configuration de l'overlay
         if "overlay" in config:
             self.overlay.from_dict(config["overlay"])
+        
+        # Recharger les performances mesurées des stratégies de focus
+        if "focus" in config:
+            self.detector.focus_engine.from_dict(config["focus"])
+        
+        # Préchargement optionnel de la fenêtre du prochain personnage
+        if "switching" in config:
+            self.dispatcher.from_dict(config["switching"])
+        
+        # Priorité CPU et affinité des clients
+        if "processes" in config:
+            self.process_scheduler.from_dict(config["processes"])
+        
+        # Mode focus: seuls l'actif et le suivant restent affichés
+        if "focus_mode" in config:
+            self.window_manager.focus_mode.from_dict(config["focus_mode"])
+        
+        # Réduction mémoire des clients en arrière-plan
+        if "memory" in config:
+            self.memory_manager.from_dict(config["memory"])
+            if self.memory_manager.enabled:
+                self.memory_manager.start()
+            else:
+                self.memory_manager.stop()
+        
+        # Badges CPU/RAM de chaque client dans l'overlay
+        if "resources" in config:
+            self.resources.from_dict(config["resources"])
+            if self.resources.enabled:
+                self.resources.start()
+                self.overlay.set_resources(self.resources)
+            else:
+                self.resources.stop()
+                self.overlay.set_resources(None)
+        
+        # Vignettes en direct dans l'overlay
+        if "thumbnails" in config:
+            self._configure_thumbnails(config["thumbnails"])
+    
+    def _configure_thumbnails(self, config: dict):
+        """(Re)crée le planificateur de vignettes selon la section « thumbnails »."""
+        if self.thumbnails:
+            self.thumbnails.stop()
+        self.thumbnail_config = dict(config)
+        self.thumbnails = create_scheduler(config)
+        self.overlay.set_thumbnails(self.thumbnails)
+        if self.thumbnails:
+            self.thumbnails.start()
+            print(f"✓ Vignettes activées ({self.thumbnails.captures_per_second} captures/s)")
+    
+    def _report_rebind(self):
+        """Affiche le résultat du rattachement des personnages à leurs fenêtres."""
+        report = self.window_manager.last_rebind
+        if report is None:
+            return
+        print(f"✓ {len(report.matched)} personnage(s) rattaché(s) à leur fenêtre")
+        for name in report.ambiguous:
+            print(f"  ⚠ {name}: plusieurs fenêtres de la même classe, vérifiez l'ordre (Ctrl+Alt+C)")
+        for name in report.unmatched:
+            print(f"  ⚠ {name}: aucune fenêtre trouvée (rattachement automatique à son ouverture)")
     
     def _save_config(self):
         """Sauvegarde la configuration actuelle."""
         config = self.config_manager.get_full_config(
             self.window_manager.to_dict(),
             self.hotkey_manager.to_dict(),
-            self.overlay.to_dict()
+            self.overlay.to_dict(),
+            self.detector.focus_engine.to_dict(),
+            self.dispatcher.to_dict(),
+            self.thumbnails.to_dict() if self.thumbnails else self.thumbnail_config,
+            self.process_scheduler.to_dict(),
+            self.memory_manager.to_dict(),
+            self.window_manager.focus_mode.to_dict(),
+            self.resources.to_dict()
         )
         self.config_manager.save(config)
     
+    def _on_page_changed(self):
+        """Callback de la touche « leader »: affiche la page active."""
+        hotkeys = self.hotkey_manager
+        first = hotkeys.page * len(hotkeys.position_keys) + 1
+        print(f"📄 Page {hotkeys.page + 1}/{hotkeys.page_count()} (personnages {first}+)")
+    
+    def _on_roster_changed(self):
+        """Switch effectué ou fenêtres modifiées: overlay et priorités des clients."""
+        self._update_overlay()
+        self._update_processes()
+    
+    def _update_processes(self):
+        """Transmet les personnages actif et suivant aux gestionnaires de processus (sans attendre)."""
+        snapshot = self.window_manager.snapshot()
+        clients = [(char.name, char.hwnd) for char in snapshot.characters]
+        current = snapshot.current()
+        next_char = snapshot.next_character()
+        current_hwnd = current.hwnd if current else 0
+        self.process_scheduler.notify(clients, current_hwnd)
+        self.memory_manager.set_roster(clients, current_hwnd, next_char.hwnd if next_char else 0)
+        pids = {window.hwnd: window.pid for window in self.registry.get_windows()}
+        self.resources.set_roster([(hwnd, pids.get(hwnd, 0)) for _, hwnd in clients])
+    
     def _update_overlay(self):
         """Met à jour l'affichage de l'overlay."""
         if not self.overlay.root:
             return
         
-        char_list = self.window_manager.get_character_list()
-        current_char = self.window_manager.get_current_character()
-        next_char = self.window_manager.get_next_character()
+        # Un seul instantané: noms, curseur et fenêtres toujours cohérents entre eux
+        snapshot = self.window_manager.snapshot()
+        char_list = snapshot.names()
+        current_index = snapshot.current_index
+        next_index = snapshot.next_index()
+        skipped = snapshot.turn_order.skipped
+        hwnds = snapshot.hwnds()
         
-        current_index = self.window_manager.current_index
-        next_index = (current_index + 1) % len(char_list) if char_list else 0
+        if self.thumbnails:
+            current_hwnd = hwnds[current_index] if 0 <= current_index < len(hwnds) else 0
+            next_hwnd = hwnds[next_index] if 0 <= next_index < len(hwnds) else 0
+            self.thumbnails.set_roster(hwnds, current_hwnd, next_hwnd)
         
-        self.overlay.update_display(char_list, current_index, next_index)
+        self.overlay.update_display(char_list, current_index, next_index, skipped, hwnds)
+    
+    def _clear_skips(self):
+        """Réintègre tous les personnages passés (fin de combat)."""
+        self.window_manager.clear_skips()
+        self._update_overlay()
     
     def _toggle_overlay(self):
         """Affiche/masque l'overlay."""
         self.overlay.toggle()
-        self._save_config()
+        self._request_save()
+    
+    def _request_save(self):
+        """Demande une sauvegarde, regroupée avec celles qui suivent de près (écriture hors de la boucle)."""
+        self.core.later("save_config", self.SAVE_DELAY, self._save_config, self.SAVE_LANE)
     
     def reload_config(self):
         """Recharge la configuration depuis le fichier sans redémarrer l'app."""
@@ -158,14 +317,10 @@ class DofusWindowSwitcher:
         
         def on_save(characters, hotkeys):
             """Callback appelé quand la config est sauvegardée."""
-            # Mettre à jour le window_manager avec les nouveaux personnages
-            self.window_manager.characters.clear()
-            for char in characters:
-                self.window_manager.add_character(
-                    char["name"],
-                    char["hwnd"],
-                    char["position"]
-                )
+            # Remplacer le roster d'un bloc: les autres threads voient l'ancien ou le nouveau
+            self.window_manager.set_characters([
+                (char["name"], char["hwnd"], char["position"]) for char in characters
+            ])
             
             # Mettre à jour les raccourcis clavier
             if hotkeys.get("next_key"):
@@ -176,11 +331,11 @@ class DofusWindowSwitcher:
             # Ré-enregistrer les hotkeys avec les nouvelles touches
             self.hotkey_manager.register_all()
             
-            # Sauvegarder la configuration
-            self._save_config()
+            # Sauvegarder la configuration (écriture regroupée, hors de la boucle)
+            self._request_save()
             
-            # Recharger pour mettre à jour l'overlay
-            self.reload_config()
+            # Nouveau roster: overlay et priorités des clients (déjà rattaché et enregistré ci-dessus)
+            self._on_roster_changed()
             
             print(f"✓ Raccourcis mis à jour: Suivant='{hotkeys.get('next_key')}', Précédent='{hotkeys.get('previous_key')}'")
         
@@ -192,7 +347,8 @@ class DofusWindowSwitcher:
         def show_config():
             config_window = ConfigWindow(
                 self.detector, 
-                on_save, 
+                lambda characters, hotkeys: self.core.call(on_save, characters, hotkeys), 
+                registry=self.registry,
                 allow_launch=False, 
                 current_hotkeys=current_hotkeys,
                 previous_config=previous_window_config
@@ -212,12 +368,13 @@ class DofusWindowSwitcher:
         menu = pystray.Menu(
             item('DOFUS Window Switcher', lambda: None, enabled=False),
             item('---', lambda: None),
-            item('Modifier la configuration', lambda: self._open_config()),
+            item('Modifier la configuration', lambda: self.core.call(self._open_config)),
+            item('Réintégrer les personnages passés', lambda: self.core.call(self._clear_skips)),
             item('---', lambda: None),
             item('Afficher overlay', lambda: self.overlay.show()),
             item('Masquer overlay', lambda: self.overlay.hide()),
             item('---', lambda: None),
-            item('Quitter', lambda: self.quit())
+            item('Quitter', self.request_quit)
         )
         
         self.tray_icon = pystray.Icon("dofus_switcher", image, "DOFUS Window Switcher", menu)
@@ -236,15 +393,11 @@ class DofusWindowSwitcher:
         tray_thread = threading.Thread(target=self._run_tray_icon, daemon=True)
         tray_thread.start()
         
-        # Boucle de mise à jour périodique
-        def update_loop():
-            while self.running:
-                # Mettre à jour l'overlay toutes les secondes
-                self._update_overlay()
-                time.sleep(1)
-        
-        update_thread = threading.Thread(target=update_loop, daemon=True)
-        update_thread.start()
+        # Suivre l'ouverture/fermeture des fenêtres DOFUS
+        try:
+            self.event_source.start()
+        except Exception as e:
+            print(f"⚠ Suivi des fenêtres indisponible: {e}")
         
         # Lancer la boucle principale de l'overlay (bloquant)
         try:
@@ -257,25 +410,98 @@ class DofusWindowSwitcher:
                 print("Appuyez sur Ctrl+Alt+Q pour quitter\n")
                 while self.running:
                     time.sleep(0.5)
+                self.quit()
         except KeyboardInterrupt:
             self.quit()
         except Exception as e:
             print(f"Erreur overlay: {e}")
             self.quit()
     
+    def request_quit(self):
+        """Demande la fermeture (appelable depuis n'importe quel thread): elle se déroule dans le thread Tk."""
+        if self.overlay.root:
+            self.overlay.post(self.quit)
+        else:
+            # Sans overlay, la boucle d'attente de `run` se termine et appelle quit
+            self.running = False
+    
     def quit(self):
-        """Quitte l'application proprement."""
+        """Quitte l'application proprement (thread Tk: les arrêts attendent la boucle et ses couloirs)."""
         self.running = False
         
+        # Désenregistrer les hotkeys
+        try:
+            self.hotkey_manager.unregister_all()
+        except:
+            pass
+        
+        # Arrêter la surveillance du hook clavier
+        try:
+            self.hotkey_manager.watchdog.stop()
+            overruns = self.hotkey_manager.watchdog.total_overruns()
+            if overruns:
+                print(f"⚠ {overruns} dépassement(s) du délai du hook clavier")
+        except:
+            pass
+        
+        # Plus de changement de priorité après ceux déjà en cours
+        try:
+            self.process_scheduler.stop()
+        except:
+            pass
+        
+        # Arrêter la réduction mémoire
+        self.memory_manager.stop()
+        if self.memory_manager.total_saved:
+            print(f"🧹 {self.memory_manager.total_saved // MB} Mo libérés sur les clients en arrière-plan")
+        
+        # Arrêter la mesure des ressources
+        self.resources.stop()
+        
+        # Arrêter les captures de vignettes
+        if self.thumbnails:
+            self.thumbnails.stop()
+        
+        # Abandonner les switchs en attente
+        try:
+            self.dispatcher.stop()
+            metrics = self.detector.focus_engine.metrics.snapshot()
+            if metrics["confirmed"]:
+                print(f"⏱️ Focus confirmé en {metrics['p50_ms']:.1f} ms (p50), "
+                      f"{metrics['p95_ms']:.1f} ms (p95), {metrics['failed']} échec(s)")
+        except:
+            pass
+        
+        # Retirer les hooks d'événements fenêtres
+        try:
+            self.event_source.stop()
+        except:
+            pass
+        
+        # Arrêter la boucle du cœur (attend la fin des tâches de ses couloirs)
+        self.core.stop()
+        
         # Sauvegarder la configuration
         try:
             self._save_config()
         except:
             pass
         
-        # Désenregistrer les hotkeys
+        # Mémoriser les fenêtres pour le prochain démarrage
         try:
-            self.hotkey_manager.unregister_all()
+            self.snapshot.save(self.detector, self.registry.get_windows())
+        except:
+            pass
+        
+        # Rendre aux clients leur priorité et leurs cœurs d'origine
+        try:
+            self.process_scheduler.restore()
+        except:
+            pass
+        
+        # Réafficher les clients masqués par le mode focus
+        try:
+            self.window_manager.focus_mode.restore_all()
         except:
             pass
         
@@ -0,0 +1,171 @@
+"""Réduction du working set des clients DOFUS qui attendent leur tour."""
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+import psutil
+
+
+MB = 1024 * 1024
+
+
+class TrimRecord:
+    """Mémoire résidente d'un client avant et après un trim."""
+    
+    def __init__(self, name: str, pid: int, before: int, after: int, time: float):
+        self.name = name
+        self.pid = pid
+        self.before = before
+        self.after = after
+        self.time = time
+    
+    @property
+    def saved(self) -> int:
+        return max(0, self.before - self.after)
+    
+    def __repr__(self):
+        return f"TrimRecord('{self.name}', pid={self.pid}, {self.before // MB} → {self.after // MB} Mo)"
+
+
+class MemoryManager:
+    """Demande périodiquement aux clients en arrière-plan de réduire leur working set.
+    
+    Le personnage actif et le suivant ne sont jamais touchés: leurs pages
+    seraient relues au switch. Le rythme est limité à trois niveaux: une
+    passe toutes les `interval` secondes, au plus `max_trims_per_tick` trims
+    par passe, et pas deux trims du même client en moins de
+    `client_interval` secondes. Un client sous `min_rss_mb` est ignoré.
+    
+    Les passes sont planifiées par la boucle du cœur (`core`) et exécutées
+    dans son couloir `LANE`: un trim ne bloque jamais la boucle.
+    """
+    
+    DEFAULT_INTERVAL = 60.0
+    DEFAULT_CLIENT_INTERVAL = 300.0
+    DEFAULT_MAX_TRIMS_PER_TICK = 2
+    DEFAULT_MIN_RSS_MB = 200
+    HISTORY = 200
+    LANE = "background"
+    
+    def __init__(self, backend, enabled: bool = False, clock: Callable[[], float] = time.monotonic):
+        self.backend = backend
+        self.enabled = enabled
+        self.clock = clock
+        self.interval = self.DEFAULT_INTERVAL
+        self.client_interval = self.DEFAULT_CLIENT_INTERVAL
+        self.max_trims_per_tick = self.DEFAULT_MAX_TRIMS_PER_TICK
+        self.min_rss_mb = self.DEFAULT_MIN_RSS_MB
+        
+        self.records: Deque[TrimRecord] = deque(maxlen=self.HISTORY)
+        self.total_saved = 0
+        self.saved_by_client: Dict[str, int] = {}
+        self.errors = 0
+        self._roster: Tuple[Tuple[Tuple[str, int], ...], int, int] = ((), 0, 0)
+        self._pids: Dict[int, int] = {}  # hwnd → pid
+        self._last_trim: Dict[int, float] = {}
+        self.core = None
+        self._timer = None
+    
+    def set_roster(self, clients: List[Tuple[str, int]], current_hwnd: int, next_hwnd: int):
+        """Personnages (nom, hwnd), actif et suivant (appelable depuis n'importe quel thread)."""
+        self._roster = (tuple(clients), current_hwnd, next_hwnd)
+    
+    def _pid(self, hwnd: int) -> int:
+        pid = self._pids.get(hwnd)
+        if pid is None:
+            try:
+                pid = self.backend.get_window_pid(hwnd)
+            except Exception:
+                pid = 0
+            if pid:
+                self._pids[hwnd] = pid
+        return pid or 0
+    
+    def candidates(self, now: float) -> List[Tuple[str, int]]:
+        """Clients (nom, pid) pouvant être réduits maintenant, du plus ancien trim au plus récent."""
+        clients, current_hwnd, next_hwnd = self._roster
+        exempt = {self._pid(current_hwnd), self._pid(next_hwnd)}
+        result = []
+        seen = set()
+        for name, hwnd in clients:
+            pid = self._pid(hwnd)
+            if not pid or pid in exempt or pid in seen:
+                continue
+            seen.add(pid)
+            last = self._last_trim.get(pid)
+            if last is not None and now - last < self.client_interval:
+                continue
+            result.append((name, pid))
+        result.sort(key=lambda client: self._last_trim.get(client[1], float("-inf")))
+        return result
+    
+    def tick(self) -> List[TrimRecord]:
+        """Une passe: réduit au plus `max_trims_per_tick` clients éligibles."""
+        now = self.clock()
+        known = {hwnd for _, hwnd in self._roster[0]}
+        for hwnd in [h for h in self._pids if h not in known]:
+            del self._pids[hwnd]
+        
+        trimmed = []
+        for name, pid in self.candidates(now):
+            if len(trimmed) >= self.max_trims_per_tick:
+                break
+            try:
+                before = self.backend.get_process_rss(pid)
+                if before < self.min_rss_mb * MB:
+                    continue
+                self.backend.trim_working_set(pid)
+                after = self.backend.get_process_rss(pid)
+            except psutil.NoSuchProcess:
+                self._last_trim.pop(pid, None)
+                continue
+            except Exception:
+                # Accès refusé...: attendre le délai normal avant de réessayer
+                self.errors += 1
+                self._last_trim[pid] = now
+                continue
+            self._last_trim[pid] = now
+            record = TrimRecord(name, pid, before, after, now)
+            self.records.append(record)
+            self.total_saved += record.saved
+            self.saved_by_client[name] = self.saved_by_client.get(name, 0) + record.saved
+            trimmed.append(record)
+        return trimmed
+    
+    def start(self):
+        """Lance les passes périodiques (sans effet si désactivé ou déjà lancé)."""
+        if not self.enabled or self._timer is not None:
+            return
+        self._timer = self.core.every(lambda: self.interval, self._safe_tick, self.LANE)
+    
+    def stop(self, timeout: float = 1.0):
+        """Arrête les passes périodiques (attend la fin d'une passe en cours)."""
+        timer = self._timer
+        if timer is not None:
+            self._timer = None
+            timer.cancel()
+            timer.join(timeout)
+    
+    def _safe_tick(self):
+        try:
+            self.tick()
+        except Exception as e:
+            print(f"Erreur lors de la réduction mémoire: {e}")
+    
+    def to_dict(self) -> Dict:
+        """Convertit la configuration en dictionnaire."""
+        return {
+            "enabled": self.enabled,
+            "interval_s": self.interval,
+            "client_interval_s": self.client_interval,
+            "max_trims_per_tick": self.max_trims_per_tick,
+            "min_rss_mb": self.min_rss_mb
+        }
+    
+    def from_dict(self, data: Dict):
+        """Charge la configuration depuis un dictionnaire."""
+        self.enabled = data.get("enabled", False)
+        self.interval = data.get("interval_s", self.DEFAULT_INTERVAL)
+        self.client_interval = data.get("client_interval_s", self.DEFAULT_CLIENT_INTERVAL)
+        self.max_trims_per_tick = data.get("max_trims_per_tick", self.DEFAULT_MAX_TRIMS_PER_TICK)
+        self.min_rss_mb = data.get("min_rss_mb", self.DEFAULT_MIN_RSS_MB)
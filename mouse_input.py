@@ -0,0 +1,66 @@
+"""Boutons de souris (x1/x2, molette, inclinaison) pour les raccourcis."""
+import threading
+from typing import Callable
+
+from hotkey_table import MOUSE_X1, MOUSE_X2, MOUSE_MIDDLE, MOUSE_TILT_LEFT, MOUSE_TILT_RIGHT
+
+
+# Messages du hook souris bas niveau
+WM_MOUSEMOVE = 0x0200
+WM_MBUTTONDOWN = 0x0207
+WM_XBUTTONDOWN = 0x020B
+WM_MOUSEHWHEEL = 0x020E
+XBUTTON1 = 0x0001
+
+
+class MouseHookSource:
+    """Un seul hook souris (pynput) dont le filtre traite directement les boutons utiles.
+    
+    Le filtre win32 est appelé pour chaque message, y compris les mouvements:
+    il se limite donc à une comparaison d'entier et retourne toujours False,
+    ce qui évite à pynput de convertir l'événement et d'appeler ses callbacks.
+    Les boutons reconnus sont transmis à `on_button` avec leur code de table.
+    """
+    
+    def __init__(self, on_button: Callable[[int], None], mouse_module=None):
+        self.on_button = on_button
+        self.mouse_module = mouse_module
+        self._listener = None
+        self._lock = threading.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+    
+    def start(self):
+        """Installe le hook souris (sans effet s'il l'est déjà)."""
+        with self._lock:
+            if self._listener is not None:
+                return
+            mouse = self.mouse_module
+            if mouse is None:
+                from pynput import mouse
+            self._listener = mouse.Listener(win32_event_filter=self.filter)
+            self._listener.start()
+    
+    def stop(self):
+        """Retire le hook souris."""
+        with self._lock:
+            if self._listener is None:
+                return
+            self._listener.stop()
+            self._listener = None
+    
+    def filter(self, msg: int, data) -> bool:
+        """Filtre du hook: `data` est la structure MSLLHOOKSTRUCT."""
+        if msg == WM_MOUSEMOVE:
+            return False
+        if msg == WM_XBUTTONDOWN:
+            self.on_button(MOUSE_X1 if (data.mouseData >> 16) == XBUTTON1 else MOUSE_X2)
+        elif msg == WM_MBUTTONDOWN:
+            self.on_button(MOUSE_MIDDLE)
+        elif msg == WM_MOUSEHWHEEL:
+            # Mot haut signé: négatif vers la gauche
+            delta = (data.mouseData >> 16) & 0xFFFF
+            self.on_button(MOUSE_TILT_LEFT if delta & 0x8000 else MOUSE_TILT_RIGHT)
+        return False
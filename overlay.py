@@ -1,11 +1,61 @@
 """Module pour l'overlay visuel affichant l'ordre des personnages."""
 import tkinter as tk
-from typing import List, Optional
-import threading
+from collections import deque
+from typing import Callable, Deque, Iterable, List, Optional, Set, Tuple
+
+from overlay_layout import (ARROW, LABEL_BORDER, LABEL_PADX, LABEL_PADY, CachedFontMetrics,
+                            EstimatedFontMetrics, OverlayLayout, TkFontMetrics, compute_layout)
+from resource_monitor import BADGE_TEMPLATE, format_badge
+from thumbnails import thumbnail_to_ppm
+
+
+class LatestValueSlot:
+    """Boîte à une place partagée entre threads: seule la dernière valeur compte.
+    
+    `put` et `take` reposent sur un deque(maxlen=1), dont append et popleft
+    sont atomiques: aucun verrou, et un producteur ne bloque jamais.
+    """
+    
+    def __init__(self):
+        self._slot: Deque = deque(maxlen=1)
+    
+    def put(self, value):
+        """Dépose une valeur (remplace celle qui n'a pas encore été lue)."""
+        self._slot.append(value)
+    
+    def take(self):
+        """Retire la dernière valeur déposée, ou None si rien de nouveau."""
+        try:
+            value = self._slot.popleft()
+        except IndexError:
+            return None
+        return value
 
 
 class OverlayWindow:
-    """Fenêtre overlay transparente affichant l'ordre des personnages."""
+    """Fenêtre overlay transparente affichant l'ordre des personnages.
+    
+    `update_display` peut être appelé depuis n'importe quel thread: l'état est
+    déposé dans un LatestValueSlot que le thread Tk relève au plus `max_fps`
+    fois par seconde. Une rafale de mises à jour ne donne qu'un rendu. Sans
+    mise à jour, le relevé ralentit jusqu'à IDLE_POLL_MS. Les autres
+    réglages (affichage, position, opacité...) sont eux aussi mis en file et
+    appliqués par le thread Tk, jamais directement depuis l'appelant.
+    
+    Les personnages qui ne tiennent pas sur la largeur de l'écran passent à
+    la ligne: l'overlay grandit en hauteur au lieu d'être tronqué. La mise en
+    page est calculée par overlay_layout à partir des vraies métriques de la
+    police; les widgets sont simplement placés aux positions obtenues.
+    """
+    
+    FONT_FAMILY = "Arial"
+    FRAME_PADDING = 20  # padding du main_frame (10px de chaque côté)
+    MIN_WIDTH = 200
+    DEFAULT_MAX_FPS = 30
+    IDLE_POLL_MS = 200  # relevé au repos: retard maximal d'un switch après une longue pause
+    DEFAULT_SCREEN_WIDTH = 1920  # avant la création de la fenêtre
+    LABEL_CLASS = tk.Label
+    PHOTO_CLASS = tk.PhotoImage
     
     def __init__(self):
         self.root: Optional[tk.Tk] = None
@@ -15,27 +65,59 @@ class OverlayWindow:
         self.position_x = 100
         self.position_y = 100
         self.width = 855  # Augmenté de 800 à 1100 pour voir tous les noms
-        self.height = 50
+        self.height = 50  # hauteur minimale de la fenêtre
+        self._displayed_height = self.height
         self.opacity = 0.9
         self.font_size = 14
+        self.max_fps = self.DEFAULT_MAX_FPS
         
         # Données d'affichage
         self.characters: List[str] = []
         self.current_index = 0
         self.next_index = 0
+        self.skipped: Set[int] = set()
+        self.hwnds: List[int] = []
+        
+        # Vignettes en direct (optionnelles): planificateur de thumbnails.py
+        self.thumbnails = None
+        self._photos: List[Optional[tk.PhotoImage]] = []
+        self._rendered_thumbnails: List[Optional[Tuple[int, int]]] = []
+        self._thumbnail_version = -1
         
-        # Widgets
+        # Badges CPU/RAM (optionnels): ResourceMonitor de resource_monitor.py
+        self.resources = None
+        self._resources_version = -1
+        
+        # Widgets persistants, mis à jour par différence avec le dernier rendu
         self.labels: List[tk.Label] = []
         self.arrows: List[tk.Label] = []
+        self._rendered_label_geometry: List[Optional[Tuple[int, int, int, int]]] = []
+        self._rendered_arrow_geometry: List[Optional[Tuple[int, int, int, int]]] = []
+        self._rendered_layout: Optional[OverlayLayout] = None
+        self._rendered_styles: List[Optional[Tuple[str, str, str, str]]] = []
+        self._rendered_state = None
+        self.widget_ops = 0
+        self.last_update_ops = 0
         
-        # Thread-safe update flag
-        self._update_pending = False
+        # Mise en page calculée hors de Tk; métriques réelles dès que la fenêtre existe
+        self.metrics = CachedFontMetrics(EstimatedFontMetrics())
+        self.layout = OverlayLayout()
+        self._layout_key = None
         
+        # Dernier état déposé par les autres threads, relevé par le thread Tk
+        self._pending = LatestValueSlot()
+        # Opérations Tk demandées par les autres threads (append/popleft atomiques)
+        self._commands: Deque[Callable] = deque()
+        self._poll_ms = self.IDLE_POLL_MS
+        self.renders = 0
+    
     def create_window(self):
         """Crée la fenêtre overlay."""
         try:
             self.root = tk.Tk()
             self.root.title("DOFUS Window Switcher")
+            self.metrics = CachedFontMetrics(TkFontMetrics(self.root))
+            self._layout_key = None
             
             # Configuration de la fenêtre
             self.root.geometry(f"{self.width}x{self.height}+{self.position_x}+{self.position_y}")
@@ -67,6 +149,8 @@ class OverlayWindow:
             
             if not self.visible:
                 self.root.withdraw()
+            
+            self.root.after(0, self._drain_loop)
         except Exception as e:
             print(f"Erreur lors de la création de l'overlay: {e}")
             self.root = None
@@ -84,154 +168,326 @@ class OverlayWindow:
         self.position_x = x
         self.position_y = y
     
-    def update_display(self, characters: List[str], current_index: int, next_index: int):
-        """Met à jour l'affichage des personnages."""
-        self.characters = characters
-        self.current_index = current_index
-        self.next_index = next_index
+    def update_display(self, characters: List[str], current_index: int, next_index: int,
+                       skipped: Optional[Iterable[int]] = None, hwnds: Optional[List[int]] = None):
+        """Met à jour l'affichage des personnages (appelable depuis n'importe quel thread).
         
-        if self.root:
-            self.root.after(0, self._refresh_display)
+        Aucun appel Tk ici: l'état est déposé et sera rendu à la prochaine image.
+        `hwnds` associe chaque personnage à sa fenêtre pour les vignettes.
+        """
+        self._pending.put((list(characters), current_index, next_index, frozenset(skipped or ()),
+                           list(hwnds or ())))
     
-    def _calculate_optimal_width(self) -> int:
-        """Calcule la largeur optimale en fonction du nombre de personnages."""
-        if not self.characters:
-            return 200  # Largeur minimale
-        
-        # Estimer la largeur nécessaire
-        # Chaque caractère = ~8-10px selon la police
-        # Padding = 8px de chaque côté = 16px
-        # Crochets pour le perso actif = ~2 caractères supplémentaires
-        # Flèche = ~20px
-        
-        char_width_estimate = 9  # pixels par caractère
-        padding_per_label = 16  # padx=8 de chaque côté
-        arrow_width = 20  # largeur de la flèche + espacement
-        bracket_chars = 2  # crochets autour du perso actif
-        
-        total_width = 20  # padding du main_frame (10px de chaque côté)
-        
-        for i, char_name in enumerate(self.characters):
-            # Longueur du nom + crochets si c'est le perso actif
-            name_length = len(char_name)
-            if i == self.current_index:
-                name_length += bracket_chars
-            
-            # Largeur pour ce label
-            total_width += (name_length * char_width_estimate) + padding_per_label
-            
-            # Ajouter la flèche sauf pour le premier
-            if i > 0:
-                total_width += arrow_width
+    def set_thumbnails(self, scheduler):
+        """Active les vignettes publiées par un ThumbnailScheduler (None pour les retirer)."""
+        self.thumbnails = scheduler
+        self._thumbnail_version = -1
+        self._layout_key = None
+        self._rendered_layout = None
+    
+    def set_resources(self, monitor):
+        """Active les badges CPU/RAM publiés par un ResourceMonitor (None pour les retirer)."""
+        self.resources = monitor
+        self._resources_version = -1
+        self._layout_key = None
+        self._invalidate_render()
+    
+    @property
+    def frame_interval_ms(self) -> int:
+        """Intervalle entre deux relevés de l'état en attente."""
+        return max(1, int(1000 / max(1, self.max_fps)))
+    
+    def drain(self) -> bool:
+        """Applique le dernier état déposé (thread Tk uniquement).
         
-        # Ajouter une marge de sécurité de 10%
-        total_width = int(total_width * 1.1)
+        Retourne True si un rendu a eu lieu.
+        """
+        rendered = False
+        while self._commands:
+            self._commands.popleft()()
+            rendered = True
+        state = self._pending.take()
+        if state is not None:
+            rendered = True
+            self.characters, self.current_index, self.next_index, self.skipped, self.hwnds = state
+        if self.resources is not None and self.resources.version != self._resources_version:
+            # Nouvelles mesures: seuls les labels dont le badge change sont reconfigurés
+            self._resources_version = self.resources.version
+            self._rendered_state = None
+            rendered = True
+        if rendered:
+            self._refresh_display()
+            self.renders += 1
+        if self.thumbnails is not None and (rendered or self.thumbnails.version != self._thumbnail_version):
+            # Nouvelles vignettes, ou personnages associés à d'autres fenêtres
+            self._thumbnail_version = self.thumbnails.version
+            self._refresh_thumbnails()
+            rendered = True
+        return rendered
+    
+    def _drain_loop(self):
+        """Relève l'état en attente dans le thread Tk.
         
-        # Limites min/max
-        min_width = 200
-        max_width = 1200
+        Cadence `max_fps` tant que des mises à jour arrivent; sinon
+        l'intervalle double à chaque relevé vide, jusqu'à IDLE_POLL_MS.
+        """
+        if not self.root:
+            return
+        try:
+            active = self.drain()
+        except Exception as e:
+            print(f"Erreur lors du rafraîchissement de l'overlay: {e}")
+            active = False
+        if active:
+            self._poll_ms = self.frame_interval_ms
+        else:
+            self._poll_ms = max(self.frame_interval_ms, min(self.IDLE_POLL_MS, self._poll_ms * 2))
+        self.root.after(self._poll_ms, self._drain_loop)
+    
+    def _max_width(self) -> int:
+        """Largeur disponible à l'écran depuis la position de l'overlay."""
+        screen_width = self.DEFAULT_SCREEN_WIDTH
+        if self.root:
+            try:
+                screen_width = self.root.winfo_screenwidth()
+            except Exception:
+                pass
+        return max(self.MIN_WIDTH, screen_width - max(0, self.position_x))
+    
+    def compute_layout(self) -> OverlayLayout:
+        """Calcule (ou réutilise) la mise en page des personnages courants.
         
-        return max(min_width, min(total_width, max_width))
+        La mise en page ne dépend que des noms, de la police et de la largeur
+        disponible: elle est recalculée seulement si l'un d'eux change.
+        """
+        max_width = self._max_width()
+        thumbnail = None
+        if self.thumbnails is not None:
+            thumbnail = (self.thumbnails.scaler.width, self.thumbnails.scaler.height)
+        badge = BADGE_TEMPLATE if self.resources is not None else None
+        key = (tuple(self.characters), self.font_size, max_width, thumbnail, badge)
+        if key != self._layout_key:
+            self.layout = compute_layout(self.characters, self.metrics, self.FONT_FAMILY,
+                                         self.font_size, max_width - self.FRAME_PADDING, thumbnail, badge)
+            self._layout_key = key
+        return self.layout
+    
+    def _window_size(self, layout: OverlayLayout) -> Tuple[int, int]:
+        """Taille de la fenêtre pour une mise en page (padding du main_frame compris)."""
+        if not layout.labels:
+            return self.MIN_WIDTH, self.height
+        width = max(self.MIN_WIDTH, min(layout.width + self.FRAME_PADDING, self._max_width()))
+        return width, max(self.height, layout.height + self.FRAME_PADDING)
+    
+    def _label_style(self, index: int) -> Tuple[str, str, str, str]:
+        """Retourne (texte, couleur, fond, graisse) du label d'un personnage."""
+        text, fg_color, bg_color, font_weight = self._name_style(index)
+        if self.resources is not None:
+            hwnd = self.hwnds[index] if index < len(self.hwnds) else 0
+            usage = self.resources.published.get(hwnd)
+            text += "\n" + (format_badge(*usage) if usage is not None else "–")
+        return text, fg_color, bg_color, font_weight
+    
+    def _name_style(self, index: int) -> Tuple[str, str, str, str]:
+        char_name = self.characters[index]
+        if index == self.current_index:
+            # Personnage actif (surligné en vert)
+            return f"[{char_name}]", "#00ff00", "#2a2a2a", "bold"
+        if index in self.skipped:
+            # Personnage passé (mort pendant ce combat)
+            return char_name, "#555555", "#1a1a1a", "overstrike"
+        if index == self.next_index:
+            # Prochain personnage (orange)
+            return char_name, "#ffaa00", "#1a1a1a", "bold"
+        # Autres personnages (gris)
+        return char_name, "#aaaaaa", "#1a1a1a", "normal"
     
     def _refresh_display(self):
-        """Rafraîchit l'affichage (doit être appelé depuis le thread GUI)."""
-        # Supprimer les anciens widgets
-        for widget in self.char_frame.winfo_children():
-            widget.destroy()
+        """Applique l'état courant aux widgets existants (thread GUI uniquement).
         
-        self.labels.clear()
-        self.arrows.clear()
+        Seules les différences avec le dernier rendu sont appliquées: un
+        déplacement du curseur ne reconfigure que les labels de l'ancien et du
+        nouveau personnage actif/suivant, un renommage ne change que le texte
+        concerné (et la position des widgets qui le suivent si sa largeur
+        change), et des widgets ne sont créés ou détruits que si la taille du
+        roster change. `last_update_ops` compte les opérations sur les widgets.
+        """
+        self.last_update_ops = 0
+        state = (tuple(self.characters), tuple(self.hwnds), self.current_index, self.next_index,
+                 frozenset(self.skipped), self.font_size)
+        if state == self._rendered_state:
+            return
+        self._rendered_state = state
         
+        self._resize_widgets(len(self.characters))
         if not self.characters:
             return
         
-        # Calculer et appliquer la largeur optimale
-        optimal_width = self._calculate_optimal_width()
-        if self.root and optimal_width != self.width:
-            self.width = optimal_width
-            self.root.geometry(f"{self.width}x{self.height}+{self.position_x}+{self.position_y}")
+        # Appliquer la mise en page précalculée et adapter la taille de la fenêtre
+        layout = self.compute_layout()
+        if layout is not self._rendered_layout:
+            width, height = self._window_size(layout)
+            if self.root and (width != self.width or height != self._displayed_height):
+                self.width = width
+                self._displayed_height = height
+                self.root.geometry(f"{self.width}x{height}+{self.position_x}+{self.position_y}")
+            self._place_widgets(layout)
+        
+        for i, label in enumerate(self.labels):
+            style = self._label_style(i)
+            rendered = self._rendered_styles[i]
+            if style == rendered:
+                continue
+            text, fg_color, bg_color, font_weight = style
+            changes = {}
+            if rendered is None or text != rendered[0]:
+                changes["text"] = text
+            if rendered is None or fg_color != rendered[1]:
+                changes["fg"] = fg_color
+            if rendered is None or bg_color != rendered[2]:
+                changes["bg"] = bg_color
+            if rendered is None or font_weight != rendered[3]:
+                changes["font"] = (self.FONT_FAMILY, self.font_size, font_weight)
+            label.config(**changes)
+            self._rendered_styles[i] = style
+            self._count_op()
+    
+    def _refresh_thumbnails(self):
+        """Affiche les vignettes publiées depuis le dernier rendu (thread GUI uniquement).
         
-        # Créer les labels pour chaque personnage
-        for i, char_name in enumerate(self.characters):
-            # Flèche entre les personnages
-            if i > 0:
-                arrow = tk.Label(
+        Seules les vignettes dont la version a changé sont converties; la
+        capture et la réduction ont déjà eu lieu dans le thread de capture.
+        """
+        published = self.thumbnails.published
+        for i, label in enumerate(self.labels):
+            hwnd = self.hwnds[i] if i < len(self.hwnds) else 0
+            entry = published.get(hwnd)
+            version = (hwnd, entry[0]) if entry is not None else None
+            if version == self._rendered_thumbnails[i]:
+                continue
+            self._rendered_thumbnails[i] = version
+            image = self.thumbnails.acquire(hwnd) if entry is not None else None
+            if image is None:
+                label.config(image="")
+            else:
+                data = thumbnail_to_ppm(image)
+                if self._photos[i] is None:
+                    self._photos[i] = self.PHOTO_CLASS(master=self.root, data=data)
+                else:
+                    self._photos[i].configure(data=data)
+                label.config(image=self._photos[i], compound=tk.TOP)
+            self._count_op()
+    
+    def _count_op(self, count: int = 1):
+        self.last_update_ops += count
+        self.widget_ops += count
+    
+    def _resize_widgets(self, count: int):
+        """Crée ou détruit des labels (et flèches) en fin de liste pour en avoir `count`."""
+        while len(self.labels) < count:
+            if self.labels:
+                arrow = self.LABEL_CLASS(
                     self.char_frame,
-                    text="→",
-                    font=("Arial", self.font_size),
+                    text=ARROW,
+                    font=(self.FONT_FAMILY, self.font_size),
                     fg="#666666",
                     bg="#1a1a1a"
                 )
-                arrow.pack(side=tk.LEFT, padx=2)
                 self.arrows.append(arrow)
-            
-            # Déterminer le style du label
-            if i == self.current_index:
-                # Personnage actif (surligné en vert)
-                fg_color = "#00ff00"
-                bg_color = "#2a2a2a"
-                text = f"[{char_name}]"
-                font_weight = "bold"
-            elif i == self.next_index:
-                # Prochain personnage (orange)
-                fg_color = "#ffaa00"
-                bg_color = "#1a1a1a"
-                text = char_name
-                font_weight = "bold"
-            else:
-                # Autres personnages (gris)
-                fg_color = "#aaaaaa"
-                bg_color = "#1a1a1a"
-                text = char_name
-                font_weight = "normal"
-            
-            label = tk.Label(
-                self.char_frame,
-                text=text,
-                font=("Arial", self.font_size, font_weight),
-                fg=fg_color,
-                bg=bg_color,
-                padx=8,
-                pady=4
-            )
-            label.pack(side=tk.LEFT)
+                self._rendered_arrow_geometry.append(None)
+                self._count_op()
+            label = self.LABEL_CLASS(self.char_frame, padx=LABEL_PADX, pady=LABEL_PADY, bd=LABEL_BORDER)
             self.labels.append(label)
+            self._rendered_styles.append(None)
+            self._rendered_label_geometry.append(None)
+            self._photos.append(None)
+            self._rendered_thumbnails.append(None)
+            self._count_op()
+        while len(self.labels) > count:
+            self.labels.pop().destroy()
+            self._rendered_styles.pop()
+            self._rendered_label_geometry.pop()
+            self._photos.pop()
+            self._rendered_thumbnails.pop()
+            self._count_op()
+            if self.arrows and len(self.arrows) >= len(self.labels):
+                self.arrows.pop().destroy()
+                self._rendered_arrow_geometry.pop()
+                self._count_op()
+    
+    def _place_widgets(self, layout: OverlayLayout):
+        """Positionne labels et flèches, en ne touchant que ceux dont la géométrie change."""
+        for widgets, geometries, rendered in ((self.labels, layout.labels, self._rendered_label_geometry),
+                                              (self.arrows, layout.arrows, self._rendered_arrow_geometry)):
+            for i, geometry in enumerate(geometries):
+                if rendered[i] == geometry:
+                    continue
+                x, y, width, height = geometry
+                widgets[i].place(x=x, y=y, width=width, height=height)
+                rendered[i] = geometry
+                self._count_op()
+        self._rendered_layout = layout
+    
+    def _invalidate_render(self):
+        """Force la reconfiguration de tous les labels au prochain rafraîchissement."""
+        self._rendered_state = None
+        self._rendered_styles = [None] * len(self.labels)
+        self._rendered_layout = None
+    
+    def post(self, command: Callable):
+        """Exécute `command` dans le thread Tk au prochain relevé (appelable depuis n'importe quel thread)."""
+        self._commands.append(command)
     
     def show(self):
         """Affiche l'overlay."""
+        self.post(self._show)
+    
+    def hide(self):
+        """Masque l'overlay."""
+        self.post(self._hide)
+    
+    def toggle(self):
+        """Affiche/masque l'overlay (l'état est lu au moment de l'appliquer)."""
+        self.post(lambda: self._hide() if self.visible else self._show())
+    
+    def _show(self):
         if self.root:
             self.root.deiconify()
             self.visible = True
     
-    def hide(self):
-        """Masque l'overlay."""
+    def _hide(self):
         if self.root:
             self.root.withdraw()
             self.visible = False
     
-    def toggle(self):
-        """Affiche/masque l'overlay."""
-        if self.visible:
-            self.hide()
-        else:
-            self.show()
-    
     def set_position(self, x: int, y: int):
         """Définit la position de l'overlay."""
         self.position_x = x
         self.position_y = y
+        self.post(self._apply_position)
+    
+    def _apply_position(self):
         if self.root:
-            self.root.geometry(f'+{x}+{y}')
+            self.root.geometry(f'+{self.position_x}+{self.position_y}')
     
     def set_opacity(self, opacity: float):
         """Définit l'opacité de l'overlay (0.0 - 1.0)."""
         self.opacity = max(0.0, min(1.0, opacity))
+        self.post(self._apply_opacity)
+    
+    def _apply_opacity(self):
         if self.root:
             self.root.attributes('-alpha', self.opacity)
     
     def set_font_size(self, size: int):
         """Définit la taille de la police."""
         self.font_size = size
+        self.post(self._apply_font_size)
+    
+    def _apply_font_size(self):
+        for arrow in self.arrows:
+            arrow.config(font=(self.FONT_FAMILY, self.font_size))
+        self._invalidate_render()
         self._refresh_display()
     
     def run(self):
@@ -254,7 +510,8 @@ class OverlayWindow:
             "width": self.width,
             "height": self.height,
             "opacity": self.opacity,
-            "font_size": self.font_size
+            "font_size": self.font_size,
+            "max_fps": self.max_fps
         }
     
     def from_dict(self, data: dict):
@@ -266,7 +523,10 @@ class OverlayWindow:
         self.height = data.get("height", 60)
         self.opacity = data.get("opacity", 0.9)
         self.font_size = data.get("font_size", 14)
-        
+        self.max_fps = data.get("max_fps", self.DEFAULT_MAX_FPS)
+        self.post(self._apply_geometry)
+    
+    def _apply_geometry(self):
         if self.root:
             self.root.geometry(f"{self.width}x{self.height}+{self.position_x}+{self.position_y}")
             self.root.attributes('-alpha', self.opacity)
@@ -0,0 +1,166 @@
+"""Mise en page de l'overlay, indépendante de Tk.
+
+Les largeurs viennent d'un fournisseur de métriques de police: Tk pour
+l'application, une estimation fixe pour les tests et mesures sans écran.
+Les mesures sont mémorisées dans un cache LRU.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# (famille, taille, graisse)
+Font = Tuple[str, int, str]
+
+ARROW = "→"
+LABEL_PADX = 8
+LABEL_PADY = 4
+LABEL_BORDER = 1
+ARROW_PADX = 2
+
+
+class EstimatedFontMetrics:
+    """Métriques approximatives (largeur fixe par caractère), sans affichage."""
+    
+    def __init__(self, char_width_ratio: float = 0.65):
+        self.char_width_ratio = char_width_ratio
+    
+    def measure(self, font: Font, text: str) -> int:
+        family, size, weight = font
+        ratio = self.char_width_ratio * (1.1 if weight == "bold" else 1.0)
+        return int(len(text) * size * ratio + 0.5)
+    
+    def linespace(self, font: Font) -> int:
+        return int(font[1] * 1.6 + 0.5)
+
+
+class TkFontMetrics:
+    """Métriques réelles via tkinter.font (exige une fenêtre Tk existante)."""
+    
+    def __init__(self, root):
+        self.root = root
+        self._fonts: Dict[Font, object] = {}
+    
+    def _font(self, font: Font):
+        tk_font = self._fonts.get(font)
+        if tk_font is None:
+            from tkinter import font as tkfont
+            family, size, weight = font
+            tk_font = tkfont.Font(root=self.root, family=family, size=size,
+                                  weight="bold" if weight == "bold" else "normal",
+                                  overstrike=weight == "overstrike")
+            self._fonts[font] = tk_font
+        return tk_font
+    
+    def measure(self, font: Font, text: str) -> int:
+        return self._font(font).measure(text)
+    
+    def linespace(self, font: Font) -> int:
+        return self._font(font).metrics("linespace")
+
+
+class CachedFontMetrics:
+    """Cache LRU des mesures, clé (famille, taille, graisse, texte)."""
+    
+    def __init__(self, provider, maxsize: int = 1024):
+        self.provider = provider
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._widths: "OrderedDict[Tuple[str, int, str, str], int]" = OrderedDict()
+        self._linespaces: Dict[Font, int] = {}
+    
+    def measure(self, font: Font, text: str) -> int:
+        key = (font[0], font[1], font[2], text)
+        width = self._widths.get(key)
+        if width is not None:
+            self.hits += 1
+            self._widths.move_to_end(key)
+            return width
+        self.misses += 1
+        width = self.provider.measure(font, text)
+        self._widths[key] = width
+        if len(self._widths) > self.maxsize:
+            self._widths.popitem(last=False)
+        return width
+    
+    def linespace(self, font: Font) -> int:
+        linespace = self._linespaces.get(font)
+        if linespace is None:
+            linespace = self._linespaces[font] = self.provider.linespace(font)
+        return linespace
+    
+    def clear(self):
+        self._widths.clear()
+        self._linespaces.clear()
+
+
+class OverlayLayout:
+    """Résultat de la mise en page: géométrie (x, y, largeur, hauteur) de chaque widget."""
+    
+    def __init__(self):
+        self.rows: List[List[int]] = []
+        self.labels: List[Tuple[int, int, int, int]] = []
+        self.arrows: List[Tuple[int, int, int, int]] = []  # flèche avant le label i+1
+        self.width = 0
+        self.height = 0
+
+
+def label_slot_width(metrics, family: str, size: int, name: str, min_text_width: int = 0) -> int:
+    """Largeur réservée au label d'un personnage.
+    
+    On réserve la plus large des variantes (actif en gras entre crochets,
+    normal, barré): la mise en page ne dépend ainsi que des noms, jamais du
+    curseur.
+    """
+    text_width = max(
+        min_text_width,
+        metrics.measure((family, size, "bold"), f"[{name}]"),
+        metrics.measure((family, size, "normal"), name),
+        metrics.measure((family, size, "overstrike"), name),
+    )
+    return text_width + 2 * (LABEL_PADX + LABEL_BORDER)
+
+
+def compute_layout(names: List[str], metrics, family: str, size: int,
+                   max_width: Optional[int] = None,
+                   thumbnail: Optional[Tuple[int, int]] = None,
+                   badge: Optional[str] = None) -> OverlayLayout:
+    """Place les labels de gauche à droite et passe à la ligne au-delà de `max_width`.
+    
+    Une flèche précède chaque personnage sauf le premier, y compris en début
+    de ligne pour montrer que l'ordre continue. Avec `thumbnail` (largeur,
+    hauteur), chaque label réserve la place d'une vignette au-dessus du nom;
+    avec `badge` (texte le plus large possible), une ligne sous le nom.
+    """
+    layout = OverlayLayout()
+    if not names:
+        return layout
+    
+    thumbnail_width, thumbnail_height = thumbnail or (0, 0)
+    min_text_width = thumbnail_width
+    text_height = metrics.linespace((family, size, "bold"))
+    if badge is not None:
+        min_text_width = max(min_text_width, metrics.measure((family, size, "bold"), badge))
+        text_height *= 2
+    row_height = text_height + thumbnail_height + 2 * (LABEL_PADY + LABEL_BORDER)
+    arrow_width = metrics.measure((family, size, "normal"), ARROW) + 2 * ARROW_PADX
+    x = 0
+    y = 0
+    row: List[int] = []
+    for i, name in enumerate(names):
+        width = label_slot_width(metrics, family, size, name, min_text_width)
+        needed = width + (arrow_width if i > 0 else 0)
+        if row and max_width is not None and x + needed > max_width:
+            layout.rows.append(row)
+            row = []
+            x = 0
+            y += row_height
+        if i > 0:
+            layout.arrows.append((x, y, arrow_width, row_height))
+            x += arrow_width
+        layout.labels.append((x, y, width, row_height))
+        x += width
+        row.append(i)
+        layout.width = max(layout.width, x)
+    layout.rows.append(row)
+    layout.height = y + row_height
+    return layout
@@ -0,0 +1,243 @@
+"""Priorité CPU et affinité des clients DOFUS selon le personnage actif."""
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import psutil
+
+from win32_backend import (
+    IDLE_PRIORITY_CLASS, BELOW_NORMAL_PRIORITY_CLASS, NORMAL_PRIORITY_CLASS,
+    ABOVE_NORMAL_PRIORITY_CLASS, HIGH_PRIORITY_CLASS
+)
+
+
+PRIORITIES = {
+    "idle": IDLE_PRIORITY_CLASS,
+    "below_normal": BELOW_NORMAL_PRIORITY_CLASS,
+    "normal": NORMAL_PRIORITY_CLASS,
+    "above_normal": ABOVE_NORMAL_PRIORITY_CLASS,
+    "high": HIGH_PRIORITY_CLASS,
+}
+
+# (priorité, cœurs triés ou None pour ne pas toucher à l'affinité)
+ProcessSettings = Tuple[int, Optional[Tuple[int, ...]]]
+
+
+class ProcessPolicy:
+    """Règles pures: priorité et cœurs voulus pour chaque client.
+    
+    Le client du personnage actif reçoit `focused_priority`, les autres
+    `background_priority`. Les cœurs viennent de `client_cores` (par nom de
+    personnage), sinon de `default_cores`; None laisse l'affinité inchangée.
+    """
+    
+    def __init__(self, focused_priority: str = "above_normal", background_priority: str = "below_normal",
+                 default_cores: Optional[List[int]] = None,
+                 client_cores: Optional[Dict[str, List[int]]] = None):
+        self.focused_priority = focused_priority
+        self.background_priority = background_priority
+        self.default_cores = default_cores
+        self.client_cores = dict(client_cores or {})
+    
+    def cores_for(self, name: str, cpu_count: int) -> Optional[Tuple[int, ...]]:
+        """Cœurs d'un client, limités aux cœurs existants (None si rien de valide)."""
+        cores = self.client_cores.get(name)
+        if cores is None:
+            # Noms comparés sans tenir compte de la casse, comme dans le roster
+            key = name.casefold()
+            cores = next((cores for client, cores in self.client_cores.items() if client.casefold() == key),
+                         self.default_cores)
+        if not cores:
+            return None
+        valid = tuple(sorted({core for core in cores if 0 <= core < cpu_count}))
+        return valid or None
+    
+    def plan(self, clients: List[Tuple[str, int]], focused_pid: int, cpu_count: int) -> Dict[int, ProcessSettings]:
+        """Retourne pid → (priorité, cœurs) pour des clients (nom, pid)."""
+        focused = PRIORITIES.get(self.focused_priority, ABOVE_NORMAL_PRIORITY_CLASS)
+        background = PRIORITIES.get(self.background_priority, BELOW_NORMAL_PRIORITY_CLASS)
+        plan: Dict[int, ProcessSettings] = {}
+        for name, pid in clients:
+            if not pid:
+                continue
+            if pid == focused_pid:
+                plan[pid] = (focused, self.cores_for(name, cpu_count))
+            elif pid not in plan:
+                plan[pid] = (background, self.cores_for(name, cpu_count))
+        return plan
+    
+    def to_dict(self) -> Dict:
+        return {
+            "focused_priority": self.focused_priority,
+            "background_priority": self.background_priority,
+            "default_cores": self.default_cores,
+            "client_cores": self.client_cores
+        }
+    
+    @staticmethod
+    def from_dict(data: Dict) -> 'ProcessPolicy':
+        return ProcessPolicy(
+            focused_priority=data.get("focused_priority", "above_normal"),
+            background_priority=data.get("background_priority", "below_normal"),
+            default_cores=data.get("default_cores"),
+            client_cores=data.get("client_cores", {})
+        )
+
+
+class ProcessScheduler:
+    """Applique la ProcessPolicy à chaque switch, dans le couloir `LANE` de la boucle du cœur.
+    
+    `notify` ne fait que déposer le dernier état (personnages et fenêtre
+    active) et confier l'application au couloir (`core`): ni le switch ni la
+    boucle n'attendent un appel psutil. Seules les différences avec l'état
+    déjà appliqué donnent lieu à des appels. Les réglages d'origine de chaque
+    processus sont mémorisés au premier changement et remis par `restore` (à
+    la fermeture, ou quand un personnage quitte le roster).
+    """
+    
+    LANE = "background"
+    
+    def __init__(self, backend, policy: Optional[ProcessPolicy] = None, enabled: bool = False):
+        self.backend = backend
+        self.policy = policy or ProcessPolicy()
+        self.enabled = enabled
+        self._original: Dict[int, Tuple[int, List[int]]] = {}
+        self._applied: Dict[int, ProcessSettings] = {}
+        self._pids: Dict[int, int] = {}  # hwnd → pid
+        self._denied = set()  # PID dont les réglages sont refusés (client administrateur...)
+        # Dernier état déposé (deque(maxlen=1): append/popleft atomiques)
+        self._pending: Deque[Tuple[Tuple[Tuple[str, int], ...], int]] = deque(maxlen=1)
+        self.core = None
+        self._lock = threading.Lock()  # sérialise apply/restore
+        
+        # Statistiques
+        self.changes = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+    
+    def stop(self, timeout: float = 1.0):
+        """Abandonne l'état en attente et attend la fin d'une application en cours."""
+        self._pending.clear()
+        if self.core is not None:
+            self.core.drain(self.LANE, timeout)
+    
+    def notify(self, clients: List[Tuple[str, int]], focused_hwnd: int):
+        """Dépose les personnages (nom, hwnd) et la fenêtre active, sans attendre."""
+        if not self.enabled:
+            return
+        self._pending.append((tuple(clients), focused_hwnd))
+        self.core.offload(self.LANE, self._apply_pending)
+    
+    def _apply_pending(self):
+        try:
+            pending = self._pending.popleft()
+        except IndexError:
+            return  # déjà appliqué par un passage précédent
+        try:
+            self.apply(*pending)
+        except Exception as e:
+            print(f"Erreur lors de l'application des priorités: {e}")
+    
+    def _pid(self, hwnd: int) -> int:
+        pid = self._pids.get(hwnd)
+        if pid is None:
+            try:
+                pid = self.backend.get_window_pid(hwnd)
+            except Exception:
+                pid = 0
+            if pid:
+                self._pids[hwnd] = pid
+        return pid or 0
+    
+    def apply(self, clients: List[Tuple[str, int]], focused_hwnd: int) -> int:
+        """Applique la politique (synchrone); retourne le nombre de réglages modifiés."""
+        with self._lock:
+            known = {hwnd for _, hwnd in clients}
+            for hwnd in [h for h in self._pids if h not in known]:
+                del self._pids[hwnd]
+            resolved = [(name, self._pid(hwnd)) for name, hwnd in clients]
+            plan = self.policy.plan(resolved, self._pid(focused_hwnd), self.backend.cpu_count())
+            
+            changed = 0
+            for pid in [p for p in self._applied if p not in plan]:
+                self._restore_process(pid)
+            for pid, settings in plan.items():
+                if pid in self._denied or self._applied.get(pid) == settings:
+                    continue
+                changed += self._apply_process(pid, settings)
+            return changed
+    
+    def _apply_process(self, pid: int, settings: ProcessSettings) -> int:
+        priority, cores = settings
+        backend = self.backend
+        previous = self._applied.get(pid)
+        changed = 0
+        try:
+            if pid not in self._original:
+                self._original[pid] = (backend.get_process_priority(pid), backend.get_process_affinity(pid))
+            if previous is None or previous[0] != priority:
+                backend.set_process_priority(pid, priority)
+                changed += 1
+            if cores is not None and (previous is None or previous[1] != cores):
+                backend.set_process_affinity(pid, list(cores))
+                changed += 1
+            elif cores is None and previous is not None and previous[1] is not None:
+                # L'affinité n'est plus imposée: revenir à celle d'origine
+                backend.set_process_affinity(pid, self._original[pid][1])
+                changed += 1
+        except psutil.NoSuchProcess:
+            self._forget(pid)
+            return changed
+        except psutil.AccessDenied as e:
+            # Client lancé en administrateur...: ne plus y toucher jusqu'au prochain restore
+            self._denied.add(pid)
+            self.errors += 1
+            self.last_error = f"PID {pid}: accès refusé ({e})"
+        except Exception as e:
+            # Réglages non confirmés: ils seront réappliqués au prochain passage
+            self.errors += 1
+            self.last_error = f"PID {pid}: {e}"
+            self.changes += changed
+            return changed
+        self._applied[pid] = settings
+        self.changes += changed
+        return changed
+    
+    def _restore_process(self, pid: int):
+        original = self._original.get(pid)
+        if original is not None:
+            priority, cores = original
+            try:
+                self.backend.set_process_priority(pid, priority)
+                self.backend.set_process_affinity(pid, cores)
+            except psutil.NoSuchProcess:
+                pass
+            except Exception as e:
+                self.errors += 1
+                self.last_error = f"PID {pid}: {e}"
+        self._forget(pid)
+    
+    def _forget(self, pid: int):
+        self._original.pop(pid, None)
+        self._applied.pop(pid, None)
+    
+    def restore(self):
+        """Remet la priorité et l'affinité d'origine de tous les clients modifiés."""
+        with self._lock:
+            for pid in list(self._original):
+                self._restore_process(pid)
+            self._applied.clear()
+            self._denied.clear()
+    
+    def to_dict(self) -> Dict:
+        """Convertit la configuration en dictionnaire."""
+        data = {"enabled": self.enabled}
+        data.update(self.policy.to_dict())
+        return data
+    
+    def from_dict(self, data: Dict):
+        """Charge la configuration depuis un dictionnaire."""
+        self.enabled = data.get("enabled", False)
+        self.policy = ProcessPolicy.from_dict(data)
+        # Repartir des réglages d'origine: la nouvelle politique s'applique au prochain switch
+        self.restore()
@@ -0,0 +1,171 @@
+"""Suivi de la consommation CPU et mémoire de chaque client DOFUS."""
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from memory_manager import MB
+
+
+# Badge le plus large possible: sa largeur est réservée dans la mise en page de l'overlay
+BADGE_TEMPLATE = "100% · 9999 Mo"
+
+
+class RingBuffer:
+    """Tampon circulaire de taille fixe sur un array: aucune allocation après sa création."""
+    
+    def __init__(self, size: int, typecode: str = "d"):
+        self.size = size
+        self.data = array(typecode, [0]) * size
+        self.index = 0
+        self.count = 0
+    
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+    
+    def latest(self):
+        """Dernière valeur ajoutée (None si vide)."""
+        if not self.count:
+            return None
+        return self.data[self.index - 1]
+    
+    def values(self) -> List:
+        """Valeurs de la plus ancienne à la plus récente."""
+        if self.count < self.size:
+            return self.data[:self.count].tolist()
+        return self.data[self.index:].tolist() + self.data[:self.index].tolist()
+    
+    def mean(self) -> float:
+        if not self.count:
+            return 0.0
+        return sum(self.data[:self.count]) / self.count
+
+
+class ClientStats:
+    """Historique d'un client: CPU (% de la machine) et mémoire résidente (octets)."""
+    
+    def __init__(self, history: int):
+        self.cpu = RingBuffer(history, "f")
+        self.rss = RingBuffer(history, "Q")
+        self.last_cpu_time: Optional[float] = None
+        self.last_time = 0.0
+
+
+def format_badge(cpu: float, rss: int) -> str:
+    """Texte du badge affiché sous le nom d'un personnage."""
+    return f"{min(cpu, 100):.0f}% · {min(rss // MB, 9999)} Mo"
+
+
+class ResourceMonitor:
+    """Échantillonne tous les clients en une seule passe par tick.
+    
+    Chaque tick fait un unique appel `sample_processes` au backend pour tous
+    les PID suivis (issus des WindowInfo du registre), puis ajoute le CPU et
+    la mémoire de chaque client à ses tampons circulaires. Le CPU est exprimé
+    comme dans le gestionnaire des tâches: en pourcentage de la machine.
+    
+    Les dernières valeurs sont publiées dans `published` (hwnd → (cpu, rss)),
+    un dictionnaire remplacé d'un bloc: l'overlay le lit sans verrou.
+    
+    Les ticks s'exécutent directement dans la boucle du cœur (`core`): un
+    relevé n'attend rien, et sa minuterie partage le réveil de celle du
+    chien de garde du hook clavier.
+    """
+    
+    DEFAULT_INTERVAL = 1.0
+    DEFAULT_HISTORY = 120
+    
+    def __init__(self, backend, enabled: bool = False, clock: Callable[[], float] = time.monotonic):
+        self.backend = backend
+        self.enabled = enabled
+        self.clock = clock
+        self.interval = self.DEFAULT_INTERVAL
+        self.history = self.DEFAULT_HISTORY
+        
+        self.stats: Dict[int, ClientStats] = {}  # pid → historique
+        self.published: Dict[int, Tuple[float, int]] = {}
+        self.version = 0
+        self.ticks = 0
+        self._roster: Tuple[Tuple[int, int], ...] = ()
+        self._cpu_count = 0
+        self.core = None
+        self._timer = None
+    
+    def set_roster(self, clients: List[Tuple[int, int]]):
+        """Fenêtres suivies (hwnd, pid) (appelable depuis n'importe quel thread)."""
+        self._roster = tuple(clients)
+    
+    def tick(self) -> int:
+        """Une passe d'échantillonnage; retourne le nombre de clients mesurés."""
+        clients = self._roster
+        history = self.stats  # from_dict peut remplacer le dictionnaire pendant la passe
+        if not self._cpu_count:
+            self._cpu_count = max(1, self.backend.cpu_count())
+        now = self.clock()
+        samples = self.backend.sample_processes({pid for _, pid in clients if pid})
+        
+        published = {}
+        for hwnd, pid in clients:
+            sample = samples.get(pid)
+            if sample is None:
+                continue
+            cpu_time, rss = sample
+            stats = history.get(pid)
+            if stats is None:
+                stats = history[pid] = ClientStats(self.history)
+            if stats.last_cpu_time is not None and now > stats.last_time:
+                cpu = (cpu_time - stats.last_cpu_time) / (now - stats.last_time) / self._cpu_count * 100
+                stats.cpu.append(max(0.0, cpu))
+                stats.rss.append(rss)
+            if stats.cpu.count:
+                published[hwnd] = (stats.cpu.latest(), stats.rss.latest())
+            stats.last_cpu_time = cpu_time
+            stats.last_time = now
+        for pid in [p for p in history if p not in samples]:
+            del history[pid]
+        
+        self.published = published
+        self.version += 1
+        self.ticks += 1
+        return len(published)
+    
+    def start(self):
+        """Lance l'échantillonnage périodique (sans effet si désactivé ou déjà lancé)."""
+        if not self.enabled or self._timer is not None:
+            return
+        self._timer = self.core.every(lambda: self.interval, self._safe_tick)
+    
+    def stop(self, timeout: float = 1.0):
+        """Arrête l'échantillonnage; un relevé en cours dans la boucle est attendu."""
+        timer = self._timer
+        if timer is not None:
+            self._timer = None
+            timer.cancel()
+            timer.join(timeout)
+    
+    def _safe_tick(self):
+        try:
+            self.tick()
+        except Exception as e:
+            print(f"Erreur lors de la mesure des ressources: {e}")
+    
+    def to_dict(self) -> Dict:
+        """Convertit la configuration en dictionnaire."""
+        return {
+            "enabled": self.enabled,
+            "interval_s": self.interval,
+            "history": self.history
+        }
+    
+    def from_dict(self, data: Dict):
+        """Charge la configuration depuis un dictionnaire."""
+        self.enabled = data.get("enabled", False)
+        self.interval = data.get("interval_s", self.DEFAULT_INTERVAL)
+        history = data.get("history", self.DEFAULT_HISTORY)
+        if history != self.history:
+            # Les tampons ont une taille fixe: repartir d'historiques vides, publiés
+            # d'un bloc (un relevé en cours continue sur l'ancien dictionnaire)
+            self.history = history
+            self.stats = {}
@@ -0,0 +1,135 @@
+"""Exécution des switchs hors du thread du hook clavier."""
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from window_manager import WindowManager
+
+
+class SwitchDispatcher:
+    """Switchs exécutés dans le couloir `LANE` de la boucle du cœur (`core`).
+    
+    Le callback du hook clavier se contente de déposer une intention
+    (`submit_*`) et rend la main immédiatement. Un seul passage est planifié
+    à la fois dans le couloir; les intentions déposées entre-temps sont
+    fusionnées: seule la dernière cible compte, et des suivant/précédent
+    répétés s'additionnent en un seul déplacement. Les attentes de la
+    vérification du focus restent ainsi hors de la boucle.
+    
+    Avec `prefetch`, le couloir profite des temps morts (aucune intention en
+    attente) pour restaurer sans l'activer la fenêtre du prochain personnage,
+    ce qui sort ShowWindow(SW_RESTORE) du chemin critique du prochain switch.
+    Les temps morts servent aussi à terminer le travail différé du mode focus.
+    """
+    
+    POSITION = "position"
+    RELATIVE = "relative"
+    LANE = "switch"
+    
+    def __init__(self, window_manager: WindowManager, prefetch: bool = False):
+        self.window_manager = window_manager
+        self.prefetch = prefetch
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[str, int]] = None
+        self.core = None
+        self._scheduled = False  # passage déjà planifié dans le couloir
+        
+        # Statistiques
+        self.submitted = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.prefetched = 0
+        
+        # Callback appelé après chaque switch (ex: rafraîchir l'overlay)
+        self.on_switched: Callable = lambda: None
+    
+    def stop(self, timeout: float = 1.0):
+        """Abandonne l'intention en attente et attend la fin du switch en cours."""
+        with self._lock:
+            self._pending = None
+        if self.core is not None:
+            self.core.drain(self.LANE, timeout)
+    
+    def submit_position(self, position: int):
+        """Demande un switch vers une position (remplace toute demande en attente)."""
+        self._submit(self.POSITION, position)
+    
+    def submit_next(self):
+        """Demande un switch vers le personnage suivant."""
+        self._submit(self.RELATIVE, 1)
+    
+    def submit_previous(self):
+        """Demande un switch vers le personnage précédent."""
+        self._submit(self.RELATIVE, -1)
+    
+    def submit_prefetch(self):
+        """Demande la préparation du prochain personnage (sans effet si désactivée)."""
+        if self.prefetch:
+            self._wake()
+    
+    def _submit(self, kind: str, value: int):
+        with self._lock:
+            self.submitted += 1
+            pending = self._pending
+            if pending is None:
+                self._pending = (kind, value)
+            else:
+                self.coalesced += 1
+                if kind == self.RELATIVE and pending[0] == self.RELATIVE:
+                    self._pending = (kind, pending[1] + value)
+                elif kind == self.RELATIVE:
+                    # Position demandée puis suivant/précédent: partir de cette position,
+                    # en sautant les personnages invalides ou passés comme un switch normal
+                    target = self.window_manager.turn_order.step(pending[1], value)
+                    self._pending = (self.POSITION, target) if target >= 0 else pending
+                else:
+                    self._pending = (kind, value)
+        self._wake()
+    
+    def _wake(self):
+        """Planifie un passage dans le couloir; un passage déjà planifié suffit."""
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.core.offload(self.LANE, self._step)
+    
+    def _step(self):
+        """Exécute l'intention en attente puis le travail des temps morts."""
+        with self._lock:
+            intent = self._pending
+            self._pending = None
+            self._scheduled = False
+        try:
+            if intent is not None:
+                self._execute(intent)
+            if self.prefetch and self._pending is None:
+                self._prefetch()
+            if self._pending is None:
+                # Opérations du mode focus qui n'ont pas tenu dans le budget du switch
+                self.window_manager.settle_focus_mode()
+        except Exception as e:
+            print(f"Erreur lors du switch: {e}")
+    
+    def _execute(self, intent: Tuple[str, int]):
+        kind, value = intent
+        manager = self.window_manager
+        if kind == self.POSITION:
+            manager.switch_to_position(value)
+        elif value:
+            manager.switch_by(value)
+        else:
+            return
+        self.executed += 1
+        self.on_switched()
+    
+    def _prefetch(self):
+        if self.window_manager.prefetch_next():
+            self.prefetched += 1
+    
+    def to_dict(self) -> Dict:
+        """Convertit les réglages de switch en dictionnaire."""
+        return {"prefetch_next": self.prefetch}
+    
+    def from_dict(self, data: Dict):
+        """Charge les réglages de switch depuis un dictionnaire."""
+        self.prefetch = data.get("prefetch_next", False)
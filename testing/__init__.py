@@ -0,0 +1,12 @@
+"""Doublures de test: bureau Windows, entrées et Tk simulés (tests et benchmark.py uniquement).
+
+L'application ne les importe jamais; ce paquet n'est pas livré avec elle.
+"""
+from testing.fake_backend import (
+    DOFUS_TITLES, FakeBackend, FakeProcess, FakeWindow, ScriptedEventSource, SyntheticCaptureSource
+)
+from testing.fake_input import (
+    FakeHookSource, FakeKeyEvent, FakeKeyboardLayout, FakeMouse, FakeMouseData, RecordingKeyboard
+)
+from testing.fake_tk import FakeFontMetrics, FakeTkRoot, FakeWidget, HeadlessOverlay
+from testing.roster import count_focus, make_roster
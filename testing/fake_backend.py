@@ -0,0 +1,441 @@
+"""Bureau Windows simulé pour tester et mesurer le switcher hors Windows."""
+import random
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import psutil
+
+try:
+    import numpy as np
+except ImportError:  # SyntheticCaptureSource indisponible sans NumPy
+    np = None
+
+from win32_backend import (
+    SW_RESTORE, SW_MINIMIZE, SW_SHOWMINNOACTIVE, SW_SHOWNOACTIVATE, VK_MENU, KEYEVENTF_KEYUP, NORMAL_PRIORITY_CLASS
+)
+from window_registry import (
+    EVENT_OBJECT_CREATE, EVENT_OBJECT_DESTROY, EVENT_OBJECT_SHOW,
+    EVENT_OBJECT_HIDE, EVENT_OBJECT_NAMECHANGE, WindowRegistry
+)
+
+
+DOFUS_TITLES = [
+    "Roublard-Perso - Roublard - 3.0.12",
+    "Sram-Perso - Sram - 3.0.12",
+    "Panda-Perso - Pandawa - 3.0.12",
+    "Eni-Perso - Eniripsa - 3.0.12",
+    "Sacri-Perso - Sacrieur - 3.0.12",
+    "Iop-Perso - Iop - 3.0.12",
+    "Sadi-Perso - Sadida - 3.0.12",
+    "Zobal-Perso - Zobal - 3.0.12",
+]
+
+
+class FakeWindow:
+    """Fenêtre de premier niveau simulée."""
+    
+    def __init__(self, hwnd: int, pid: int, title: str, visible: bool = True, iconic: bool = False):
+        self.hwnd = hwnd
+        self.pid = pid
+        self.title = title
+        self.visible = visible
+        self.iconic = iconic
+        self.cloaked = False
+
+
+class FakeProcess:
+    """Processus simulé (`protected`: priorité et affinité refusées, comme AccessDenied)."""
+    
+    def __init__(self, pid: int, name: str, create_time: float, cpus: int = 8):
+        self.pid = pid
+        self.name = name
+        self.create_time = create_time
+        self.priority = NORMAL_PRIORITY_CLASS
+        self.affinity: List[int] = list(range(cpus))
+        self.protected = False
+        self.rss = 0
+        self.cpu_time = 0.0  # temps CPU cumulé (secondes)
+        # Part du working set réellement libérable par un trim
+        self.trimmable = 0.6
+
+
+class FakeBackend:
+    """Backend simulé exposant la même interface que Win32Backend.
+    
+    Chaque appel est compté dans `calls`; `latency` associe un nom de méthode
+    à un délai simulé (en secondes) pour reproduire le coût des appels système,
+    modulé aléatoirement de ±`jitter` (fraction). Le délai passe par `sleep`,
+    remplaçable par l'avance d'une horloge simulée.
+    
+    `refusal` simule le verrou de premier plan de Windows: probabilité qu'une
+    activation soit refusée selon le mécanisme utilisé ("set_foreground_window",
+    "set_foreground_window+alt", "set_foreground_window+attached",
+    "switch_to_this_window", "show_window_restore"). Une activation acceptée
+    n'est visible via get_foreground_window qu'après `activation_delay` secondes.
+    """
+    
+    def __init__(self, latency: Optional[Dict[str, float]] = None,
+                 refusal: Optional[Dict[str, float]] = None, jitter: float = 0.0, seed: int = 0,
+                 activation_delay: float = 0.0, cpus: int = 8,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.windows: Dict[int, FakeWindow] = {}
+        self.processes: Dict[int, FakeProcess] = {}
+        self.foreground: int = 0
+        self.latency: Dict[str, float] = latency or {}
+        self.refusal: Dict[str, float] = refusal or {}
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.activation_delay = activation_delay
+        self.cpus = cpus
+        self.sleep = sleep
+        self._pending_foreground: Optional[Tuple[int, float]] = None
+        self._alt_down = False
+        self._attached = False
+        self._next_hwnd = 0x10000
+        self._next_pid = 1000
+        self._clock = 1_700_000_000.0
+    
+    # --- Construction du bureau simulé -------------------------------------
+    
+    def spawn_process(self, name: str, pid: Optional[int] = None) -> FakeProcess:
+        """Crée un processus (un PID explicite simule une réutilisation de PID)."""
+        if pid is None:
+            self._next_pid += 4
+            pid = self._next_pid
+        self._clock += 1.0
+        process = FakeProcess(pid, name, self._clock, self.cpus)
+        self.processes[pid] = process
+        return process
+    
+    def kill_process(self, pid: int):
+        """Termine un processus et détruit ses fenêtres."""
+        self.processes.pop(pid, None)
+        for hwnd in [h for h, w in self.windows.items() if w.pid == pid]:
+            del self.windows[hwnd]
+    
+    def create_window(self, pid: int, title: str, visible: bool = True, iconic: bool = False) -> FakeWindow:
+        """Crée une fenêtre appartenant au processus `pid`."""
+        self._next_hwnd += 2
+        window = FakeWindow(self._next_hwnd, pid, title, visible, iconic)
+        self.windows[window.hwnd] = window
+        return window
+    
+    def destroy_window(self, hwnd: int):
+        """Détruit une fenêtre."""
+        self.windows.pop(hwnd, None)
+    
+    def add_dofus_client(self, title: str) -> FakeWindow:
+        """Ajoute un client DOFUS (processus + fenêtre principale)."""
+        process = self.spawn_process("Dofus.exe")
+        return self.create_window(process.pid, title)
+    
+    def populate_desktop(self, dofus_titles: List[str], other_processes: int = 200,
+                         windows_per_process: int = 2):
+        """Remplit le bureau avec des clients DOFUS et d'autres applications."""
+        for i in range(other_processes):
+            process = self.spawn_process(f"app{i}.exe")
+            for j in range(windows_per_process):
+                self.create_window(process.pid, f"App {i} #{j}", visible=(j == 0))
+        for title in dofus_titles:
+            self.add_dofus_client(title)
+    
+    def reset_calls(self):
+        """Remet les compteurs d'appels à zéro."""
+        self.calls.clear()
+    
+    def _call(self, name: str):
+        self.calls[name] += 1
+        delay = self.latency.get(name)
+        if delay:
+            if self.jitter:
+                delay *= 1 + self.jitter * self.rng.uniform(-1, 1)
+            self.sleep(delay)
+    
+    def _activate(self, hwnd: int, mechanism: str) -> bool:
+        """Passe une fenêtre au premier plan sauf si le verrou simulé refuse."""
+        probability = self.refusal.get(mechanism, 0.0)
+        if probability and self.rng.random() < probability:
+            return False
+        if self.activation_delay:
+            self._pending_foreground = (hwnd, time.perf_counter() + self.activation_delay)
+        else:
+            self.foreground = hwnd
+        return True
+    
+    # --- Interface backend -------------------------------------------------
+    
+    def enum_windows(self) -> List[int]:
+        self._call("enum_windows")
+        return list(self.windows)
+    
+    def get_window_pid(self, hwnd: int) -> int:
+        self._call("get_window_pid")
+        window = self.windows.get(hwnd)
+        return window.pid if window else 0
+    
+    def get_window_text(self, hwnd: int) -> str:
+        self._call("get_window_text")
+        window = self.windows.get(hwnd)
+        return window.title if window else ""
+    
+    def is_window(self, hwnd: int) -> bool:
+        self._call("is_window")
+        return hwnd in self.windows
+    
+    def is_window_visible(self, hwnd: int) -> bool:
+        self._call("is_window_visible")
+        window = self.windows.get(hwnd)
+        return bool(window and window.visible)
+    
+    def is_iconic(self, hwnd: int) -> bool:
+        self._call("is_iconic")
+        window = self.windows.get(hwnd)
+        return bool(window and window.iconic)
+    
+    def show_window(self, hwnd: int, command: int):
+        self._call("show_window")
+        window = self.windows.get(hwnd)
+        if window is None:
+            return
+        if command in (SW_MINIMIZE, SW_SHOWMINNOACTIVE):
+            window.iconic = True
+            if self.foreground == hwnd:
+                self.foreground = 0
+        elif command == SW_RESTORE:
+            window.iconic = False
+            self._activate(hwnd, "show_window_restore")
+        elif command == SW_SHOWNOACTIVATE:
+            window.iconic = False
+    
+    def set_foreground_window(self, hwnd: int):
+        self._call("set_foreground_window")
+        if hwnd not in self.windows:
+            raise OSError("Invalid window handle")
+        if self._alt_down:
+            mechanism = "set_foreground_window+alt"
+        elif self._attached:
+            mechanism = "set_foreground_window+attached"
+        else:
+            mechanism = "set_foreground_window"
+        self._activate(hwnd, mechanism)
+    
+    def bring_window_to_top(self, hwnd: int):
+        self._call("bring_window_to_top")
+        if hwnd not in self.windows:
+            raise OSError("Invalid window handle")
+    
+    def set_focus(self, hwnd: int):
+        self._call("set_focus")
+        if hwnd not in self.windows:
+            raise OSError("Invalid window handle")
+    
+    def keybd_event(self, vk: int, flags: int):
+        self._call("keybd_event")
+        if vk == VK_MENU:
+            self._alt_down = not flags & KEYEVENTF_KEYUP
+    
+    def get_foreground_window(self) -> int:
+        self._call("get_foreground_window")
+        pending = self._pending_foreground
+        if pending is not None and time.perf_counter() >= pending[1]:
+            self._pending_foreground = None
+            if pending[0] in self.windows:
+                self.foreground = pending[0]
+        return self.foreground
+    
+    def get_window_thread_id(self, hwnd: int) -> int:
+        self._call("get_window_thread_id")
+        window = self.windows.get(hwnd)
+        return window.pid * 10 if window else 0
+    
+    def get_current_thread_id(self) -> int:
+        self._call("get_current_thread_id")
+        return 1
+    
+    def attach_thread_input(self, thread_id: int, target_thread_id: int, attach: bool):
+        self._call("attach_thread_input")
+        self._attached = attach
+    
+    def switch_to_this_window(self, hwnd: int):
+        self._call("switch_to_this_window")
+        window = self.windows.get(hwnd)
+        if window is None:
+            return
+        window.iconic = False
+        self._activate(hwnd, "switch_to_this_window")
+    
+    def cloak_window(self, hwnd: int, cloaked: bool):
+        self._call("cloak_window")
+        window = self.windows.get(hwnd)
+        if window is None:
+            raise OSError("Invalid window handle")
+        window.cloaked = cloaked
+    
+    def iter_processes(self) -> Iterator[Tuple[int, str]]:
+        self._call("iter_processes")
+        return iter([(p.pid, p.name) for p in self.processes.values()])
+    
+    def get_process_create_time(self, pid: int) -> float:
+        self._call("get_process_create_time")
+        process = self.processes.get(pid)
+        if process is None:
+            raise psutil.NoSuchProcess(pid)
+        return process.create_time
+    
+    def get_process_name(self, pid: int) -> str:
+        """Équivalent simulé de psutil.Process(pid).name() (un accès par PID)."""
+        self._call("get_process_name")
+        process = self.processes.get(pid)
+        if process is None:
+            raise psutil.NoSuchProcess(pid)
+        return process.name
+    
+    def cpu_count(self) -> int:
+        return self.cpus
+    
+    def _process(self, pid: int, write: bool = False) -> FakeProcess:
+        process = self.processes.get(pid)
+        if process is None:
+            raise psutil.NoSuchProcess(pid)
+        if write and process.protected:
+            raise psutil.AccessDenied(pid)
+        return process
+    
+    def get_process_priority(self, pid: int) -> int:
+        self._call("get_process_priority")
+        return self._process(pid).priority
+    
+    def set_process_priority(self, pid: int, priority: int):
+        self._call("set_process_priority")
+        self._process(pid, write=True).priority = priority
+    
+    def get_process_affinity(self, pid: int) -> List[int]:
+        self._call("get_process_affinity")
+        return list(self._process(pid).affinity)
+    
+    def get_process_rss(self, pid: int) -> int:
+        self._call("get_process_rss")
+        return self._process(pid).rss
+    
+    def sample_processes(self, pids: Iterable[int]) -> Dict[int, Tuple[float, int]]:
+        self._call("sample_processes")
+        samples = {}
+        for pid in pids:
+            process = self.processes.get(pid)
+            if process is not None:
+                samples[pid] = (process.cpu_time, process.rss)
+        return samples
+    
+    def trim_working_set(self, pid: int):
+        self._call("trim_working_set")
+        process = self._process(pid, write=True)
+        process.rss -= int(process.rss * process.trimmable)
+    
+    def set_process_affinity(self, pid: int, cores: List[int]):
+        self._call("set_process_affinity")
+        if not cores or any(core < 0 or core >= self.cpus for core in cores):
+            raise ValueError(f"cœurs invalides: {cores}")
+        self._process(pid, write=True).affinity = list(cores)
+
+
+class SyntheticCaptureSource:
+    """Source de captures simulée: images BGRA synthétiques qui changent à chaque capture.
+    
+    `capture_delay` simule le coût d'une vraie capture (PrintWindow).
+    """
+    
+    def __init__(self, width: int = 1920, height: int = 1080, capture_delay: float = 0.0):
+        self.width = width
+        self.height = height
+        self.capture_delay = capture_delay
+        self.calls: Dict[int, int] = {}
+        self.closed: set = set()
+        y, x = np.mgrid[0:height, 0:width]
+        self._gradient = np.empty((height, width, 4), dtype=np.uint8)
+        self._gradient[:, :, 0] = (x * 255 // max(1, width - 1)).astype(np.uint8)
+        self._gradient[:, :, 1] = (y * 255 // max(1, height - 1)).astype(np.uint8)
+        self._gradient[:, :, 2] = ((x + y) & 0xFF).astype(np.uint8)
+        self._gradient[:, :, 3] = 255
+        self._frames: Dict[int, 'np.ndarray'] = {}
+    
+    def capture(self, hwnd: int):
+        if hwnd in self.closed:
+            return None
+        if self.capture_delay:
+            time.sleep(self.capture_delay)
+        count = self.calls.get(hwnd, 0) + 1
+        self.calls[hwnd] = count
+        frame = self._frames.get(hwnd)
+        if frame is None:
+            frame = self._frames[hwnd] = np.empty_like(self._gradient)
+        np.add(self._gradient, np.uint8((hwnd * 37 + count) & 0xFF), out=frame)
+        return frame
+
+
+class ScriptedEventSource:
+    """Source d'événements simulée: modifie le bureau et émet les WinEvents correspondants.
+    
+    Remplace Win32EventSource pour rejouer des scénarios (lancement, fermeture,
+    renommage d'un client) sans Windows.
+    """
+    
+    def __init__(self, backend: FakeBackend, registry: WindowRegistry):
+        self.backend = backend
+        self.registry = registry
+        self.emitted: List[Tuple[int, int]] = []
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        pass
+    
+    def emit(self, event: int, hwnd: int):
+        """Transmet un événement brut au registre."""
+        self.emitted.append((event, hwnd))
+        self.registry.handle_event(event, hwnd)
+    
+    def launch_client(self, title: str) -> FakeWindow:
+        """Simule le lancement d'un client DOFUS."""
+        process = self.backend.spawn_process("Dofus.exe")
+        window = self.backend.create_window(process.pid, title, visible=False)
+        self.emit(EVENT_OBJECT_CREATE, window.hwnd)
+        window.visible = True
+        self.emit(EVENT_OBJECT_SHOW, window.hwnd)
+        return window
+    
+    def close_client(self, hwnd: int):
+        """Simule la fermeture d'un client (fenêtre et processus)."""
+        window = self.backend.windows.get(hwnd)
+        if window is None:
+            return
+        self.backend.kill_process(window.pid)
+        self.emit(EVENT_OBJECT_DESTROY, hwnd)
+    
+    def rename(self, hwnd: int, title: str):
+        """Simule un changement de titre (connexion d'un personnage)."""
+        window = self.backend.windows.get(hwnd)
+        if window is not None:
+            window.title = title
+        self.emit(EVENT_OBJECT_NAMECHANGE, hwnd)
+    
+    def set_visible(self, hwnd: int, visible: bool):
+        """Simule l'affichage ou le masquage d'une fenêtre."""
+        window = self.backend.windows.get(hwnd)
+        if window is not None:
+            window.visible = visible
+        self.emit(EVENT_OBJECT_SHOW if visible else EVENT_OBJECT_HIDE, hwnd)
+    
+    def play(self, script: List[Tuple]):
+        """Rejoue une liste d'actions, ex: [("launch", titre), ("close", hwnd)]."""
+        actions = {
+            "launch": self.launch_client,
+            "close": self.close_client,
+            "rename": self.rename,
+            "show": lambda hwnd: self.set_visible(hwnd, True),
+            "hide": lambda hwnd: self.set_visible(hwnd, False),
+        }
+        for action, *args in script:
+            actions[action](*args)
@@ -0,0 +1,171 @@
+"""Clavier, souris et hook clavier simulés."""
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class FakeHookSource:
+    """Hook clavier simulé pour le chien de garde.
+    
+    `press` joue le rôle du thread du hook: le callback associé à la touche est
+    appelé de façon synchrone. Après `drop`, les touches frappées mettent à
+    jour l'heure de dernière entrée système mais n'atteignent plus le hook,
+    comme lorsque Windows a retiré un hook trop lent.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.on_event: Callable = lambda: None
+        self.hotkeys: Dict[str, Callable] = {}
+        self.installed = False
+        self.installs = 0
+        self.probes = 0
+        self._last_input = clock()
+    
+    def install(self):
+        self.installed = True
+        self.installs += 1
+    
+    def reinstall(self):
+        # Comme keyboard.unhook_all: les raccourcis doivent être réenregistrés
+        self.hotkeys.clear()
+        self.install()
+    
+    def drop(self):
+        """Simule le retrait silencieux du hook par Windows."""
+        self.installed = False
+    
+    def add_hotkey(self, key: str, callback: Callable):
+        self.hotkeys[key] = callback
+    
+    def press(self, key: str) -> bool:
+        """Simule une frappe; retourne True si le hook l'a reçue."""
+        self._last_input = self.clock()
+        if not self.installed:
+            return False
+        self.on_event()
+        callback = self.hotkeys.get(key)
+        if callback is not None:
+            callback()
+        return True
+    
+    def last_input_time(self) -> float:
+        return self._last_input
+    
+    def probe(self, timeout: float) -> bool:
+        self.probes += 1
+        if self.installed:
+            self.on_event()
+        return self.installed
+
+
+class FakeKeyEvent:
+    """Événement clavier au format de la bibliothèque `keyboard`."""
+    
+    __slots__ = ("scan_code", "name", "event_type")
+    
+    def __init__(self, scan_code: int, name: str, event_type: str):
+        self.scan_code = scan_code
+        self.name = name
+        self.event_type = event_type
+
+
+class FakeKeyboardLayout:
+    """Disposition AZERTY simulée: nom de touche → scan codes."""
+    
+    SCAN_CODES = {
+        "&": (2,), "é": (3,), '"': (4,), "'": (5,), "(": (6,), "-": (7,), "è": (8,),
+        "_": (9,), "ç": (10,), "à": (11,), "tab": (15,), "a": (16,), "z": (17,), "e": (18,),
+        "r": (19,), "t": (20,), "y": (21,), "u": (22,), "i": (23,), "o": (24,), "p": (25,),
+        "q": (30,), "s": (31,), "d": (32,), "f": (33,), "g": (34,), "h": (35,), "j": (36,),
+        "k": (37,), "l": (38,), "m": (39,), "`": (41,), "\\": (43,), "w": (44,),
+        "x": (45,), "c": (46,), "v": (47,), "b": (48,), "n": (49,), "space": (57,),
+        "ctrl": (29, 3613), "right ctrl": (3613,), "shift": (42, 54), "right shift": (54,),
+        "alt": (56,), "alt gr": (541,), "windows": (91,), "right windows": (92,),
+    }
+    SCAN_CODES.update({f"f{i}": (58 + i,) for i in range(1, 11)})
+    SCAN_CODES.update({"f11": (87,), "f12": (88,)})
+    SCAN_CODES.update({f"f{i}": (87 + i,) for i in range(13, 25)})
+    
+    def __init__(self):
+        self.lookups = 0
+    
+    def resolve(self, name: str) -> Tuple[int, ...]:
+        self.lookups += 1
+        if name not in self.SCAN_CODES:
+            raise ValueError(f"Touche inconnue: {name}")
+        return self.SCAN_CODES[name]
+    
+    def chord(self, binding: str) -> List[FakeKeyEvent]:
+        """Événements down/up pour frapper un raccourci comme "ctrl+alt+o"."""
+        names = [name.strip() for name in binding.split("+")]
+        events = [FakeKeyEvent(self.SCAN_CODES[name][0], name, "down") for name in names]
+        events += [FakeKeyEvent(self.SCAN_CODES[name][0], name, "up") for name in reversed(names)]
+        return events
+
+
+class RecordingKeyboard:
+    """Remplaçant du module `keyboard` qui enregistre les opérations sur les hooks."""
+    
+    def __init__(self, layout: Optional[FakeKeyboardLayout] = None):
+        self.layout = layout or FakeKeyboardLayout()
+        self.operations: List[Tuple[str, ...]] = []
+        self.handlers: List[Callable] = []
+    
+    def key_to_scan_codes(self, name: str) -> Tuple[int, ...]:
+        return self.layout.resolve(name)
+    
+    def hook(self, callback: Callable):
+        self.operations.append(("hook",))
+        self.handlers.append(callback)
+        return callback
+    
+    def unhook(self, callback: Callable):
+        self.operations.append(("unhook",))
+        self.handlers.remove(callback)
+    
+    def unhook_all(self):
+        self.operations.append(("unhook_all",))
+        self.handlers.clear()
+    
+    def press(self, binding: str):
+        """Envoie aux hooks les événements d'un raccourci frappé."""
+        for event in self.layout.chord(binding):
+            for handler in list(self.handlers):
+                handler(event)
+
+
+class FakeMouseData:
+    """Structure MSLLHOOKSTRUCT simulée (seul mouseData est lu)."""
+    
+    __slots__ = ("mouseData",)
+    
+    def __init__(self, mouse_data: int = 0):
+        self.mouseData = mouse_data
+
+
+class FakeMouse:
+    """Remplaçant de `pynput.mouse`: rejoue des messages dans le filtre du listener."""
+    
+    def __init__(self):
+        self.listeners: List['FakeMouse.Listener'] = []
+        self.started = 0
+        self.stopped = 0
+        fake = self
+        
+        class Listener:
+            def __init__(self, win32_event_filter: Callable):
+                self.win32_event_filter = win32_event_filter
+            
+            def start(self):
+                fake.started += 1
+                fake.listeners.append(self)
+            
+            def stop(self):
+                fake.stopped += 1
+                fake.listeners.remove(self)
+        
+        self.Listener = Listener
+    
+    def emit(self, msg: int, data: FakeMouseData):
+        for listener in self.listeners:
+            listener.win32_event_filter(msg, data)
@@ -0,0 +1,154 @@
+"""Tk simulé: mainloop, widgets et overlay sans affichage."""
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from overlay import OverlayWindow
+
+
+class FakeTkRoot:
+    """Mainloop Tk simulé: minuteries `after` et boucle bloquante.
+    
+    `iterations` compte les réveils du mainloop, `delays` les délais demandés
+    à `after`; `calls` enregistre les opérations sur la fenêtre avec le
+    thread qui les a faites.
+    """
+    
+    def __init__(self):
+        self.iterations = 0
+        self.delays: List[int] = []
+        self.calls: List[Tuple[str, tuple, int]] = []
+        self._cond = threading.Condition()
+        self._timers: List[Tuple[float, int, Callable]] = []
+        self._seq = itertools.count()
+        self._running = False
+    
+    def after(self, ms: int, callback: Callable):
+        self.delays.append(ms)
+        with self._cond:
+            heapq.heappush(self._timers, (time.monotonic() + ms / 1000, next(self._seq), callback))
+            self._cond.notify()
+    
+    def mainloop(self):
+        self._running = True
+        while True:
+            with self._cond:
+                while self._running and not (self._timers and self._timers[0][0] <= time.monotonic()):
+                    timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                self.iterations += 1
+                now = time.monotonic()
+                ready = []
+                while self._timers and self._timers[0][0] <= now:
+                    ready.append(heapq.heappop(self._timers)[2])
+            for callback in ready:
+                callback()
+    
+    def quit(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+    
+    def _record(self, name: str, args: tuple):
+        self.calls.append((name, args, threading.get_ident()))
+    
+    def geometry(self, *args):
+        self._record("geometry", args)
+    
+    def attributes(self, *args):
+        self._record("attributes", args)
+    
+    def withdraw(self):
+        self._record("withdraw", ())
+    
+    def deiconify(self):
+        self._record("deiconify", ())
+    
+    def destroy(self):
+        self._record("destroy", ())
+    
+    def winfo_screenwidth(self) -> int:
+        return 1920
+
+
+class FakeWidget:
+    """Widget Tk simulé (Label/Frame) pour mesurer l'overlay sans affichage."""
+    
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = dict(options)
+        self.packed_in = None
+        self.placed: Optional[Dict[str, int]] = None
+        self.destroyed = False
+    
+    def config(self, **options):
+        self.options.update(options)
+    
+    configure = config
+    
+    def pack(self, in_=None, **options):
+        self.packed_in = in_ if in_ is not None else self.master
+    
+    def pack_forget(self):
+        self.packed_in = None
+    
+    def place(self, **options):
+        self.placed = options
+    
+    def place_forget(self):
+        self.placed = None
+    
+    def destroy(self):
+        self.destroyed = True
+
+
+class HeadlessOverlay(OverlayWindow):
+    """Overlay dont les widgets sont simulés (aucun affichage nécessaire)."""
+    
+    LABEL_CLASS = FakeWidget
+    PHOTO_CLASS = FakeWidget
+    
+    def __init__(self):
+        super().__init__()
+        self.char_frame = FakeWidget()
+    
+    def render(self, characters, current_index: int, next_index: int, skipped=()) -> int:
+        self.update_display(characters, current_index, next_index, skipped)
+        self.drain()
+        return self.last_update_ops
+
+
+class FakeFontMetrics:
+    """Police proportionnelle simulée: largeur propre à chaque caractère.
+    
+    Compte les mesures réellement effectuées (`measures`) pour vérifier le
+    cache des métriques.
+    """
+    
+    NARROW = "iljtf.'[]!|"
+    WIDE = "WMmw@"
+    
+    def __init__(self):
+        self.measures = 0
+    
+    def char_width(self, size: int, char: str) -> float:
+        if char in self.NARROW:
+            return size * 0.3
+        if char in self.WIDE:
+            return size * 0.95
+        if char.isupper():
+            return size * 0.7
+        return size * 0.55
+    
+    def measure(self, font, text: str) -> int:
+        self.measures += 1
+        family, size, weight = font
+        width = sum(self.char_width(size, char) for char in text)
+        return int(width * (1.08 if weight == "bold" else 1.0) + 0.5)
+    
+    def linespace(self, font) -> int:
+        return int(font[1] * 1.6 + 0.5)
@@ -0,0 +1,35 @@
+"""Rosters prêts à l'emploi sur le bureau simulé."""
+from focus_strategies import FocusStrategyEngine
+from window_detector import WindowDetector
+from window_manager import WindowManager
+from window_registry import WindowRegistry
+
+from testing.fake_backend import DOFUS_TITLES, FakeBackend
+
+
+def make_roster(backend: FakeBackend, titles=DOFUS_TITLES, strategies=None) -> WindowManager:
+    """Crée un WindowManager dont les personnages pointent vers le bureau simulé."""
+    backend.populate_desktop(titles, other_processes=20)
+    detector = WindowDetector(backend)
+    if strategies is not None:
+        detector.focus_engine = FocusStrategyEngine(backend, strategies)
+    registry = WindowRegistry(detector)
+    registry.seed()
+    manager = WindowManager(detector)
+    manager.attach_registry(registry)
+    for i, window in enumerate(registry.get_windows()):
+        manager.add_character(f"P{i + 1}", window.hwnd, i)
+    return manager
+
+
+def count_focus(manager: WindowManager) -> list:
+    """Compte les appels à focus_window (une entrée par tentative)."""
+    attempts = []
+    focus_window = manager.detector.focus_window
+    
+    def counted(hwnd):
+        attempts.append(hwnd)
+        return focus_window(hwnd)
+    
+    manager.detector.focus_window = counted
+    return attempts
@@ -0,0 +1,49 @@
+"""Fixtures partagées: bureau Windows simulé et roster de personnages."""
+import pytest
+
+from testing import FakeBackend, FakeHookSource, RecordingKeyboard, make_roster
+from core_loop import CoreLoop
+from hook_watchdog import HookWatchdog
+from hotkey_manager import HotkeyManager
+from switch_dispatcher import SwitchDispatcher
+from window_detector import WindowDetector
+from window_manager import WindowManager
+
+
+@pytest.fixture
+def core():
+    """Boucle du cœur démarrée pour le test, arrêtée ensuite."""
+    loop = CoreLoop()
+    loop.start()
+    yield loop
+    loop.stop()
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend()
+
+
+@pytest.fixture
+def roster(backend):
+    """Fabrique de WindowManager: `roster(titles)` peuple le bureau simulé."""
+    def build(titles, strategies=None):
+        return make_roster(backend, titles, strategies)
+    return build
+
+
+@pytest.fixture
+def keyboard():
+    return RecordingKeyboard()
+
+
+@pytest.fixture
+def hotkeys(backend, keyboard, core):
+    """Fabrique de HotkeyManager branché sur le clavier simulé (et éventuellement la souris)."""
+    def build(mouse_module=None):
+        manager = WindowManager(WindowDetector(backend))
+        dispatcher = SwitchDispatcher(manager)
+        watchdog = HookWatchdog(FakeHookSource(), budget_ms=300)
+        dispatcher.core = watchdog.core = core
+        return HotkeyManager(manager, dispatcher, watchdog, keyboard_module=keyboard, mouse_module=mouse_module)
+    return build
@@ -0,0 +1,114 @@
+"""Boucle du cœur: minuteries, couloirs et composants qui s'y exécutent."""
+import threading
+import time
+
+from testing import make_roster
+from core_loop import CoreLoop
+from process_scheduler import PRIORITIES, ProcessPolicy, ProcessScheduler
+from switch_dispatcher import SwitchDispatcher
+
+
+def test_later_keeps_only_the_last_request(core):
+    calls = []
+    for value in range(5):
+        core.later("save", 0.02, lambda value=value: calls.append(value))
+    time.sleep(0.08)
+    assert calls == [4]
+
+
+def test_offload_runs_each_lane_in_order_off_the_loop(core):
+    seen = []
+    done = threading.Event()
+    for value in range(20):
+        core.offload("a", lambda value=value: seen.append((value, threading.current_thread().name)))
+    core.offload("a", done.set)
+    assert done.wait(1.0)
+    assert [value for value, _ in seen] == list(range(20))
+    assert {name for _, name in seen} == {"core-a_0"}
+
+
+def test_blocked_lane_does_not_delay_the_loop_or_other_lanes(core):
+    core.offload("slow", time.sleep, 0.3)
+    relayed = threading.Event()
+    other = threading.Event()
+    start = time.perf_counter()
+    core.call(relayed.set)
+    core.offload("fast", other.set)
+    assert relayed.wait(1.0) and other.wait(1.0)
+    assert time.perf_counter() - start < 0.1
+
+
+def test_periodic_timers_share_wakeups(core):
+    fired = []
+    short = core.every(0.05, lambda: fired.append(("short", core.loop.time())))
+    long = core.every(0.1, lambda: fired.append(("long", core.loop.time())))
+    time.sleep(0.33)
+    short.cancel()
+    long.cancel()
+    short.join(1.0)
+    long.join(1.0)
+    # Échéances sur les multiples de la période: chaque échéance longue est aussi une échéance courte
+    longs = [round(when / 0.05) for kind, when in fired if kind == "long"]
+    shorts = {round(when / 0.05) for kind, when in fired if kind == "short"}
+    assert longs and all(tick % 2 == 0 and tick in shorts for tick in longs)
+    assert all(abs(when - round(when / 0.05) * 0.05) < 0.01 for _, when in fired)
+
+
+def test_join_waits_for_the_running_lane_call(core):
+    running = threading.Event()
+    finished = []
+    
+    def tick():
+        running.set()
+        time.sleep(0.05)
+        finished.append(True)
+    
+    periodic = core.every(0.01, tick, lane="work")
+    assert running.wait(1.0)
+    periodic.cancel()
+    periodic.join(1.0)
+    assert finished
+
+
+def test_stop_waits_for_lanes():
+    core = CoreLoop()
+    core.start()
+    finished = []
+    core.offload("work", lambda: (time.sleep(0.05), finished.append(True)))
+    core.stop()
+    assert finished and not core.running
+    assert core.offload("work", finished.append, False).cancelled()
+
+
+def test_dispatcher_coalesces_switches_in_its_lane(roster, core):
+    manager = roster([f"Perso{i} - Iop - 3" for i in range(4)])
+    dispatcher = SwitchDispatcher(manager)
+    dispatcher.core = core
+    block = threading.Event()
+    core.offload(SwitchDispatcher.LANE, block.wait, 1.0)
+    lanes = []
+    dispatcher.on_switched = lambda: lanes.append(threading.current_thread().name)
+    for _ in range(3):
+        dispatcher.submit_next()
+    block.set()
+    core.drain(SwitchDispatcher.LANE, 1.0)
+    assert manager.current_index == 3
+    assert dispatcher.executed == 1 and dispatcher.coalesced == 2
+    assert lanes == [f"core-{SwitchDispatcher.LANE}_0"]
+
+
+def test_scheduler_applies_latest_state_in_its_lane(backend, roster, core):
+    manager = roster([f"Perso{i} - Iop - 3" for i in range(3)])
+    clients = [(char.name, char.hwnd) for char in manager.characters]
+    scheduler = ProcessScheduler(backend, ProcessPolicy(), enabled=True)
+    scheduler.core = core
+    block = threading.Event()
+    core.offload(ProcessScheduler.LANE, block.wait, 1.0)
+    for _, hwnd in clients:
+        scheduler.notify(clients, hwnd)
+    block.set()
+    core.drain(ProcessScheduler.LANE, 1.0)
+    # Un seul passage, avec le dernier client actif
+    priorities = [backend.processes[backend.windows[hwnd].pid].priority for _, hwnd in clients]
+    assert priorities == [PRIORITIES["below_normal"]] * 2 + [PRIORITIES["above_normal"]]
+    assert backend.calls["set_process_priority"] == len(clients)
@@ -0,0 +1,69 @@
+"""Démarrage à chaud depuis l'instantané de détection, et repli sur l'énumération complète."""
+import pytest
+
+from detection_snapshot import DetectionSnapshot
+from testing import DOFUS_TITLES, FakeBackend
+from window_detector import WindowDetector
+
+
+@pytest.fixture
+def backend():
+    desktop = FakeBackend()
+    desktop.populate_desktop(DOFUS_TITLES, other_processes=200)
+    return desktop
+
+
+@pytest.fixture
+def snapshot(backend, tmp_path):
+    """Instantané enregistré après une première détection complète."""
+    saved = DetectionSnapshot(str(tmp_path / "detection_cache.json"))
+    detector = WindowDetector(backend)
+    assert saved.save(detector, detector.detect_windows())
+    return saved
+
+
+def titles(windows):
+    return sorted(w.title for w in windows)
+
+
+def test_valid_snapshot_gives_warm_start(backend, snapshot):
+    backend.reset_calls()
+    windows = snapshot.load_windows(WindowDetector(backend))
+    warm_calls = sum(backend.calls.values())
+    
+    backend.reset_calls()
+    WindowDetector(backend).detect_windows()
+    assert snapshot.last_load_was_warm
+    assert titles(windows) == sorted(DOFUS_TITLES)
+    assert warm_calls * 5 < sum(backend.calls.values())
+    assert backend.calls["enum_windows"] == 1
+
+
+def test_closed_client_falls_back_to_full_detection(backend, snapshot):
+    closed = next(w for w in backend.windows.values() if w.title == DOFUS_TITLES[0])
+    backend.kill_process(closed.pid)
+    
+    windows = snapshot.load_windows(WindowDetector(backend))
+    assert not snapshot.last_load_was_warm
+    assert titles(windows) == sorted(DOFUS_TITLES[1:])
+    # L'instantané est réécrit: le lancement suivant repart à chaud
+    snapshot.load_windows(WindowDetector(backend))
+    assert snapshot.last_load_was_warm
+
+
+def test_reused_pid_invalidates_snapshot(backend, snapshot):
+    client = next(w for w in backend.windows.values() if w.title == DOFUS_TITLES[0])
+    backend.kill_process(client.pid)
+    backend.create_window(backend.spawn_process("Dofus.exe", pid=client.pid).pid, DOFUS_TITLES[0])
+    
+    assert snapshot.restore(WindowDetector(backend)) is None
+
+
+@pytest.mark.parametrize("content", ["", "{pas du json", '{"version": 0, "clients": [[1, 2, 3, "x"]]}'])
+def test_unreadable_snapshot_is_ignored(backend, tmp_path, content):
+    path = tmp_path / "detection_cache.json"
+    path.write_text(content, encoding="utf-8")
+    snapshot = DetectionSnapshot(str(path))
+    
+    assert titles(snapshot.load_windows(WindowDetector(backend))) == sorted(DOFUS_TITLES)
+    assert not snapshot.last_load_was_warm
@@ -0,0 +1,124 @@
+"""Mode focus: budget par switch, travail différé et réaffichage des clients."""
+import random
+
+import pytest
+
+from focus_mode import FocusMode
+from focus_strategies import AltKeyStrategy
+from testing import FakeBackend, make_roster
+
+
+@pytest.fixture
+def now():
+    """Horloge simulée, avancée par la latence de chaque appel système."""
+    return [0.0]
+
+
+@pytest.fixture
+def backend(now):
+    def advance(delay):
+        now[0] += delay
+    return FakeBackend(latency={"show_window": 0.0015, "cloak_window": 0.0003}, jitter=0.3, sleep=advance)
+
+
+@pytest.fixture
+def focused(backend, now):
+    """Fabrique de roster avec le mode focus activé selon `method`."""
+    def build(method=FocusMode.MINIMIZE, budget_ms=FocusMode.DEFAULT_BUDGET_MS):
+        manager = make_roster(backend, strategies=[AltKeyStrategy()])
+        manager.focus_mode = FocusMode(backend, method, budget_ms, enabled=True, clock=lambda: now[0])
+        return manager
+    return build
+
+
+def hidden_windows(backend, manager):
+    return {c.hwnd for c in manager.characters
+            if backend.windows[c.hwnd].iconic or backend.windows[c.hwnd].cloaked}
+
+
+def kept(manager):
+    return {manager.get_current_character().hwnd, manager.characters[manager.get_next_index()].hwnd}
+
+
+@pytest.mark.parametrize("method", [FocusMode.MINIMIZE, FocusMode.CLOAK])
+def test_switch_cost_stays_within_budget(focused, method):
+    manager = focused(method)
+    rng = random.Random(5)
+    for _ in range(300):
+        if rng.random() < 0.3:
+            manager.switch_to_position(rng.randrange(len(manager.characters)))
+        else:
+            manager.switch_by(1)
+        manager.settle_focus_mode()
+    
+    costs = manager.focus_mode.costs
+    assert costs and max(costs) <= manager.focus_mode.budget_ms
+
+
+@pytest.mark.parametrize("method", [FocusMode.MINIMIZE, FocusMode.CLOAK])
+def test_only_current_and_next_stay_shown(focused, backend, method):
+    manager = focused(method)
+    for _ in range(3):
+        manager.switch_to_next()
+        manager.settle_focus_mode()
+        hidden = hidden_windows(backend, manager)
+        assert hidden == {c.hwnd for c in manager.characters} - kept(manager)
+        assert set(manager.focus_mode.hidden) == hidden
+        assert all(method == used for used in manager.focus_mode.hidden.values())
+
+
+def test_settle_finishes_deferred_hiding(focused, backend):
+    # Budget d'une seule opération: le reste attend que le thread de switch soit au repos
+    manager = focused(budget_ms=2.5)
+    assert manager.switch_to_next()
+    focus_mode = manager.focus_mode
+    assert focus_mode.pending and focus_mode.deferred == 1
+    assert len(hidden_windows(backend, manager)) < len(manager.characters) - 2
+    
+    assert manager.settle_focus_mode()
+    assert not focus_mode.pending
+    assert hidden_windows(backend, manager) == {c.hwnd for c in manager.characters} - kept(manager)
+    assert not manager.settle_focus_mode()
+
+
+def test_disabling_restores_every_client(focused, backend):
+    manager = focused()
+    manager.switch_to_next()
+    manager.settle_focus_mode()
+    assert hidden_windows(backend, manager)
+    
+    manager.focus_mode.from_dict({"enabled": False})
+    assert not hidden_windows(backend, manager)
+    assert not manager.focus_mode.hidden
+
+
+def test_method_change_restores_with_previous_method(focused, backend):
+    manager = focused(FocusMode.CLOAK)
+    manager.switch_to_next()
+    manager.settle_focus_mode()
+    
+    manager.focus_mode.from_dict({"enabled": True, "method": FocusMode.MINIMIZE})
+    assert not any(backend.windows[c.hwnd].cloaked for c in manager.characters)
+    assert manager.focus_mode.method == FocusMode.MINIMIZE
+
+
+def test_direct_jump_reveals_hidden_target_first(focused, backend):
+    manager = focused()
+    manager.switch_to_next()
+    manager.settle_focus_mode()
+    target = next(i for i, c in enumerate(manager.characters) if c.hwnd in manager.focus_mode.hidden)
+    
+    assert manager.switch_to_position(target)
+    assert not backend.windows[manager.characters[target].hwnd].iconic
+    assert backend.foreground == manager.characters[target].hwnd
+
+
+def test_closed_window_is_forgotten(focused):
+    manager = focused(budget_ms=2.5)
+    manager.switch_to_next()
+    focus_mode = manager.focus_mode
+    hwnd = next(c.hwnd for c in manager.characters if c.hwnd not in kept(manager))
+    
+    focus_mode.forget(hwnd)
+    assert hwnd not in focus_mode.hidden
+    assert all(op_hwnd != hwnd for _, op_hwnd in focus_mode._pending)
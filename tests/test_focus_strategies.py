@@ -0,0 +1,116 @@
+"""Moteur de stratégies de focus sur le bureau simulé: succès, refus et repli."""
+import time
+
+from focus_strategies import AltKeyStrategy, FocusStrategyEngine, StrategyStats, SwitchToThisWindowStrategy
+from testing import FakeBackend
+
+
+def make_engine(backend, strategies=None):
+    """Moteur sur une fenêtre Dofus du bureau simulé; retourne aussi son hwnd."""
+    window = backend.add_dofus_client("Perso - Iop - 3.0")
+    return FocusStrategyEngine(backend, strategies), window.hwnd
+
+
+def test_focus_confirms_with_first_strategy(backend):
+    engine, hwnd = make_engine(backend)
+    
+    assert engine.focus(hwnd)
+    assert backend.foreground == hwnd
+    assert engine.last_strategy == engine.strategies[0].name
+    assert engine.metrics.confirmed == 1
+
+
+def test_refused_strategy_falls_back_to_next():
+    backend = FakeBackend(refusal={"set_foreground_window+alt": 1.0})
+    engine, hwnd = make_engine(backend, [AltKeyStrategy(), SwitchToThisWindowStrategy()])
+    engine.verify_timeout_ms = 10
+    
+    assert engine.focus(hwnd)
+    assert engine.last_strategy == "switch_to_this_window"
+    assert engine.stats["alt_key"].successes == 0
+    assert engine.stats["switch_to_this_window"].successes == 1
+
+
+def test_delayed_activation_is_confirmed_before_returning():
+    backend = FakeBackend(activation_delay=0.02)
+    engine, hwnd = make_engine(backend)
+    
+    assert engine.focus(hwnd)
+    assert backend.get_foreground_window() == hwnd
+    assert engine.stats[engine.strategies[0].name].attempts == 1
+
+
+def test_total_refusal_stays_within_budget():
+    backend = FakeBackend(refusal={"set_foreground_window+alt": 1.0, "set_foreground_window+attached": 1.0,
+                                   "switch_to_this_window": 1.0, "show_window_restore": 1.0})
+    engine, hwnd = make_engine(backend)
+    engine.focus_budget_ms = 60
+    
+    start = time.perf_counter()
+    assert not engine.focus(hwnd)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    # Sans budget, 4 stratégies × 100 ms de vérification dépasseraient 400 ms
+    assert elapsed_ms < engine.focus_budget_ms + 30
+    assert engine.metrics.failed == 1
+    assert sum(stats.attempts for stats in engine.stats.values()) < len(engine.strategies)
+
+
+def test_budget_round_trips_through_config(backend):
+    engine, _ = make_engine(backend)
+    engine.focus_budget_ms = 120
+    
+    restored = FocusStrategyEngine(backend)
+    restored.from_dict(engine.to_dict())
+    assert restored.focus_budget_ms == 120
+    
+    restored.from_dict({})
+    assert restored.focus_budget_ms == FocusStrategyEngine.DEFAULT_FOCUS_BUDGET_MS
+
+
+REFUSE_ALL_BUT_RESTORE = {"set_foreground_window": 1.0, "set_foreground_window+alt": 1.0,
+                          "set_foreground_window+attached": 1.0, "switch_to_this_window": 1.0}
+
+
+def test_minimize_fallback_is_off_by_default():
+    backend = FakeBackend(refusal=REFUSE_ALL_BUT_RESTORE)
+    engine, hwnd = make_engine(backend)
+    engine.verify_timeout_ms = 5
+    
+    assert not engine.focus(hwnd)
+    assert backend.calls["show_window"] == 0
+    assert engine.stats["minimize_restore"].attempts == 0
+
+
+def test_minimize_fallback_runs_last_when_enabled():
+    backend = FakeBackend(refusal=REFUSE_ALL_BUT_RESTORE)
+    engine, hwnd = make_engine(backend)
+    engine.verify_timeout_ms = 5
+    engine.minimize_fallback = True
+    
+    # Même après avoir réussi, le repli reste derrière les stratégies classées
+    for _ in range(2):
+        assert engine.focus(hwnd)
+        assert engine.last_strategy == "minimize_restore"
+        backend.foreground = 0
+    assert all(engine.stats[s.name].attempts == 2 for s in engine.strategies)
+    assert "minimize_restore" not in [s.name for s in engine.ranked()]
+
+
+def test_strategy_stats_round_trip_keeps_errors():
+    stats = StrategyStats(attempts=7, successes=5, latency_ms=1.5, errors=2, last_error="accès refusé")
+    
+    restored = StrategyStats.from_dict(stats.to_dict())
+    assert (restored.attempts, restored.successes, restored.latency_ms) == (7, 5, 1.5)
+    assert (restored.errors, restored.last_error) == (2, "accès refusé")
+
+
+def test_engine_round_trip_keeps_fallback_settings(backend):
+    engine, _ = make_engine(backend)
+    engine.minimize_fallback = True
+    engine.stats["minimize_restore"].errors = 3
+    
+    restored = FocusStrategyEngine(backend)
+    restored.from_dict(engine.to_dict())
+    assert restored.minimize_fallback
+    assert restored.stats["minimize_restore"].errors == 3
@@ -0,0 +1,140 @@
+"""Chien de garde du hook clavier: délestage, retour dans le hook et réinstallation."""
+import time
+
+import pytest
+
+import hook_watchdog
+from hook_watchdog import HookWatchdog, KeyboardHookSource
+from testing import FakeHookSource, RecordingKeyboard
+
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+
+@pytest.fixture
+def source(clock):
+    hook = FakeHookSource(clock=lambda: clock[0])
+    hook.install()
+    return hook
+
+
+@pytest.fixture
+def watchdog(source, clock, core):
+    dog = HookWatchdog(source, budget_ms=40, clock=lambda: clock[0])
+    dog.core = core
+    yield dog
+    dog.stop()
+
+
+def slow(delay, calls):
+    """Callback qui dure `delay[0]` secondes et note son exécution."""
+    def callback():
+        time.sleep(delay[0])
+        calls.append(delay[0])
+    return callback
+
+
+def test_single_slow_call_stays_in_hook(watchdog, source):
+    calls = []
+    source.add_hotkey("o", watchdog.wrap("o", slow([0.015], calls)))
+    
+    source.press("o")
+    assert not watchdog.stats["o"].offloaded
+    assert calls == [0.015]
+
+
+def test_repeated_slow_calls_are_offloaded(watchdog, source, core):
+    calls = []
+    source.add_hotkey("o", watchdog.wrap("o", slow([0.015], calls)))
+    
+    for _ in range(HookWatchdog.OFFLOAD_STREAK):
+        source.press("o")
+    stats = watchdog.stats["o"]
+    assert stats.offloaded
+    
+    start = time.perf_counter()
+    source.press("o")
+    assert time.perf_counter() - start < 0.005  # le hook ne fait plus que déposer l'appel
+    core.drain(HookWatchdog.OFFLOAD_LANE)
+    assert stats.offloaded_calls == 1 and len(calls) == HookWatchdog.OFFLOAD_STREAK + 1
+
+
+def test_fast_call_resets_slow_streak(watchdog, source):
+    delay = [0.015]
+    source.add_hotkey("o", watchdog.wrap("o", slow(delay, [])))
+    
+    for _ in range(HookWatchdog.OFFLOAD_STREAK - 1):
+        source.press("o")
+    delay[0] = 0.0
+    source.press("o")
+    delay[0] = 0.015
+    for _ in range(HookWatchdog.OFFLOAD_STREAK - 1):
+        source.press("o")
+    assert not watchdog.stats["o"].offloaded
+
+
+def test_offloaded_callback_recovers_once_fast_again(watchdog, source, core):
+    delay = [0.015]
+    source.add_hotkey("o", watchdog.wrap("o", slow(delay, [])))
+    for _ in range(HookWatchdog.OFFLOAD_STREAK):
+        source.press("o")
+    assert watchdog.stats["o"].offloaded
+    
+    delay[0] = 0.0
+    for _ in range(HookWatchdog.RECOVER_STREAK):
+        source.press("o")
+    core.drain(HookWatchdog.OFFLOAD_LANE)
+    assert not watchdog.stats["o"].offloaded
+    
+    source.press("o")
+    assert watchdog.stats["o"].offloaded_calls == HookWatchdog.RECOVER_STREAK
+
+
+def test_stop_waits_for_offloaded_callbacks(watchdog, source):
+    calls = []
+    source.add_hotkey("o", watchdog.wrap("o", slow([0.015], calls)))
+    for _ in range(HookWatchdog.OFFLOAD_STREAK + 2):
+        source.press("o")
+    
+    watchdog.stop()
+    assert len(calls) == HookWatchdog.OFFLOAD_STREAK + 2
+
+
+def test_dropped_hook_is_reinstalled_and_hotkeys_registered_again(watchdog, source, clock):
+    calls = []
+    
+    def register():
+        source.add_hotkey("tab", watchdog.wrap("tab", lambda: calls.append("tab")))
+    
+    watchdog.on_hook_reinstalled = register
+    register()
+    
+    clock[0] += 5
+    source.drop()
+    assert not source.press("tab")
+    clock[0] += 2
+    assert watchdog.check()
+    assert watchdog.reinstalls == 1 and source.installs == 2
+    assert source.press("tab") and calls == ["tab"]
+
+
+def test_no_probe_while_hook_receives_input(watchdog, source, clock):
+    source.add_hotkey("tab", watchdog.wrap("tab", lambda: None))
+    clock[0] += 20
+    source.press("tab")
+    
+    assert not watchdog.check()
+    assert source.probes == 0
+
+
+def test_keyboard_source_reinstalls_through_public_api(monkeypatch):
+    keyboard = RecordingKeyboard()
+    monkeypatch.setattr(hook_watchdog, "keyboard", keyboard)
+    source = KeyboardHookSource()
+    source.install()
+    
+    source.reinstall()
+    assert keyboard.operations == [("hook",), ("unhook_all",), ("hook",)]
+    assert len(keyboard.handlers) == 1
@@ -0,0 +1,124 @@
+"""Réenregistrement différentiel des raccourcis et pages de positions pour les grands rosters."""
+import threading
+
+import pytest
+
+from hook_watchdog import HookWatchdog
+from hotkey_manager import HotkeyManager, position_binding
+from switch_dispatcher import SwitchDispatcher
+from testing import FakeHookSource
+
+
+def test_register_all_installs_a_single_hook(hotkeys, keyboard):
+    manager = hotkeys()
+    manager.register_all()
+    assert keyboard.operations == [("hook",)]
+    assert len(manager.registered_hotkeys) == 22  # 2 pages de 8 + 6
+
+
+def test_unchanged_bindings_produce_empty_diff(hotkeys):
+    manager = hotkeys()
+    manager.register_all()
+    assert manager.apply_bindings().empty
+
+
+def test_changed_key_is_added_and_old_one_removed(hotkeys):
+    manager = hotkeys()
+    manager.register_all()
+    manager.next_key = "a"
+    diff = manager.apply_bindings()
+    assert (diff.added, diff.removed, diff.rebound) == (["a"], ["`"], [])
+    assert "a" in manager.registered_hotkeys and "`" not in manager.registered_hotkeys
+
+
+def test_swapped_keys_are_only_rebound(hotkeys, keyboard):
+    manager = hotkeys()
+    manager.register_all()
+    manager.next_key, manager.previous_key = manager.previous_key, manager.next_key
+    diff = manager.apply_bindings()
+    assert sorted(diff.rebound) == sorted([manager.next_key, manager.previous_key])
+    assert not diff.added and not diff.removed
+    
+    fired = []
+    manager.dispatcher.submit_next = lambda: fired.append("next")
+    manager.dispatcher.submit_previous = lambda: fired.append("previous")
+    keyboard.press(manager.next_key)
+    keyboard.press(manager.previous_key)
+    assert fired == ["next", "previous"]
+
+
+def test_untouched_hotkey_stays_active_during_reconfiguration(hotkeys, keyboard):
+    manager = hotkeys()
+    fired = []
+    manager.dispatcher.submit_position = lambda position: fired.append(position)
+    manager.register_all()
+    first = list(keyboard.operations)
+    
+    stop = threading.Event()
+    missed = []
+    
+    def press_f1():
+        while not stop.is_set():
+            before = len(fired)
+            keyboard.press("f1")
+            if len(fired) == before:
+                missed.append(1)
+    
+    presser = threading.Thread(target=press_f1)
+    presser.start()
+    try:
+        for i in range(200):
+            manager.toggle_overlay_key = "ctrl+alt+o" if i % 2 else "ctrl+alt+p"
+            manager.quit_key = "ctrl+alt+q" if i % 3 else "ctrl+alt+w"
+            manager.apply_bindings()
+    finally:
+        stop.set()
+        presser.join()
+    assert fired and not missed
+    assert keyboard.operations == first
+
+
+@pytest.fixture
+def paged(roster, keyboard, core):
+    """HotkeyManager sur un roster de `size` personnages, avec 4 pages et positions enregistrées."""
+    def build(size):
+        titles = [f"Perso{i} - {['Iop', 'Cra', 'Eniripsa', 'Sacrieur'][i % 4]} - 3.0" for i in range(size)]
+        manager = roster(titles)
+        dispatcher = SwitchDispatcher(manager)
+        watchdog = HookWatchdog(FakeHookSource(), budget_ms=300)
+        dispatcher.core = watchdog.core = core
+        hotkeys = HotkeyManager(manager, dispatcher, watchdog, keyboard_module=keyboard)
+        hotkeys.page_modifiers = ["", "shift", "ctrl+shift", "alt+shift"]
+        positions = []
+        dispatcher.submit_position = positions.append
+        hotkeys.register_all()
+        return hotkeys, positions
+    return build
+
+
+@pytest.mark.parametrize("size", [8, 16, 32])
+def test_every_position_has_a_direct_binding(paged, keyboard, size):
+    hotkeys, positions = paged(size)
+    for position in range(size):
+        keyboard.press(position_binding(position, hotkeys.position_keys, hotkeys.page_modifiers))
+    assert positions == list(range(size))
+
+
+@pytest.mark.parametrize("size", [8, 16, 32])
+def test_leader_key_cycles_pages(paged, keyboard, size):
+    hotkeys, positions = paged(size)
+    hotkeys.page_key = "ctrl+alt+p"
+    hotkeys.apply_bindings()
+    
+    for _ in range(hotkeys.page_count()):
+        keyboard.press("f1")
+        keyboard.press("ctrl+alt+p")
+    assert positions == list(range(0, size, 8))
+    assert hotkeys.page == 0
+
+
+def test_positions_beyond_last_page_have_no_binding():
+    keys = [f"f{i}" for i in range(1, 9)]
+    assert position_binding(8, keys, ["", "shift"]) == "shift+f1"
+    assert position_binding(16, keys, ["", "shift"]) is None
+    assert position_binding(0, [], [""]) is None
@@ -0,0 +1,83 @@
+"""Table de raccourcis précompilée: mêmes déclenchements que la comparaison raccourci par raccourci."""
+import random
+
+import pytest
+
+from hotkey_table import MODIFIER_NAMES, HotkeyTable, split_binding
+from testing import FakeKeyboardLayout
+
+
+@pytest.fixture
+def layout():
+    return FakeKeyboardLayout()
+
+
+def all_bindings(layout):
+    keys = [name for name in layout.SCAN_CODES if name not in MODIFIER_NAMES and not name.startswith("right")]
+    modifiers = ["", "ctrl+", "shift+", "alt+", "ctrl+alt+", "ctrl+shift+", "alt+shift+", "windows+",
+                 "ctrl+alt+shift+", "windows+shift+", "windows+ctrl+", "windows+alt+"]
+    return [mod + key for mod in modifiers for key in keys]
+
+
+def linear_dispatch(layout, bindings, events):
+    """Référence: chaque frappe est comparée à chaque raccourci (comme add_hotkey)."""
+    combos = [(frozenset(layout.resolve(n)[0] for n in split_binding(b)), b) for b in bindings]
+    pressed = set()
+    hits = []
+    for event in events:
+        if event.event_type == "down":
+            pressed.add(event.scan_code)
+            hits.extend(binding for combo, binding in combos if combo == pressed)
+        else:
+            pressed.discard(event.scan_code)
+    return hits
+
+
+@pytest.mark.parametrize("count", [8, 128, 512])
+def test_table_matches_linear_dispatch(layout, count):
+    candidates = all_bindings(layout)
+    bindings = candidates[:count]
+    hits = []
+    table = HotkeyTable(layout.resolve)
+    table.compile({binding: (lambda b=binding: hits.append(b)) for binding in bindings})
+    rng = random.Random(3)
+    events = []
+    while len(events) < 5000:
+        events.extend(layout.chord(rng.choice(candidates)))
+    
+    for event in events:
+        table.handle(event)
+    assert hits and hits == linear_dispatch(layout, bindings, events)
+
+
+def test_layout_keys_resolved_once_at_compile(layout):
+    table = HotkeyTable(layout.resolve)
+    table.compile({"&": lambda: None, "é": lambda: None, "ctrl+alt+o": lambda: None})
+    assert not table.errors
+    assert (2, 0) in table.table and (3, 0) in table.table
+    
+    lookups = layout.lookups
+    for event in layout.chord("é") * 100:
+        table.handle(event)
+    assert layout.lookups == lookups
+
+
+def test_invalid_bindings_are_reported_not_compiled(layout):
+    table = HotkeyTable(layout.resolve)
+    table.compile({"ctrl+alt": lambda: None, "f1+f2": lambda: None, "touche-inconnue": lambda: None,
+                   "mouse:x9": lambda: None, "f1": lambda: None})
+    
+    assert set(table.errors) == {"ctrl+alt", "f1+f2", "touche-inconnue", "mouse:x9"}
+    assert len(table.table) == 1
+
+
+def test_update_keeps_untouched_bindings(layout):
+    calls = []
+    table = HotkeyTable(layout.resolve)
+    table.compile({"f1": lambda: calls.append("f1"), "f2": lambda: calls.append("f2")})
+    
+    table.update({"f3": lambda: calls.append("f3")}, ["f2"])
+    for binding in ("f1", "f2", "f3"):
+        for event in layout.chord(binding):
+            table.handle(event)
+    assert calls == ["f1", "f3"]
@@ -0,0 +1,45 @@
+"""Réduction mémoire périodique des clients en arrière-plan."""
+import threading
+import time
+
+from memory_manager import MemoryManager
+
+
+def test_restart_never_overlaps_passes(backend, core):
+    memory = MemoryManager(backend, enabled=True)
+    memory.core = core
+    memory.interval = 0.002
+    running = set()
+    overlaps = []
+    lanes = set()
+    
+    def tick():
+        running.add(threading.get_ident())
+        if len(running) > 1:
+            overlaps.append(set(running))
+        lanes.add(threading.current_thread().name)
+        time.sleep(0.005)
+        running.discard(threading.get_ident())
+    
+    memory.tick = tick
+    for _ in range(5):
+        memory.start()
+        time.sleep(0.01)  # une passe est en cours pendant l'arrêt
+        memory.stop()
+        assert not running
+    assert not overlaps
+    assert lanes and all(name.startswith(f"core-{MemoryManager.LANE}") for name in lanes)
+
+
+def test_stop_cancels_further_passes(backend, core):
+    memory = MemoryManager(backend, enabled=True)
+    memory.core = core
+    memory.interval = 0.002
+    ticks = []
+    memory.tick = lambda: ticks.append(time.perf_counter())
+    memory.start()
+    time.sleep(0.05)
+    memory.stop()
+    count = len(ticks)
+    time.sleep(0.02)
+    assert count and len(ticks) == count
@@ -0,0 +1,74 @@
+"""Boutons de souris dans la table des raccourcis."""
+import pytest
+
+from testing import FakeMouse, FakeMouseData
+from mouse_input import WM_MBUTTONDOWN, WM_MOUSEHWHEEL, WM_MOUSEMOVE, WM_XBUTTONDOWN, XBUTTON1
+
+X1 = FakeMouseData(XBUTTON1 << 16)
+X2 = FakeMouseData(2 << 16)
+TILT_RIGHT = FakeMouseData(120 << 16)
+TILT_LEFT = FakeMouseData((-120 & 0xFFFF) << 16)
+MOVE = FakeMouseData()
+
+
+@pytest.fixture
+def mouse():
+    return FakeMouse()
+
+
+@pytest.fixture
+def actions():
+    return []
+
+
+@pytest.fixture
+def mouse_hotkeys(hotkeys, mouse, actions):
+    """Raccourcis clavier + souris; les actions déclenchées sont enregistrées dans `actions`."""
+    manager = hotkeys(mouse_module=mouse)
+    manager.dispatcher.submit_next = lambda: actions.append("next")
+    manager.dispatcher.submit_previous = lambda: actions.append("previous")
+    manager.dispatcher.submit_position = lambda position: actions.append(position)
+    manager.register_all()
+    manager.next_key = "mouse:x2"
+    manager.previous_key = "mouse:x1"
+    manager.position_keys[0] = "ctrl+mouse:middle"
+    manager.position_keys[1] = "mouse:tilt_right"
+    manager.apply_bindings()
+    return manager
+
+
+def test_keyboard_only_profile_installs_no_mouse_hook(hotkeys, mouse):
+    hotkeys(mouse_module=mouse).register_all()
+    assert not mouse.listeners
+
+
+def test_mouse_bindings_install_one_hook(mouse_hotkeys, mouse):
+    assert len(mouse.listeners) == 1
+    assert not mouse_hotkeys.table.errors
+
+
+def test_mixed_keyboard_and_mouse_stream(mouse_hotkeys, mouse, keyboard, actions):
+    mouse.emit(WM_XBUTTONDOWN, X2)
+    mouse.emit(WM_XBUTTONDOWN, X1)
+    mouse.emit(WM_MBUTTONDOWN, MOVE)  # sans Ctrl: aucun raccourci
+    ctrl_down, ctrl_up = keyboard.layout.chord("ctrl")
+    mouse_hotkeys.table.handle(ctrl_down)
+    mouse.emit(WM_MBUTTONDOWN, MOVE)  # Ctrl + clic molette
+    mouse_hotkeys.table.handle(ctrl_up)
+    mouse.emit(WM_MOUSEHWHEEL, TILT_RIGHT)
+    mouse.emit(WM_MOUSEHWHEEL, TILT_LEFT)
+    keyboard.press("f3")
+    assert actions == ["next", "previous", 0, 1, 2]
+
+
+def test_mouse_moves_trigger_nothing(mouse_hotkeys, mouse, actions):
+    for _ in range(1000):
+        mouse.emit(WM_MOUSEMOVE, MOVE)
+    assert actions == []
+
+
+def test_mouse_hook_removed_with_last_mouse_binding(mouse_hotkeys, mouse):
+    mouse_hotkeys.from_dict({})
+    mouse_hotkeys.apply_bindings()
+    assert not mouse.listeners
+    assert mouse.stopped == 1
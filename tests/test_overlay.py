@@ -0,0 +1,118 @@
+"""Overlay: rendu différentiel des widgets et opérations Tk faites dans le thread Tk."""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from testing import FakeTkRoot, HeadlessOverlay
+
+
+def names(size):
+    return [f"Perso{i}" for i in range(size)]
+
+
+@pytest.fixture
+def overlay():
+    return HeadlessOverlay()
+
+
+@pytest.mark.parametrize("size", [8, 16, 32])
+def test_unchanged_state_touches_no_widget(overlay, size):
+    assert overlay.render(names(size), 0, 1) > 0
+    assert overlay.render(names(size), 0, 1) == 0
+
+
+@pytest.mark.parametrize("size", [8, 16, 32])
+def test_cursor_move_touches_at_most_four_labels(overlay, size):
+    roster = names(size)
+    overlay.render(roster, 0, 1)
+    for step in range(1, 3 * size):
+        current = step % size
+        assert overlay.render(roster, current, (current + 1) % size) <= 4
+
+
+def test_rename_updates_label_text(overlay):
+    roster = names(8)
+    overlay.render(roster, 0, 1)
+    roster[4] = "Renommé"
+    assert overlay.render(roster, 0, 1) > 0
+    assert [label.options["text"] for label in overlay.labels[1:]] == roster[1:]
+
+
+def test_replaced_window_updates_badge(overlay):
+    mb = 1024 * 1024
+    overlay.set_resources(SimpleNamespace(version=1, published={10: (5.0, 100 * mb), 20: (40.0, 900 * mb)}))
+    roster = names(2)
+    overlay.update_display(roster, 0, 1, hwnds=[10, 11])
+    overlay.drain()
+    assert overlay.labels[0].options["text"].endswith("5% · 100 Mo")
+    
+    # Même nom, nouvelle fenêtre (client relancé): le badge suit le hwnd sans nouvelle mesure
+    overlay.update_display(roster, 0, 1, hwnds=[20, 11])
+    overlay.drain()
+    assert overlay.labels[0].options["text"].endswith("40% · 900 Mo")
+
+
+def test_labels_follow_roster_size(overlay):
+    roster = names(8)
+    overlay.render(roster, 0, 1)
+    overlay.render(roster + ["Nouveau"], 0, 1)
+    assert len(overlay.labels) == 9
+    assert overlay.labels[-1].options["text"] == "Nouveau"
+    overlay.render(roster, 0, 1)
+    assert len(overlay.labels) == 8
+    assert [label.options["text"] for label in overlay.labels[1:]] == roster[1:]
+
+
+@pytest.fixture
+def rooted(overlay):
+    """Overlay branché sur un mainloop simulé (sans le démarrer)."""
+    overlay.root = FakeTkRoot()
+    return overlay
+
+
+def test_window_settings_wait_for_tk_thread(rooted):
+    root = rooted.root
+    rooted.hide()
+    rooted.set_position(300, 40)
+    rooted.set_opacity(0.5)
+    rooted.from_dict({"position_x": 10, "position_y": 20, "opacity": 0.7})
+    assert root.calls == []
+    
+    rooted.drain()
+    assert [name for name, _, _ in root.calls] == ["withdraw", "geometry", "attributes", "geometry", "attributes"]
+    assert not rooted.visible
+
+
+def test_toggle_reads_visibility_when_applied(rooted):
+    rooted.toggle()
+    rooted.toggle()
+    rooted.drain()
+    assert [name for name, _, _ in rooted.root.calls] == ["withdraw", "deiconify"]
+    assert rooted.visible
+
+
+def test_drain_loop_backs_off_when_idle(rooted):
+    root = rooted.root
+    for _ in range(6):
+        rooted._drain_loop()
+    assert root.delays[-1] == rooted.IDLE_POLL_MS
+    assert root.delays == sorted(root.delays)
+    
+    rooted.update_display(names(8), 0, 1)
+    rooted._drain_loop()
+    assert root.delays[-1] == rooted.frame_interval_ms
+    rooted._drain_loop()
+    assert root.delays[-1] > rooted.frame_interval_ms
+
+
+def test_idle_overlay_wakes_a_few_times_per_second(rooted):
+    root = rooted.root
+    root.after(0, rooted._drain_loop)
+    thread = threading.Thread(target=root.mainloop)
+    thread.start()
+    time.sleep(1.0)
+    root.quit()
+    thread.join()
+    assert root.iterations <= 1000 / rooted.IDLE_POLL_MS + 4
@@ -0,0 +1,73 @@
+"""Mise en page de l'overlay sans Tk: largeurs mesurées et cache des métriques de police."""
+import pytest
+
+from overlay_layout import CachedFontMetrics, compute_layout
+from testing import FakeFontMetrics
+
+# Noms de même longueur mais de largeurs très différentes dans une police proportionnelle
+SHAPES = ["Iiilljt", "Mowwmwm", "Sadi-Perso", "WWMMWWM", "Eni", "Roublard-Perso"]
+MAX_WIDTH = 1900
+
+
+def names(size):
+    return [f"{SHAPES[i % len(SHAPES)]}{i}" for i in range(size)]
+
+
+@pytest.fixture
+def font():
+    return FakeFontMetrics()
+
+
+@pytest.mark.parametrize("size", [8, 16, 32])
+def test_labels_fit_their_measured_text(font, size):
+    roster = names(size)
+    layout = compute_layout(roster, CachedFontMetrics(font), "Arial", 14, MAX_WIDTH)
+    
+    for (x, _, width, _), name in zip(layout.labels, roster):
+        assert width >= font.measure(("Arial", 14, "bold"), f"[{name}]")
+        assert x + width <= MAX_WIDTH
+    assert layout.width == max(x + width for x, _, width, _ in layout.labels)
+    assert sum(len(row) for row in layout.rows) == size
+
+
+def test_narrow_names_get_narrower_labels(font):
+    layout = compute_layout(["Iiilljt", "WWMMWWM"], CachedFontMetrics(font), "Arial", 14)
+    assert layout.labels[0][2] < layout.labels[1][2]
+
+
+def test_long_roster_wraps_to_new_rows(font):
+    layout = compute_layout(names(32), CachedFontMetrics(font), "Arial", 14, 600)
+    
+    assert len(layout.rows) > 1
+    assert layout.height == len(layout.rows) * layout.labels[0][3]
+    # La flèche est répétée en début de ligne pour montrer que l'ordre continue
+    assert len(layout.arrows) == 31
+
+
+def test_measures_are_cached_per_font_and_text(font):
+    metrics = CachedFontMetrics(font)
+    compute_layout(names(16), metrics, "Arial", 14, MAX_WIDTH)
+    measures = font.measures
+    
+    for _ in range(10):
+        compute_layout(names(16), metrics, "Arial", 14, MAX_WIDTH)
+    assert font.measures == measures
+    assert metrics.hits > metrics.misses
+    
+    compute_layout(names(16), metrics, "Arial", 16, MAX_WIDTH)
+    assert font.measures > measures  # autre taille: nouvelles mesures
+
+
+def test_cache_evicts_least_recently_used(font):
+    metrics = CachedFontMetrics(font, maxsize=2)
+    bold = ("Arial", 14, "bold")
+    metrics.measure(bold, "a")
+    metrics.measure(bold, "b")
+    metrics.measure(bold, "a")
+    metrics.measure(bold, "c")  # évince « b »
+    
+    measures = font.measures
+    metrics.measure(bold, "a")
+    assert font.measures == measures
+    metrics.measure(bold, "b")
+    assert font.measures == measures + 1
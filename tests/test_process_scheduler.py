@@ -0,0 +1,44 @@
+"""Priorité et affinité des clients."""
+import pytest
+
+from process_scheduler import PRIORITIES, ProcessPolicy, ProcessScheduler
+
+
+def test_client_cores_keep_configured_names():
+    policy = ProcessPolicy(client_cores={"Iop-Perso": [0, 1]})
+    assert policy.to_dict()["client_cores"] == {"Iop-Perso": [0, 1]}
+    assert ProcessPolicy.from_dict(policy.to_dict()).client_cores == {"Iop-Perso": [0, 1]}
+
+
+def test_client_cores_lookup_ignores_case():
+    policy = ProcessPolicy(default_cores=[4, 5, 42], client_cores={"p1": [0, 1]})
+    plan = policy.plan([("P1", 10), ("P2", 11), ("P3", 0)], focused_pid=11, cpu_count=8)
+    assert plan == {10: (PRIORITIES["below_normal"], (0, 1)), 11: (PRIORITIES["above_normal"], (4, 5))}
+
+
+@pytest.fixture
+def clients(roster):
+    manager = roster([f"Perso{i} - Iop - 3" for i in range(3)])
+    return [(char.name, char.hwnd) for char in manager.characters]
+
+
+def test_failed_settings_are_retried(backend, clients):
+    scheduler = ProcessScheduler(backend, ProcessPolicy(default_cores=[0]), enabled=True)
+    set_affinity = backend.set_process_affinity
+    failures = []
+    
+    def flaky(pid, cores):
+        if not failures:
+            failures.append(pid)
+            raise OSError("appel interrompu")
+        set_affinity(pid, cores)
+    
+    backend.set_process_affinity = flaky
+    scheduler.apply(clients, clients[0][1])
+    assert scheduler.errors == 1
+    assert backend.processes[failures[0]].affinity != [0]
+    
+    scheduler.apply(clients, clients[0][1])
+    assert scheduler.errors == 1
+    assert all(backend.processes[backend.windows[hwnd].pid].affinity == [0] for _, hwnd in clients)
+    assert scheduler.apply(clients, clients[0][1]) == 0
@@ -0,0 +1,106 @@
+"""Rattachement des personnages quand les fenêtres des clients changent."""
+import threading
+
+import pytest
+
+from testing import DOFUS_TITLES, ScriptedEventSource
+
+
+@pytest.fixture
+def manager(roster):
+    return roster(DOFUS_TITLES)
+
+
+@pytest.fixture
+def events(backend, manager):
+    return ScriptedEventSource(backend, manager.registry)
+
+
+@pytest.fixture
+def closed(manager, events):
+    """Le premier client est fermé pendant que l'application tourne: son personnage reste sans fenêtre."""
+    events.close_client(manager.characters[0].hwnd)
+    manager.rebind_characters()
+    assert [c.name for c in manager.unmatched_characters] == ["P1"]
+    return manager.characters[0]
+
+
+@pytest.fixture
+def changes(manager, closed):
+    """Appels à on_change une fois le premier client fermé."""
+    calls = []
+    manager.on_change = lambda: calls.append(1)
+    return calls
+
+
+def test_relaunched_client_is_rebound(manager, events, changes):
+    window = events.launch_client(DOFUS_TITLES[0])
+    assert not manager.unmatched_characters
+    assert manager.characters[0].hwnd == window.hwnd
+    assert manager.turn_order.is_live(0)
+    assert changes
+
+
+def test_rename_of_bound_window_still_notifies(manager, events, changes):
+    hwnd = manager.characters[3].hwnd
+    events.rename(hwnd, "Eni-Perso - Eniripsa - 3.0.13")
+    assert changes
+    assert manager.characters[3].hwnd == hwnd
+    assert [c.name for c in manager.unmatched_characters] == ["P1"]
+
+
+def test_removed_window_does_not_trigger_rebind(manager, events, changes):
+    rebinds = manager.last_rebind
+    hwnd = manager.characters[5].hwnd
+    events.close_client(hwnd)
+    assert manager.last_rebind is rebinds
+    assert not manager.turn_order.is_live(5)
+    assert changes
+
+
+def test_unrelated_window_changes_nothing(manager, events, changes):
+    window = events.launch_client("Autre-Perso - Cra - 3.0.12")
+    assert [c.name for c in manager.unmatched_characters] == ["P1"]
+    assert window.hwnd not in manager.snapshot().index_by_hwnd
+    assert not changes
+
+
+def test_windows_are_enumerated_outside_the_write_lock(manager, monkeypatch):
+    enumerate_windows = manager._live_windows
+    lock_free = []
+    
+    def live_windows():
+        # Un autre thread (switch, registre) doit pouvoir écrire pendant l'énumération
+        def write():
+            acquired = manager._write_lock.acquire(timeout=0.5)
+            lock_free.append(acquired)
+            if acquired:
+                manager._write_lock.release()
+        
+        probe = threading.Thread(target=write)
+        probe.start()
+        probe.join()
+        return enumerate_windows()
+    
+    monkeypatch.setattr(manager, "_live_windows", live_windows)
+    manager.rebind_characters()
+    assert lock_free == [True]
+
+
+def test_roster_replaced_during_rebind_is_not_overwritten(manager, monkeypatch):
+    resolve = manager._resolve
+    calls = []
+    
+    def racing_resolve(characters, windows):
+        result = resolve(characters, windows)
+        if not calls:
+            # Un personnage est retiré pendant le calcul des empreintes
+            manager.remove_character(manager.characters[2].position)
+        calls.append(len(characters))
+        return result
+    
+    monkeypatch.setattr(manager, "_resolve", racing_resolve)
+    removed = manager.characters[2].name
+    manager.rebind_characters()
+    assert calls == [len(DOFUS_TITLES), len(DOFUS_TITLES) - 1]
+    assert removed not in [c.name for c in manager.characters]
@@ -0,0 +1,132 @@
+"""Échantillonnage des clients: une passe par tick, CPU relatif à la machine, historiques."""
+import time
+
+import pytest
+
+from resource_monitor import ResourceMonitor, RingBuffer, format_badge
+from testing import FakeBackend
+
+
+@pytest.fixture
+def clock():
+    return [0.0]
+
+
+@pytest.fixture
+def clients():
+    backend = FakeBackend(cpus=4)
+    windows = [backend.add_dofus_client(f"Perso{i} - Iop - 3.0") for i in range(3)]
+    return backend, windows
+
+
+@pytest.fixture
+def monitor(clients, clock):
+    backend, windows = clients
+    resources = ResourceMonitor(backend, enabled=True, clock=lambda: clock[0])
+    resources.set_roster([(window.hwnd, window.pid) for window in windows])
+    return resources
+
+
+def advance(backend, windows, clock, cpu_seconds=0.5, rss=200 * 1024 * 1024):
+    """Fait tourner chaque client `cpu_seconds` pendant une seconde d'horloge."""
+    clock[0] += 1.0
+    for window in windows:
+        process = backend.processes[window.pid]
+        process.cpu_time += cpu_seconds
+        process.rss = rss
+
+
+def test_each_tick_samples_all_clients_in_one_call(monitor, clients, clock):
+    backend, windows = clients
+    backend.reset_calls()
+    
+    for _ in range(3):
+        advance(backend, windows, clock)
+        monitor.tick()
+    assert backend.calls["sample_processes"] == 3
+    assert backend.calls["get_process_rss"] == 0
+
+
+def test_cpu_is_a_share_of_the_whole_machine(monitor, clients, clock):
+    backend, windows = clients
+    
+    assert monitor.tick() == 0  # il faut deux relevés pour un taux
+    advance(backend, windows, clock, cpu_seconds=2.0, rss=300 * 1024 * 1024)
+    assert monitor.tick() == 3
+    
+    cpu, rss = monitor.published[windows[0].hwnd]
+    assert cpu == pytest.approx(50.0)  # 2 s de CPU en 1 s sur 4 cœurs
+    assert rss == 300 * 1024 * 1024
+    assert format_badge(cpu, rss) == "50% · 300 Mo"
+
+
+def test_published_is_replaced_not_mutated(monitor, clients, clock):
+    backend, windows = clients
+    monitor.tick()
+    advance(backend, windows, clock)
+    monitor.tick()
+    
+    before = monitor.published
+    advance(backend, windows, clock)
+    monitor.tick()
+    assert monitor.published is not before
+    assert set(before) == set(monitor.published)
+
+
+def test_vanished_client_is_dropped(monitor, clients, clock):
+    backend, windows = clients
+    monitor.tick()
+    backend.kill_process(windows[0].pid)
+    advance(backend, windows[1:], clock)
+    
+    assert monitor.tick() == 2
+    assert windows[0].pid not in monitor.stats
+    assert windows[0].hwnd not in monitor.published
+
+
+def test_history_change_swaps_in_a_new_dict(monitor, clients, clock):
+    backend, windows = clients
+    monitor.tick()
+    old = monitor.stats
+    assert len(old) == 3
+    
+    monitor.from_dict({"enabled": True, "history": 10})
+    assert monitor.stats is not old and monitor.stats == {}
+    assert len(old) == 3  # un relevé en cours garde un dictionnaire cohérent
+    
+    advance(backend, windows, clock)
+    monitor.tick()
+    assert all(stats.cpu.size == 10 for stats in monitor.stats.values())
+
+
+def test_same_history_keeps_samples(monitor):
+    monitor.tick()
+    stats = monitor.stats
+    
+    monitor.from_dict(monitor.to_dict())
+    assert monitor.stats is stats
+
+
+def test_ring_buffer_wraps_in_order():
+    buffer = RingBuffer(3, "Q")
+    for value in range(5):
+        buffer.append(value)
+    
+    assert buffer.values() == [2, 3, 4]
+    assert buffer.latest() == 4
+    assert buffer.mean() == 3.0
+
+
+def test_stop_ends_periodic_sampling(monitor, core):
+    monitor.core = core
+    monitor.interval = 0.01
+    monitor.start()
+    deadline = time.monotonic() + 1.0
+    while monitor.ticks < 2 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert monitor.ticks >= 2
+    
+    monitor.stop()
+    ticks = monitor.ticks
+    time.sleep(0.05)
+    assert monitor.ticks == ticks
@@ -0,0 +1,74 @@
+"""Préchargement du prochain personnage pendant les temps morts du couloir de switch."""
+import pytest
+
+from focus_strategies import AltKeyStrategy
+from switch_dispatcher import SwitchDispatcher
+from testing import DOFUS_TITLES
+
+
+@pytest.fixture
+def manager(roster):
+    return roster(DOFUS_TITLES, strategies=[AltKeyStrategy()])
+
+
+@pytest.fixture
+def minimized(backend, manager):
+    """Minimise tous les clients sauf l'actif (comme après un Alt+Tab)."""
+    def minimize():
+        current = manager.get_current_character()
+        for char in manager.characters:
+            backend.windows[char.hwnd].iconic = char.hwnd != current.hwnd
+    return minimize
+
+
+def dispatcher_for(manager, core, prefetch):
+    dispatcher = SwitchDispatcher(manager, prefetch=prefetch)
+    dispatcher.core = core
+    return dispatcher
+
+
+def next_window(backend, manager):
+    return backend.windows[manager.characters[manager.get_next_index()].hwnd]
+
+
+def test_prefetch_restores_next_window_without_focus(backend, manager, minimized, core):
+    dispatcher = dispatcher_for(manager, core, prefetch=True)
+    minimized()
+    foreground = backend.foreground
+    
+    dispatcher.submit_prefetch()
+    core.drain(SwitchDispatcher.LANE, 1.0)
+    assert not next_window(backend, manager).iconic
+    assert backend.foreground == foreground
+    assert dispatcher.prefetched == 1
+
+
+def test_switch_after_prefetch_needs_no_restore(backend, manager, minimized, core):
+    dispatcher = dispatcher_for(manager, core, prefetch=True)
+    minimized()
+    dispatcher.submit_prefetch()
+    core.drain(SwitchDispatcher.LANE, 1.0)
+    target = next_window(backend, manager).hwnd
+    
+    backend.reset_calls()
+    assert manager.switch_to_next()
+    assert backend.foreground == target
+    assert backend.calls["show_window"] == 0
+
+
+def test_prefetch_disabled_leaves_windows_alone(backend, manager, minimized, core):
+    dispatcher = dispatcher_for(manager, core, prefetch=False)
+    minimized()
+    
+    dispatcher.submit_prefetch()
+    core.drain(SwitchDispatcher.LANE, 1.0)
+    assert next_window(backend, manager).iconic
+    assert dispatcher.prefetched == 0
+
+
+def test_prefetch_setting_round_trips(manager):
+    dispatcher = SwitchDispatcher(manager)
+    dispatcher.from_dict({"prefetch_next": True})
+    
+    assert dispatcher.prefetch
+    assert SwitchDispatcher(manager, prefetch=False).to_dict() == {"prefetch_next": False}
@@ -0,0 +1,60 @@
+"""Vignettes: tampons partagés avec le thread Tk et thread de capture."""
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from testing import SyntheticCaptureSource
+from thumbnails import ThumbnailScaler, ThumbnailScheduler
+
+
+def test_buffer_being_read_is_never_rewritten():
+    source = SyntheticCaptureSource(320, 180)
+    scaler = ThumbnailScaler(16, 9)
+    scaler.scale(1, source.capture(1))
+    held = scaler.acquire(1)
+    expected = held.copy()
+    outputs = [scaler.scale(1, source.capture(1)) for _ in range(5)]
+    assert all(output is not held for output in outputs)
+    assert np.array_equal(held, expected)
+    assert scaler.acquire(1) is outputs[-1]
+
+
+def test_acquire_returns_the_latest_thumbnail():
+    source = SyntheticCaptureSource(320, 180)
+    scaler = ThumbnailScaler(16, 9)
+    assert scaler.acquire(1) is None
+    first = scaler.scale(1, source.capture(1))
+    assert scaler.acquire(1) is first
+    scaler.forget(1)
+    assert scaler.acquire(1) is None
+
+
+def test_capture_thread_sleeps_until_roster_is_set():
+    scheduler = ThumbnailScheduler(SyntheticCaptureSource(64, 36), ThumbnailScaler(16, 9), captures_per_second=200)
+    ticks = []
+    tick = scheduler.tick
+    scheduler.tick = lambda: ticks.append(tick())
+    scheduler.start()
+    time.sleep(0.05)
+    assert not ticks
+    scheduler.set_roster([100, 101], 100, 101)
+    time.sleep(0.05)
+    assert ticks
+    scheduler.set_roster([], 0, 0)
+    time.sleep(0.02)
+    count = len(ticks)
+    time.sleep(0.05)
+    assert len(ticks) == count
+    scheduler.stop()
+    assert scheduler._thread is None
+
+
+def test_stop_wakes_an_idle_capture_thread():
+    scheduler = ThumbnailScheduler(SyntheticCaptureSource(64, 36), ThumbnailScaler(16, 9))
+    scheduler.start()
+    thread = scheduler._thread
+    scheduler.stop()
+    assert not thread.is_alive()
@@ -0,0 +1,86 @@
+"""Ordre de tour: sauts des fenêtres invalides et des personnages passés."""
+import random
+
+import pytest
+
+from testing import FakeWindow, count_focus
+from turn_order import TurnOrder
+
+
+def test_step_skips_invalid_and_skipped_positions():
+    order = TurnOrder(6)
+    order.set_valid(1, False)
+    order.set_skipped(2, True)
+    assert order.step(0, 1) == 3
+    assert order.step(3, -1) == 0
+    assert order.step(0, 2) == 4
+    assert order.step(0, -1) == 5
+
+
+def test_step_wraps_around_live_positions():
+    order = TurnOrder(4)
+    order.set_mask([True, False, True, False])
+    assert order.step(2, 1) == 0
+    assert order.step(0, 3) == 2  # 3 pas sur 2 positions vivantes
+    assert order.step(0, 2) == 0
+
+
+def test_no_live_position():
+    order = TurnOrder(3)
+    order.set_mask([False, False, False])
+    assert order.step(0, 1) == -1
+    assert order.next_live(1) == -1
+    assert TurnOrder(0).step(0, 1) == -1
+
+
+def test_insert_and_remove_shift_skipped_positions():
+    order = TurnOrder(4)
+    order.set_skipped(2, True)
+    order.insert(0, True)
+    assert order.skipped == {3}
+    order.remove(1)
+    assert order.skipped == {2}
+    order.remove(2)
+    assert not order.skipped and order.live_count == 3
+
+
+def test_copy_leaves_original_untouched():
+    order = TurnOrder(4)
+    copy = order.copy()
+    copy.set_valid(1, False)
+    copy.toggle_skip(2)
+    assert order.is_live(1) and order.is_live(2)
+    assert copy.step(0, 1) == 3
+
+
+@pytest.mark.parametrize("size", [1, 2, 8, 16, 32])
+def test_switch_never_lands_on_dead_position(backend, roster, size):
+    """Charge aléatoire: fenêtres fermées/rouvertes, personnages passés, fenêtres détruites sans événement."""
+    rng = random.Random(size)
+    manager = roster([f"Perso{i} - Iop - 3" for i in range(size)])
+    focus_attempts = count_focus(manager)
+    hwnds = [c.hwnd for c in manager.characters]
+    for cycle in range(1000):
+        if cycle % 250 == 0:
+            # Relance des clients fermés (comme après un rattachement)
+            for hwnd, char in zip(hwnds, manager.characters):
+                backend.windows.setdefault(hwnd, FakeWindow(hwnd, 0, char.name))
+            manager.validate_windows()
+        if rng.random() < 0.05:
+            manager.set_valid_window(hwnds[rng.randrange(size)], rng.random() < 0.5)
+        if rng.random() < 0.05:
+            manager.toggle_skip(rng.randrange(size))
+        if rng.random() < 0.02:
+            # Fenêtre fermée sans événement reçu: seul l'échec du focus la révèle
+            backend.destroy_window(manager.characters[rng.randrange(size)].hwnd)
+        before = sum(backend.calls.values())
+        switched = manager.switch_by(rng.choice((1, -1, 2, -3)))
+        attempts = len(focus_attempts)
+        focus_attempts.clear()
+        live = [i for i in range(size) if manager.turn_order.is_live(i)]
+        if switched:
+            assert manager.current_index in live
+        else:
+            assert not live or attempts == manager.MAX_FOCUS_ATTEMPTS
+        assert attempts <= manager.MAX_FOCUS_ATTEMPTS
+        assert sum(backend.calls.values()) - before <= 40 * manager.MAX_FOCUS_ATTEMPTS
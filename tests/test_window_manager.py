@@ -0,0 +1,137 @@
+"""Roster publié par instantanés: switchs, remplacements et lectures concurrents."""
+import random
+import threading
+import time
+
+import pytest
+
+from character_identity import CharacterFingerprint
+from window_manager import CharacterWindow, Roster
+
+TITLES = [f"Perso{i} - {['Iop', 'Cra', 'Eniripsa', 'Sacrieur'][i % 4]} - 3.0" for i in range(16)]
+
+
+@pytest.fixture
+def manager(roster):
+    return roster(TITLES)
+
+
+@pytest.fixture
+def rosters(manager):
+    """Deux rosters possibles: 16 personnages « A », ou 8 personnages « B » dans l'ordre inverse."""
+    windows = manager.registry.get_windows()
+    roster_a = [(f"A{i}", window.hwnd, i) for i, window in enumerate(windows)]
+    roster_b = [(f"B{i}", window.hwnd, i) for i, window in enumerate(reversed(windows[:8]))]
+    return roster_a, roster_b
+
+
+def check(snapshot, rosters):
+    """Vérifie qu'un instantané décrit entièrement l'un des rosters."""
+    names = tuple(snapshot.names())
+    expected = {tuple(name for name, _, _ in roster): roster for roster in rosters}.get(names)
+    assert expected is not None, f"roster mélangé: {names}"
+    assert [(c.name, c.hwnd, c.position) for c in snapshot.characters] == expected
+    assert 0 <= snapshot.current_index < len(names)
+    assert snapshot.turn_order.size == len(names)
+    assert all(snapshot.index_by_hwnd[c.hwnd] == i for i, c in enumerate(snapshot.characters))
+    assert snapshot.next_index() < len(names)
+
+
+def test_set_characters_publishes_whole_roster(manager, rosters):
+    roster_a, roster_b = rosters
+    manager.set_characters(roster_a)
+    manager.switch_to_position(12)
+    version = manager.snapshot().version
+    manager.set_characters(roster_b)
+    snapshot = manager.snapshot()
+    check(snapshot, rosters)
+    assert snapshot.version > version
+    assert snapshot.current_index < len(roster_b)
+
+
+def test_old_snapshot_is_never_modified(manager, rosters):
+    roster_a, roster_b = rosters
+    manager.set_characters(roster_a)
+    before = manager.snapshot()
+    manager.set_characters(roster_b)
+    manager.toggle_skip_current()
+    check(before, rosters)
+    assert before.names() == [name for name, _, _ in roster_a]
+    assert not before.turn_order.skipped
+
+
+def test_concurrent_switches_replacements_and_reads(manager, rosters):
+    roster_a, roster_b = rosters
+    manager.set_characters(roster_a)
+    windows = manager.registry.get_windows()
+    stop = threading.Event()
+    errors = []
+    
+    def worker(name, action):
+        rng = random.Random(name)
+        try:
+            while not stop.is_set():
+                action(rng)
+        except Exception as e:
+            errors.append(f"{name}: {e!r}")
+            stop.set()
+    
+    def switch(rng):
+        if rng.random() < 0.7:
+            manager.switch_by(rng.choice((1, -1, 2)))
+        else:
+            manager.switch_to_position(rng.randrange(16))
+    
+    def replace(rng):
+        manager.set_characters(roster_b if rng.random() < 0.5 else roster_a)
+        time.sleep(0.0005)
+    
+    def event(rng):
+        window = rng.choice(windows)
+        manager.set_valid_window(window.hwnd, rng.random() < 0.7)
+        if rng.random() < 0.2:
+            manager.toggle_skip_current()
+    
+    def read(rng):
+        # Comme _update_overlay: un instantané, puis uniquement lui
+        check(manager.snapshot(), rosters)
+    
+    actions = [("switch-1", switch), ("switch-2", switch), ("replace", replace), ("event", event), ("read", read)]
+    threads = [threading.Thread(target=worker, args=action) for action in actions]
+    for thread in threads:
+        thread.start()
+    stop.wait(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    assert not errors, errors
+    check(manager.snapshot(), rosters)
+
+
+def assert_same_indexes(roster):
+    reference = Roster(roster.characters)
+    for name in ("index_by_position", "index_by_name", "index_by_hwnd", "index_by_pid"):
+        assert dict(getattr(roster, name)) == dict(getattr(reference, name)), name
+
+
+def test_incremental_roster_matches_full_rebuild():
+    rng = random.Random(7)
+    roster = Roster()
+    history = [roster]
+    for step in range(600):
+        action = rng.random()
+        if action < 0.5 or not len(roster):
+            position = rng.randrange(60)
+            # Noms et PID parfois partagés: chaque index garde la première occurrence
+            fingerprint = CharacterFingerprint(pid=rng.randrange(1, 40)) if rng.random() < 0.7 else None
+            roster = roster.added(CharacterWindow(f"P{rng.randrange(50)}", 1000 + step, position, fingerprint))
+        elif action < 0.8:
+            roster = roster.removed(rng.choice(roster.positions))
+        else:
+            roster = roster.renamed(rng.choice(roster.positions), f"p{rng.randrange(50)}")
+        history.append(roster)
+        assert_same_indexes(roster)
+    # Les rosters dérivés n'ont jamais modifié ceux dont ils partagent les index
+    for old in history[::50]:
+        assert_same_indexes(old)
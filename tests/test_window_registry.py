@@ -0,0 +1,79 @@
+"""Registre événementiel: ouverture, renommage et fermeture d'un client sans re-scan."""
+import pytest
+
+from testing import DOFUS_TITLES, FakeBackend, ScriptedEventSource
+from window_detector import WindowDetector
+from window_registry import EVENT_OBJECT_HIDE, EVENT_OBJECT_SHOW, WindowChange, WindowRegistry
+
+
+@pytest.fixture
+def backend():
+    desktop = FakeBackend()
+    desktop.populate_desktop(DOFUS_TITLES, other_processes=200)
+    return desktop
+
+
+@pytest.fixture
+def registry(backend):
+    windows = WindowRegistry(WindowDetector(backend))
+    windows.seed()
+    return windows
+
+
+@pytest.fixture
+def changes(registry):
+    received = []
+    registry.subscribe(received.append)
+    return received
+
+
+@pytest.fixture
+def events(backend, registry):
+    return ScriptedEventSource(backend, registry)
+
+
+def test_seed_finds_every_client(registry):
+    assert sorted(w.title for w in registry.get_windows()) == sorted(DOFUS_TITLES)
+
+
+def test_client_lifecycle_is_followed_by_events(registry, events, changes):
+    window = events.launch_client("Nouveau - Cra - 3.0.12")
+    assert registry.contains(window.hwnd)
+    events.rename(window.hwnd, "Nouveau - Cra - 3.0.13")
+    assert registry.get(window.hwnd).title == "Nouveau - Cra - 3.0.13"
+    events.close_client(window.hwnd)
+    
+    assert not registry.contains(window.hwnd)
+    assert [c.kind for c in changes] == [WindowChange.ADDED, WindowChange.RENAMED, WindowChange.REMOVED]
+    assert changes[1].old_title == "Nouveau - Cra - 3.0.12"
+
+
+def test_other_applications_are_ignored(backend, registry, events, changes):
+    noise = [backend.create_window(backend.spawn_process("chrome.exe").pid, "Onglet") for _ in range(20)]
+    for window in noise:
+        events.emit(EVENT_OBJECT_SHOW, window.hwnd)
+    
+    assert not changes
+    assert len(registry.windows) == len(DOFUS_TITLES)
+
+
+def test_events_cost_far_less_than_a_rescan(backend, registry, events):
+    backend.reset_calls()
+    window = events.launch_client("Nouveau - Cra - 3.0.12")
+    events.rename(window.hwnd, "Nouveau - Cra - 3.0.13")
+    events.close_client(window.hwnd)
+    event_calls = sum(backend.calls.values())
+    
+    backend.reset_calls()
+    registry.detector.detect_windows()
+    assert event_calls * 10 < sum(backend.calls.values())
+
+
+def test_hidden_then_shown_client_comes_back(registry, events, changes):
+    hwnd = registry.get_windows()[0].hwnd
+    events.emit(EVENT_OBJECT_HIDE, hwnd)
+    assert not registry.contains(hwnd)
+    events.emit(EVENT_OBJECT_SHOW, hwnd)
+    
+    assert registry.contains(hwnd)
+    assert [c.kind for c in changes] == [WindowChange.REMOVED, WindowChange.ADDED]
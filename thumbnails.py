@@ -0,0 +1,341 @@
+"""Vignettes en direct des fenêtres DOFUS pour l'overlay.
+
+Les captures sont faites par un thread dédié selon un budget global de
+captures par seconde, en privilégiant le prochain personnage et le
+personnage actif. Les images sont réduites avec NumPy dans des tampons
+préalloués: le thread Tk ne fait que lire la dernière vignette publiée,
+dans un tampon que le thread de capture ne réécrit pas pendant sa lecture.
+"""
+import ctypes
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Vignettes indisponibles sans NumPy
+    np = None
+
+try:
+    import win32gui
+except ImportError:  # Hors Windows: seule une source simulée est utilisable
+    win32gui = None
+
+
+PW_CLIENTONLY = 0x1
+PW_RENDERFULLCONTENT = 0x2
+DIB_RGB_COLORS = 0
+BI_RGB = 0
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    """En-tête BITMAPINFOHEADER pour GetDIBits."""
+    _fields_ = [
+        ("biSize", ctypes.c_uint32),
+        ("biWidth", ctypes.c_int32),
+        ("biHeight", ctypes.c_int32),
+        ("biPlanes", ctypes.c_uint16),
+        ("biBitCount", ctypes.c_uint16),
+        ("biCompression", ctypes.c_uint32),
+        ("biSizeImage", ctypes.c_uint32),
+        ("biXPelsPerMeter", ctypes.c_int32),
+        ("biYPelsPerMeter", ctypes.c_int32),
+        ("biClrUsed", ctypes.c_uint32),
+        ("biClrImportant", ctypes.c_uint32),
+    ]
+
+
+class Win32CaptureSource:
+    """Capture la zone client d'une fenêtre avec PrintWindow (fonctionne même masquée).
+    
+    Retourne un tableau (hauteur, largeur, 4) en BGRA, réutilisé d'une
+    capture à l'autre tant que la taille de la fenêtre ne change pas.
+    """
+    
+    def __init__(self):
+        self._buffers: Dict[Tuple[int, int], 'np.ndarray'] = {}
+    
+    def capture(self, hwnd: int) -> Optional['np.ndarray']:
+        if sys.platform != "win32" or win32gui is None:
+            return None
+        left, top, right, bottom = win32gui.GetClientRect(hwnd)
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            return None
+        buffer = self._buffers.get((width, height))
+        if buffer is None:
+            buffer = self._buffers[(width, height)] = np.empty((height, width, 4), dtype=np.uint8)
+        
+        user32 = ctypes.windll.user32
+        gdi32 = ctypes.windll.gdi32
+        window_dc = user32.GetDC(hwnd)
+        memory_dc = gdi32.CreateCompatibleDC(window_dc)
+        bitmap = gdi32.CreateCompatibleBitmap(window_dc, width, height)
+        previous = gdi32.SelectObject(memory_dc, bitmap)
+        try:
+            if not user32.PrintWindow(hwnd, memory_dc, PW_CLIENTONLY | PW_RENDERFULLCONTENT):
+                return None
+            header = BITMAPINFOHEADER()
+            header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+            header.biWidth = width
+            header.biHeight = -height  # lignes de haut en bas
+            header.biPlanes = 1
+            header.biBitCount = 32
+            header.biCompression = BI_RGB
+            # GetDIBits exige un bitmap qui n'est sélectionné dans aucun DC
+            gdi32.SelectObject(memory_dc, previous)
+            if not gdi32.GetDIBits(memory_dc, bitmap, 0, height, buffer.ctypes.data,
+                                   ctypes.byref(header), DIB_RGB_COLORS):
+                return None
+            return buffer
+        finally:
+            # Aussi après un échec de PrintWindow: un bitmap encore sélectionné ne serait pas libéré
+            gdi32.SelectObject(memory_dc, previous)
+            gdi32.DeleteObject(bitmap)
+            gdi32.DeleteDC(memory_dc)
+            user32.ReleaseDC(hwnd, window_dc)
+
+
+class ThumbnailScaler:
+    """Réduit des captures BGR(A) en vignettes RGB de taille fixe, sans allocation.
+    
+    Chaque pixel de la vignette est la moyenne de `samples`² pixels répartis
+    dans le bloc source correspondant (filtre boîte sous-échantillonné). Les
+    index, tampons intermédiaires et sorties sont alloués une fois par taille
+    de source. Chaque fenêtre a trois tampons de sortie: la dernière vignette
+    réduite, celle que lit l'overlay (`acquire`) et celle en cours de
+    remplissage. Un tampon en cours de lecture n'est jamais réécrit.
+    """
+    
+    def __init__(self, width: int = 160, height: int = 90, samples: int = 2):
+        if np is None:
+            raise RuntimeError("NumPy est requis pour les vignettes")
+        self.width = width
+        self.height = height
+        self.samples = samples
+        self._plans: Dict[Tuple[int, ...], tuple] = {}
+        self._outputs: Dict[int, List['np.ndarray']] = {}
+        self._latest: Dict[int, int] = {}  # clé → tampon de la dernière vignette
+        self._reading: Dict[int, int] = {}  # clé → tampon réservé par l'overlay
+        self._lock = threading.Lock()
+    
+    def _plan(self, shape: Tuple[int, ...]) -> tuple:
+        plan = self._plans.get(shape)
+        if plan is None:
+            src_height, src_width, channels = shape
+            offsets = (np.arange(self.samples) + 0.5) / self.samples
+            rows = ((np.arange(self.height)[None, :] + offsets[:, None]) * src_height / self.height).astype(np.intp)
+            cols = ((np.arange(self.width)[None, :] + offsets[:, None]) * src_width / self.width).astype(np.intp)
+            row_buffer = np.empty((self.height, src_width, channels), dtype=np.uint8)
+            sample = np.empty((self.height, self.width, channels), dtype=np.uint8)
+            total = np.empty((self.height, self.width, 3), dtype=np.uint16)
+            plan = self._plans[shape] = (rows, cols, row_buffer, sample, total)
+        return plan
+    
+    def scale(self, key: int, frame: 'np.ndarray') -> 'np.ndarray':
+        """Réduit `frame` et retourne le tampon de sortie (RGB) de `key`."""
+        rows, cols, row_buffer, sample, total = self._plan(frame.shape)
+        total.fill(0)
+        # mode="clip": avec out=, le mode par défaut passe par un tampon temporaire
+        for row_index in rows:
+            np.take(frame, row_index, axis=0, out=row_buffer, mode="clip")
+            for col_index in cols:
+                np.take(row_buffer, col_index, axis=1, out=sample, mode="clip")
+                np.add(total, sample[:, :, :3], out=total)
+        np.floor_divide(total, self.samples * self.samples, out=total)
+        
+        with self._lock:
+            outputs = self._outputs.get(key)
+            if outputs is None:
+                outputs = self._outputs[key] = [np.empty((self.height, self.width, 3), dtype=np.uint8)
+                                                for _ in range(3)]
+            latest, reading = self._latest.get(key), self._reading.get(key)
+            slot = 0
+            while slot == latest or slot == reading:
+                slot += 1
+        output = outputs[slot]
+        # BGR → RGB par une vue inversée, copiée dans le tampon préalloué
+        np.copyto(output, total[:, :, ::-1], casting="unsafe")
+        with self._lock:
+            self._latest[key] = slot
+        return output
+    
+    def acquire(self, key: int) -> Optional['np.ndarray']:
+        """Dernière vignette de `key`, réservée au lecteur jusqu'à son prochain `acquire` (un seul lecteur)."""
+        with self._lock:
+            slot = self._latest.get(key)
+            if slot is None:
+                return None
+            self._reading[key] = slot
+            return self._outputs[key][slot]
+    
+    def forget(self, key: int):
+        """Libère les tampons d'une fenêtre fermée."""
+        with self._lock:
+            self._outputs.pop(key, None)
+            self._latest.pop(key, None)
+            self._reading.pop(key, None)
+
+
+class ThumbnailScheduler:
+    """Planifie les captures dans un budget global de captures par seconde.
+    
+    À chaque créneau, la fenêtre choisie est celle dont la vignette est la
+    plus ancienne, pondérée par sa priorité: prochain personnage
+    (NEXT_WEIGHT), personnage actif (CURRENT_WEIGHT), puis les autres. Une
+    fenêtre jamais capturée passe avant toutes les autres.
+    
+    Les vignettes sont publiées dans `published` (hwnd → (version, image)),
+    un dictionnaire remplacé d'un bloc: l'overlay y lit les versions sans
+    verrou, puis les images par `acquire`. Le thread de capture dort tant que
+    le roster est vide.
+    """
+    
+    DEFAULT_CAPTURES_PER_SECOND = 8
+    NEXT_WEIGHT = 4.0
+    CURRENT_WEIGHT = 3.0
+    OTHER_WEIGHT = 1.0
+    
+    def __init__(self, source, scaler: ThumbnailScaler,
+                 captures_per_second: float = DEFAULT_CAPTURES_PER_SECOND,
+                 clock: Callable[[], float] = time.monotonic):
+        self.source = source
+        self.scaler = scaler
+        self.captures_per_second = captures_per_second
+        self.clock = clock
+        self.published: Dict[int, Tuple[int, 'np.ndarray']] = {}
+        self.version = 0
+        self.captures: Dict[int, int] = {}
+        self.failures = 0
+        self.capture_ms = 0.0
+        self._roster: Tuple[Tuple[int, ...], int, int] = ((), 0, 0)
+        self._last_capture: Dict[int, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._roster_changed = threading.Condition()
+    
+    def set_roster(self, hwnds: List[int], current_hwnd: int, next_hwnd: int):
+        """Fenêtres à capturer (appelable depuis n'importe quel thread)."""
+        with self._roster_changed:
+            self._roster = (tuple(hwnds), current_hwnd, next_hwnd)
+            self._roster_changed.notify_all()
+    
+    def acquire(self, hwnd: int) -> Optional['np.ndarray']:
+        """Dernière vignette d'une fenêtre, à lire depuis le thread Tk (voir ThumbnailScaler.acquire)."""
+        return self.scaler.acquire(hwnd)
+    
+    def pick(self, now: float) -> Optional[int]:
+        """Choisit la fenêtre à capturer dans ce créneau."""
+        hwnds, current_hwnd, next_hwnd = self._roster
+        best = None
+        best_score = (False, -1.0)
+        for hwnd in hwnds:
+            if not hwnd:
+                continue
+            if hwnd == next_hwnd:
+                weight = self.NEXT_WEIGHT
+            elif hwnd == current_hwnd:
+                weight = self.CURRENT_WEIGHT
+            else:
+                weight = self.OTHER_WEIGHT
+            last = self._last_capture.get(hwnd)
+            score = (True, weight) if last is None else (False, weight * (now - last))
+            if score > best_score:
+                best, best_score = hwnd, score
+        return best
+    
+    def tick(self) -> Optional[int]:
+        """Capture et publie une vignette; retourne la fenêtre traitée."""
+        self._forget_closed()
+        now = self.clock()
+        hwnd = self.pick(now)
+        if hwnd is None:
+            return None
+        self._last_capture[hwnd] = now
+        start = time.perf_counter()
+        try:
+            frame = self.source.capture(hwnd)
+        except Exception:
+            frame = None
+        if frame is None:
+            self.failures += 1
+            return hwnd
+        thumbnail = self.scaler.scale(hwnd, frame)
+        self.capture_ms += (time.perf_counter() - start) * 1000
+        self.captures[hwnd] = self.captures.get(hwnd, 0) + 1
+        published = dict(self.published)
+        published[hwnd] = (self.captures[hwnd], thumbnail)
+        self.published = published
+        self.version += 1
+        return hwnd
+    
+    def _forget_closed(self):
+        hwnds = set(self._roster[0])
+        closed = [hwnd for hwnd in self._last_capture if hwnd not in hwnds]
+        if not closed:
+            return
+        published = dict(self.published)
+        for hwnd in closed:
+            self._last_capture.pop(hwnd, None)
+            published.pop(hwnd, None)
+            self.scaler.forget(hwnd)
+        self.published = published
+        self.version += 1
+    
+    def start(self):
+        """Lance le thread de capture."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # Event propre à ce thread: s'il est encore dans tick() après stop(), il sort au tour suivant
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 1.0):
+        """Arrête le thread de capture (attend la fin d'une capture en cours)."""
+        self._stop.set()
+        with self._roster_changed:
+            self._roster_changed.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self, stop: threading.Event):
+        interval = 1.0 / max(0.1, self.captures_per_second)
+        while True:
+            with self._roster_changed:
+                self._roster_changed.wait_for(lambda: self._roster[0] or stop.is_set())
+            if stop.wait(interval):
+                return
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Erreur lors de la capture d'une vignette: {e}")
+    
+    def to_dict(self) -> Dict:
+        """Convertit les réglages en dictionnaire."""
+        return {
+            "enabled": True,
+            "width": self.scaler.width,
+            "height": self.scaler.height,
+            "captures_per_second": self.captures_per_second
+        }
+
+
+def thumbnail_to_ppm(thumbnail: 'np.ndarray') -> bytes:
+    """Encode une vignette RGB en PPM binaire, lisible directement par tk.PhotoImage."""
+    height, width = thumbnail.shape[:2]
+    return b"P6 %d %d 255\n" % (width, height) + thumbnail.tobytes()
+
+
+def create_scheduler(config: Dict) -> Optional[ThumbnailScheduler]:
+    """Crée le planificateur de vignettes depuis la section « thumbnails » (None si désactivé)."""
+    if not config.get("enabled", False):
+        return None
+    if np is None:
+        print("⚠ Vignettes désactivées: NumPy n'est pas installé")
+        return None
+    scaler = ThumbnailScaler(config.get("width", 160), config.get("height", 90))
+    return ThumbnailScheduler(Win32CaptureSource(), scaler,
+                              config.get("captures_per_second", ThumbnailScheduler.DEFAULT_CAPTURES_PER_SECOND))
@@ -0,0 +1,139 @@
+"""Ordre de tour: masque de validité et personnages à passer."""
+from typing import List, Set
+
+
+class TurnOrder:
+    """Calcule suivant/précédent en temps constant.
+    
+    Deux tables (`_next`, `_prev`) donnent pour chaque position la position
+    vivante suivante/précédente. Elles sont recalculées en O(n) uniquement
+    quand le masque de validité ou l'ensemble des personnages passés change,
+    ce qui reste rare comparé aux switchs.
+    """
+    
+    def __init__(self, size: int = 0):
+        self.valid: List[bool] = []
+        self.skipped: Set[int] = set()
+        self.live_count = 0
+        self._next: List[int] = []
+        self._prev: List[int] = []
+        self.resize(size)
+    
+    def resize(self, size: int):
+        """Adapte l'ordre à un roster de `size` personnages (tous valides)."""
+        self.valid = [True] * size
+        self.skipped = {i for i in self.skipped if i < size}
+        self._rebuild()
+    
+    def copy(self) -> 'TurnOrder':
+        """Copie modifiable: les tables, jamais modifiées sur place, sont partagées."""
+        order = TurnOrder.__new__(TurnOrder)
+        order.valid = list(self.valid)
+        order.skipped = set(self.skipped)
+        order.live_count = self.live_count
+        order._next = self._next
+        order._prev = self._prev
+        return order
+    
+    @property
+    def size(self) -> int:
+        return len(self.valid)
+    
+    def set_mask(self, valid: List[bool]):
+        """Remplace tout le masque de validité en un seul recalcul."""
+        self.valid = list(valid)
+        self.skipped = {i for i in self.skipped if i < len(self.valid)}
+        self._rebuild()
+    
+    def insert(self, index: int, valid: bool):
+        """Insère une position (personnage ajouté); les positions suivantes sont décalées."""
+        self.valid.insert(index, valid)
+        self.skipped = {i + 1 if i >= index else i for i in self.skipped}
+        self._rebuild()
+    
+    def remove(self, index: int):
+        """Retire une position (personnage supprimé); les positions suivantes sont décalées."""
+        if not 0 <= index < len(self.valid):
+            return
+        del self.valid[index]
+        self.skipped = {i - 1 if i > index else i for i in self.skipped if i != index}
+        self._rebuild()
+    
+    def set_valid(self, index: int, valid: bool):
+        """Met à jour la validité d'une position."""
+        if 0 <= index < len(self.valid) and self.valid[index] != valid:
+            self.valid[index] = valid
+            self._rebuild()
+    
+    def set_skipped(self, index: int, skipped: bool):
+        """Ajoute ou retire une position de l'ensemble des personnages passés."""
+        if not 0 <= index < len(self.valid):
+            return
+        if skipped and index not in self.skipped:
+            self.skipped.add(index)
+            self._rebuild()
+        elif not skipped and index in self.skipped:
+            self.skipped.discard(index)
+            self._rebuild()
+    
+    def toggle_skip(self, index: int) -> bool:
+        """Inverse l'état « passé » d'une position et retourne le nouvel état."""
+        skipped = index not in self.skipped
+        self.set_skipped(index, skipped)
+        return skipped
+    
+    def clear_skips(self):
+        """Réintègre tous les personnages passés (fin de combat)."""
+        if self.skipped:
+            self.skipped.clear()
+            self._rebuild()
+    
+    def is_live(self, index: int) -> bool:
+        """Vrai si la position est valide et non passée."""
+        return 0 <= index < len(self.valid) and self.valid[index] and index not in self.skipped
+    
+    def next_live(self, index: int) -> int:
+        """Position vivante suivant `index` (peut être `index` lui-même), -1 si aucune."""
+        if not self._next:
+            return -1
+        return self._next[index % len(self._next)]
+    
+    def prev_live(self, index: int) -> int:
+        """Position vivante précédant `index` (peut être `index` lui-même), -1 si aucune."""
+        if not self._prev:
+            return -1
+        return self._prev[index % len(self._prev)]
+    
+    def step(self, index: int, offset: int) -> int:
+        """Avance de `offset` positions vivantes depuis `index`, -1 si aucune."""
+        if self.live_count == 0 or offset == 0:
+            return -1 if self.live_count == 0 else index
+        moves = abs(offset) % self.live_count or self.live_count
+        for _ in range(moves):
+            index = self.next_live(index) if offset > 0 else self.prev_live(index)
+        return index
+    
+    def _rebuild(self):
+        size = len(self.valid)
+        live = [i for i in range(size) if self.valid[i] and i not in self.skipped]
+        self.live_count = len(live)
+        if not live:
+            self._next = [-1] * size
+            self._prev = [-1] * size
+            return
+        
+        # Parcours circulaire: on part d'une position vivante et on remonte
+        nxt = [0] * size
+        upcoming = live[0]
+        for i in range(size - 1, -1, -1):
+            nxt[i] = upcoming
+            if self.is_live(i):
+                upcoming = i
+        prv = [0] * size
+        previous = live[-1]
+        for i in range(size):
+            prv[i] = previous
+            if self.is_live(i):
+                previous = i
+        self._next = nxt
+        self._prev = prv
@@ -0,0 +1,300 @@
+"""Accès aux API Windows (win32 + psutil) utilisées par le switcher."""
+import ctypes
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import psutil
+
+try:
+    import win32api
+    import win32con
+    import win32gui
+    import win32process
+except ImportError:  # Hors Windows: seul le backend simulé est utilisable
+    win32api = win32con = win32gui = win32process = None
+
+
+TH32CS_SNAPPROCESS = 0x00000002
+INVALID_HANDLE_VALUE = -1
+PROCESS_SET_QUOTA = 0x0100
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+SYSTEM_PROCESS_INFORMATION_CLASS = 5
+STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+
+# Constantes win32con, dupliquées pour rester utilisables hors Windows
+SW_SHOWNOACTIVATE = 4
+SW_MINIMIZE = 6
+SW_SHOWMINNOACTIVE = 7
+SW_RESTORE = 9
+VK_MENU = 0x12
+KEYEVENTF_KEYUP = 0x0002
+DWMWA_CLOAK = 13
+
+# Classes de priorité (valeurs de psutil.*_PRIORITY_CLASS sous Windows)
+IDLE_PRIORITY_CLASS = 0x0040
+BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+NORMAL_PRIORITY_CLASS = 0x0020
+ABOVE_NORMAL_PRIORITY_CLASS = 0x8000
+HIGH_PRIORITY_CLASS = 0x0080
+
+
+class PROCESSENTRY32W(ctypes.Structure):
+    """Structure PROCESSENTRY32W de l'API ToolHelp."""
+    _fields_ = [
+        ("dwSize", ctypes.c_uint32),
+        ("cntUsage", ctypes.c_uint32),
+        ("th32ProcessID", ctypes.c_uint32),
+        ("th32DefaultHeapID", ctypes.c_size_t),
+        ("th32ModuleID", ctypes.c_uint32),
+        ("cntThreads", ctypes.c_uint32),
+        ("th32ParentProcessID", ctypes.c_uint32),
+        ("pcPriClassBase", ctypes.c_long),
+        ("dwFlags", ctypes.c_uint32),
+        ("szExeFile", ctypes.c_wchar * 260),
+    ]
+
+
+class UNICODE_STRING(ctypes.Structure):
+    """Structure UNICODE_STRING du noyau."""
+    _fields_ = [
+        ("Length", ctypes.c_ushort),
+        ("MaximumLength", ctypes.c_ushort),
+        ("Buffer", ctypes.c_void_p),
+    ]
+
+
+class SYSTEM_PROCESS_INFORMATION(ctypes.Structure):
+    """Début de SYSTEM_PROCESS_INFORMATION (NtQuerySystemInformation), jusqu'au working set."""
+    _fields_ = [
+        ("NextEntryOffset", ctypes.c_uint32),
+        ("NumberOfThreads", ctypes.c_uint32),
+        ("WorkingSetPrivateSize", ctypes.c_int64),
+        ("HardFaultCount", ctypes.c_uint32),
+        ("NumberOfThreadsHighWatermark", ctypes.c_uint32),
+        ("CycleTime", ctypes.c_uint64),
+        ("CreateTime", ctypes.c_int64),
+        ("UserTime", ctypes.c_int64),  # unités de 100 ns
+        ("KernelTime", ctypes.c_int64),
+        ("ImageName", UNICODE_STRING),
+        ("BasePriority", ctypes.c_long),
+        ("UniqueProcessId", ctypes.c_void_p),
+        ("InheritedFromUniqueProcessId", ctypes.c_void_p),
+        ("HandleCount", ctypes.c_uint32),
+        ("SessionId", ctypes.c_uint32),
+        ("UniqueProcessKey", ctypes.c_void_p),
+        ("PeakVirtualSize", ctypes.c_size_t),
+        ("VirtualSize", ctypes.c_size_t),
+        ("PageFaultCount", ctypes.c_uint32),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+    ]
+
+
+class Win32Backend:
+    """Backend réel: enveloppe fine autour de win32gui, win32process et psutil.
+    
+    Toutes les interactions avec le système passent par ce backend, ce qui
+    permet de le remplacer par un bureau simulé (voir testing/fake_backend.py).
+    """
+    
+    def __init__(self):
+        # Processus échantillonnés: psutil.Process garde son handle d'une passe à l'autre
+        self._sampled: Dict[int, psutil.Process] = {}
+        # Tampon de NtQuerySystemInformation, agrandi au besoin puis réutilisé
+        self._process_information = ctypes.create_string_buffer(256 * 1024)
+    
+    def enum_windows(self) -> List[int]:
+        """Retourne les handles de toutes les fenêtres de premier niveau."""
+        handles: List[int] = []
+        win32gui.EnumWindows(lambda hwnd, acc: acc.append(hwnd) or True, handles)
+        return handles
+    
+    def get_window_pid(self, hwnd: int) -> int:
+        """Retourne le PID propriétaire d'une fenêtre."""
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return pid
+    
+    def get_window_text(self, hwnd: int) -> str:
+        return win32gui.GetWindowText(hwnd)
+    
+    def is_window(self, hwnd: int) -> bool:
+        return bool(win32gui.IsWindow(hwnd))
+    
+    def is_window_visible(self, hwnd: int) -> bool:
+        return bool(win32gui.IsWindowVisible(hwnd))
+    
+    def is_iconic(self, hwnd: int) -> bool:
+        return bool(win32gui.IsIconic(hwnd))
+    
+    def show_window(self, hwnd: int, command: int):
+        win32gui.ShowWindow(hwnd, command)
+    
+    def set_foreground_window(self, hwnd: int):
+        win32gui.SetForegroundWindow(hwnd)
+    
+    def bring_window_to_top(self, hwnd: int):
+        win32gui.BringWindowToTop(hwnd)
+    
+    def set_focus(self, hwnd: int):
+        win32gui.SetFocus(hwnd)
+    
+    def keybd_event(self, vk: int, flags: int):
+        win32api.keybd_event(vk, 0, flags, 0)
+    
+    def get_foreground_window(self) -> int:
+        return win32gui.GetForegroundWindow()
+    
+    def get_window_thread_id(self, hwnd: int) -> int:
+        thread_id, _ = win32process.GetWindowThreadProcessId(hwnd)
+        return thread_id
+    
+    def get_current_thread_id(self) -> int:
+        return win32api.GetCurrentThreadId()
+    
+    def attach_thread_input(self, thread_id: int, target_thread_id: int, attach: bool):
+        win32process.AttachThreadInput(thread_id, target_thread_id, attach)
+    
+    def switch_to_this_window(self, hwnd: int):
+        ctypes.windll.user32.SwitchToThisWindow(hwnd, True)
+    
+    def cloak_window(self, hwnd: int, cloaked: bool):
+        """Masque (ou réaffiche) une fenêtre via DWM sans la minimiser."""
+        value = ctypes.c_int(1 if cloaked else 0)
+        result = ctypes.windll.dwmapi.DwmSetWindowAttribute(
+            hwnd, DWMWA_CLOAK, ctypes.byref(value), ctypes.sizeof(value))
+        if result != 0:
+            raise OSError(f"DwmSetWindowAttribute a échoué ({result & 0xFFFFFFFF:#x})")
+    
+    def iter_processes(self) -> Iterator[Tuple[int, str]]:
+        """Énumère (pid, nom de l'exécutable) en un seul instantané système.
+        
+        Utilise CreateToolhelp32Snapshot, qui renvoie tous les processus sans
+        ouvrir chacun d'eux, avec un repli sur psutil si l'appel échoue.
+        """
+        try:
+            kernel32 = ctypes.windll.kernel32
+        except AttributeError:
+            kernel32 = None
+        if kernel32 is not None:
+            kernel32.CreateToolhelp32Snapshot.restype = ctypes.c_void_p
+            snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+            if snapshot and snapshot != ctypes.c_void_p(INVALID_HANDLE_VALUE).value:
+                try:
+                    entry = PROCESSENTRY32W()
+                    entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+                    handle = ctypes.c_void_p(snapshot)
+                    ok = kernel32.Process32FirstW(handle, ctypes.byref(entry))
+                    while ok:
+                        yield entry.th32ProcessID, entry.szExeFile
+                        ok = kernel32.Process32NextW(handle, ctypes.byref(entry))
+                finally:
+                    kernel32.CloseHandle(ctypes.c_void_p(snapshot))
+                return
+        for proc in psutil.process_iter(['name']):
+            yield proc.pid, proc.info['name'] or ""
+    
+    def get_process_name(self, pid: int) -> str:
+        """Retourne le nom de l'exécutable d'un processus (lève psutil.Error sinon)."""
+        return psutil.Process(pid).name()
+    
+    def get_process_create_time(self, pid: int) -> float:
+        """Retourne la date de création d'un processus (lève psutil.Error sinon)."""
+        return psutil.Process(pid).create_time()
+    
+    def cpu_count(self) -> int:
+        """Nombre de cœurs logiques."""
+        return psutil.cpu_count() or 1
+    
+    def get_process_priority(self, pid: int) -> int:
+        """Classe de priorité d'un processus (lève psutil.Error sinon)."""
+        return psutil.Process(pid).nice()
+    
+    def set_process_priority(self, pid: int, priority: int):
+        psutil.Process(pid).nice(priority)
+    
+    def get_process_affinity(self, pid: int) -> List[int]:
+        """Cœurs autorisés pour un processus (lève psutil.Error sinon)."""
+        return psutil.Process(pid).cpu_affinity()
+    
+    def set_process_affinity(self, pid: int, cores: List[int]):
+        psutil.Process(pid).cpu_affinity(cores)
+    
+    def get_process_rss(self, pid: int) -> int:
+        """Mémoire résidente (working set) d'un processus en octets (lève psutil.Error sinon)."""
+        return psutil.Process(pid).memory_info().rss
+    
+    def sample_processes(self, pids: Iterable[int]) -> Dict[int, Tuple[float, int]]:
+        """Temps CPU cumulé (s) et mémoire résidente de plusieurs processus, en une passe.
+        
+        Un seul appel NtQuerySystemInformation(SystemProcessInformation) lit
+        les compteurs de tous les processus sans en ouvrir aucun; repli sur
+        psutil (un handle par PID) si l'appel échoue. Les PID disparus ou
+        inaccessibles sont absents du résultat.
+        """
+        wanted = set(pids)
+        buffer = self._query_process_information()
+        if buffer is None:
+            return self._sample_with_psutil(wanted)
+        samples: Dict[int, Tuple[float, int]] = {}
+        offset = 0
+        while True:
+            entry = SYSTEM_PROCESS_INFORMATION.from_buffer(buffer, offset)
+            pid = entry.UniqueProcessId or 0
+            if pid in wanted:
+                samples[pid] = ((entry.UserTime + entry.KernelTime) / 1e7, entry.WorkingSetSize)
+            if not entry.NextEntryOffset:
+                return samples
+            offset += entry.NextEntryOffset
+    
+    def _query_process_information(self) -> Optional[ctypes.Array]:
+        """Instantané SystemProcessInformation de tous les processus (None hors Windows ou en cas d'échec)."""
+        try:
+            ntdll = ctypes.windll.ntdll
+        except AttributeError:
+            return None
+        needed = ctypes.c_ulong(0)
+        for _ in range(3):
+            buffer = self._process_information
+            status = ntdll.NtQuerySystemInformation(
+                SYSTEM_PROCESS_INFORMATION_CLASS, buffer, len(buffer), ctypes.byref(needed)) & 0xFFFFFFFF
+            if status == 0:
+                return buffer
+            if status != STATUS_INFO_LENGTH_MISMATCH:
+                return None
+            # Marge: des processus peuvent apparaître avant le nouvel appel
+            self._process_information = ctypes.create_string_buffer(needed.value + 64 * 1024)
+        return None
+    
+    def _sample_with_psutil(self, pids: Set[int]) -> Dict[int, Tuple[float, int]]:
+        samples: Dict[int, Tuple[float, int]] = {}
+        for pid in pids:
+            process = self._sampled.get(pid)
+            try:
+                if process is None:
+                    process = self._sampled[pid] = psutil.Process(pid)
+                with process.oneshot():
+                    times = process.cpu_times()
+                    rss = process.memory_info().rss
+            except psutil.Error:
+                self._sampled.pop(pid, None)
+                continue
+            samples[pid] = (times.user + times.system, rss)
+        for pid in [p for p in self._sampled if p not in samples]:
+            del self._sampled[pid]
+        return samples
+    
+    def trim_working_set(self, pid: int):
+        """Demande à Windows de retirer les pages du working set d'un processus.
+        
+        Les pages restent en mémoire (liste standby) et reviennent sans lecture
+        disque si le client les réutilise.
+        """
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_SET_QUOTA | PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            raise psutil.AccessDenied(pid)
+        try:
+            size = ctypes.c_size_t(-1)
+            if not kernel32.SetProcessWorkingSetSize(ctypes.c_void_p(handle), size, size):
+                raise OSError(f"SetProcessWorkingSetSize a échoué pour le PID {pid}")
+        finally:
+            kernel32.CloseHandle(ctypes.c_void_p(handle))
@@ -1,14 +1,17 @@
 """Module pour détecter les fenêtres DOFUS."""
-import win32gui
-import win32con
-import win32process
+from typing import List, Dict, Optional, Set, Tuple
+
 import psutil
-from typing import List, Dict, Optional
+
+from win32_backend import Win32Backend, SW_RESTORE, SW_SHOWNOACTIVATE
+from focus_strategies import FocusStrategyEngine
 
 
 class WindowInfo:
     """Informations sur une fenêtre DOFUS."""
     
+    __slots__ = ("hwnd", "title", "pid", "character_name")
+    
     def __init__(self, hwnd: int, title: str, pid: int):
         self.hwnd = hwnd
         self.title = title
@@ -19,47 +22,110 @@ class WindowInfo:
         return f"WindowInfo(hwnd={self.hwnd}, title='{self.title}', char='{self.character_name}')"
 
 
+class ProcessCache:
+    """Cache PID → (nom, date de création) des processus DOFUS.
+    
+    La table des processus est lue en un seul instantané groupé; seule la
+    date de création des PID DOFUS est interrogée, ce qui permet de détecter
+    la réutilisation d'un PID par un nouveau processus.
+    """
+    
+    def __init__(self, backend, process_names: List[str]):
+        self.backend = backend
+        self.process_names = set(process_names)
+        self.entries: Dict[int, Tuple[str, float]] = {}
+        self.invalidations = 0
+        # PID non DOFUS déjà vus → date de création (évite de relire leur nom)
+        self._foreign: Dict[int, float] = {}
+    
+    def refresh(self) -> Set[int]:
+        """Re-scanne les processus et retourne l'ensemble des PID DOFUS vivants."""
+        entries: Dict[int, Tuple[str, float]] = {}
+        for pid, name in self.backend.iter_processes():
+            if name not in self.process_names:
+                continue
+            try:
+                create_time = self.backend.get_process_create_time(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            cached = self.entries.get(pid)
+            if cached is not None and cached[1] != create_time:
+                # PID réutilisé: l'ancienne entrée ne décrit plus ce processus
+                self.invalidations += 1
+            entries[pid] = (name, create_time)
+        self.entries = entries
+        self._foreign.clear()
+        return set(entries)
+    
+    def classify(self, pid: int) -> bool:
+        """Indique si un PID isolé appartient à DOFUS, sans re-scanner la table.
+        
+        Utilisé pour les fenêtres apparues entre deux scans complets.
+        """
+        if pid in self.entries:
+            return True
+        try:
+            create_time = self.backend.get_process_create_time(pid)
+            if self._foreign.get(pid) == create_time:
+                return False
+            name = self.backend.get_process_name(pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+        if name in self.process_names:
+            self.entries[pid] = (name, create_time)
+            return True
+        if len(self._foreign) > 4096:
+            self._foreign.clear()
+        self._foreign[pid] = create_time
+        return False
+    
+    def remember(self, pid: int, name: str, create_time: float):
+        """Enregistre un processus DOFUS déjà vérifié (démarrage à chaud)."""
+        self.entries[pid] = (name, create_time)
+    
+    def get(self, pid: int) -> Optional[Tuple[str, float]]:
+        """Retourne (nom, date de création) pour un PID DOFUS connu."""
+        return self.entries.get(pid)
+    
+    def clear(self):
+        """Vide le cache."""
+        self.entries.clear()
+        self._foreign.clear()
+
+
 class WindowDetector:
     """Détecte et gère les fenêtres DOFUS."""
     
     DOFUS_WINDOW_CLASS = "GLFW30"  # Classe de fenêtre typique pour DOFUS
     DOFUS_PROCESS_NAMES = ["Dofus.exe", "dofus.exe"]
     
-    def __init__(self):
+    def __init__(self, backend=None):
+        self.backend = backend or Win32Backend()
+        self.process_cache = ProcessCache(self.backend, self.DOFUS_PROCESS_NAMES)
+        self.focus_engine = FocusStrategyEngine(self.backend)
         self.windows: List[WindowInfo] = []
-        
-    def detect_windows(self) -> List[WindowInfo]:
-        """Détecte toutes les fenêtres DOFUS actives."""
-        self.windows = []
-        win32gui.EnumWindows(self._enum_callback, None)
-        return self.windows
     
-    def _enum_callback(self, hwnd: int, _) -> bool:
-        """Callback pour l'énumération des fenêtres."""
-        if not win32gui.IsWindowVisible(hwnd):
-            return True
-            
-        title = win32gui.GetWindowText(hwnd)
+    def detect_windows(self) -> List[WindowInfo]:
+        """Détecte toutes les fenêtres DOFUS actives.
         
-        # Vérifier si c'est une fenêtre DOFUS via le processus
-        if self._is_dofus_process(hwnd):
-            try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                window_info = WindowInfo(hwnd, title, pid)
-                self.windows.append(window_info)
-            except Exception:
-                pass
-                
-        return True
-    
-    def _is_dofus_process(self, hwnd: int) -> bool:
-        """Vérifie si la fenêtre appartient à un processus DOFUS."""
-        try:
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            process = psutil.Process(pid)
-            return process.name() in self.DOFUS_PROCESS_NAMES
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            return False
+        Les PID DOFUS sont obtenus en un seul scan des processus; chaque
+        fenêtre n'est ensuite interrogée qu'une fois pour son PID, et seules
+        celles appartenant à DOFUS sont inspectées plus en détail.
+        """
+        dofus_pids = self.process_cache.refresh()
+        windows: List[WindowInfo] = []
+        if dofus_pids:
+            backend = self.backend
+            for hwnd in backend.enum_windows():
+                try:
+                    pid = backend.get_window_pid(hwnd)
+                    if pid not in dofus_pids or not backend.is_window_visible(hwnd):
+                        continue
+                    windows.append(WindowInfo(hwnd, backend.get_window_text(hwnd), pid))
+                except Exception:
+                    continue
+        self.windows = windows
+        return self.windows
     
     def get_window_count(self) -> int:
         """Retourne le nombre de fenêtres DOFUS détectées."""
@@ -69,41 +135,39 @@ class WindowDetector:
         """Rafraîchit la liste des fenêtres."""
         return self.detect_windows()
     
-    @staticmethod
-    def focus_window(hwnd: int) -> bool:
-        """Met le focus sur une fenêtre."""
+    def focus_window(self, hwnd: int) -> bool:
+        """Met le focus sur une fenêtre.
+        
+        Les stratégies sont essayées dans l'ordre appris par `focus_engine`
+        (la plus rapide parmi les fiables sur cette machine en premier).
+        """
+        backend = self.backend
         try:
             # Restaurer la fenêtre si elle est minimisée
-            if win32gui.IsIconic(hwnd):
-                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            
-            # Workaround pour Windows: simuler un Alt press pour contourner les restrictions
-            import win32api
-            import win32con as wcon
-            
-            # Simuler Alt key pour autoriser SetForegroundWindow
-            win32api.keybd_event(wcon.VK_MENU, 0, 0, 0)
-            
-            # Essayer plusieurs méthodes
-            try:
-                win32gui.SetForegroundWindow(hwnd)
-            except:
-                # Méthode alternative: BringWindowToTop + SetFocus
-                win32gui.BringWindowToTop(hwnd)
-                win32gui.SetFocus(hwnd)
-            
-            # Relâcher Alt
-            win32api.keybd_event(wcon.VK_MENU, 0, wcon.KEYEVENTF_KEYUP, 0)
-            
-            return True
-        except Exception as e:
-            # Ne plus afficher l'erreur pour éviter le spam
+            if backend.is_iconic(hwnd):
+                backend.show_window(hwnd, SW_RESTORE)
+        except Exception:
             return False
+        return self.focus_engine.focus(hwnd)
+    
+    def prepare_window(self, hwnd: int) -> bool:
+        """Restaure une fenêtre minimisée sans l'activer (préchargement).
+        
+        Retourne True si la fenêtre a été restaurée: le prochain focus_window
+        n'aura plus qu'à changer le premier plan.
+        """
+        backend = self.backend
+        try:
+            if backend.is_iconic(hwnd):
+                backend.show_window(hwnd, SW_SHOWNOACTIVATE)
+                return True
+        except Exception:
+            pass
+        return False
     
-    @staticmethod
-    def is_window_valid(hwnd: int) -> bool:
+    def is_window_valid(self, hwnd: int) -> bool:
         """Vérifie si une fenêtre est toujours valide."""
         try:
-            return win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd)
+            return self.backend.is_window(hwnd) and self.backend.is_window_visible(hwnd)
         except Exception:
             return False
@@ -1,142 +1,644 @@
 """Module pour gérer l'ordre des fenêtres et le switching."""
-from typing import List, Optional, Dict
+import bisect
+import copy
+import threading
+from typing import Callable, Iterable, List, Optional, Dict, Tuple
 from window_detector import WindowDetector, WindowInfo
+from window_registry import WindowRegistry, WindowChange
+from character_identity import CharacterFingerprint, IdentityResolver, RebindReport
+from turn_order import TurnOrder
+from focus_mode import FocusMode
 
 
 class CharacterWindow:
-    """Représente un personnage avec sa fenêtre associée."""
+    """Représente un personnage avec sa fenêtre associée.
     
-    def __init__(self, name: str, hwnd: int, position: int):
+    Une instance publiée dans un RosterSnapshot n'est plus modifiée: un
+    renommage ou un rattachement crée une nouvelle instance.
+    """
+    
+    __slots__ = ("name", "hwnd", "position", "fingerprint")
+    
+    def __init__(self, name: str, hwnd: int, position: int, fingerprint: Optional[CharacterFingerprint] = None):
         self.name = name
         self.hwnd = hwnd
-        self.position = position  # Position dans l'ordre d'initiative (0-7)
-        
+        self.position = position  # Position dans l'ordre d'initiative (0, 1, 2...)
+        self.fingerprint = fingerprint  # Identité stable pour retrouver la fenêtre
+    
+    @property
+    def pid(self) -> int:
+        """PID du client lors du dernier rattachement (0 si inconnu)."""
+        return self.fingerprint.pid if self.fingerprint is not None else 0
+    
     def to_dict(self) -> Dict:
         """Convertit en dictionnaire pour la sérialisation."""
-        return {
+        data = {
             "name": self.name,
             "hwnd": self.hwnd,
             "position": self.position
         }
+        if self.fingerprint is not None:
+            data["identity"] = self.fingerprint.to_dict()
+        return data
     
     @staticmethod
     def from_dict(data: Dict) -> 'CharacterWindow':
         """Crée une instance depuis un dictionnaire."""
+        identity = data.get("identity")
         return CharacterWindow(
             name=data["name"],
             hwnd=data["hwnd"],
-            position=data["position"]
+            position=data["position"],
+            fingerprint=CharacterFingerprint.from_dict(identity) if identity else None
         )
 
 
+class Roster:
+    """Personnages triés par position et leurs index par position, nom, hwnd et PID.
+    
+    Immuable comme l'instantané qui le porte: `added`, `removed` et `renamed`
+    retournent un nouveau roster. Ses index sont des dictionnaires
+    clé → rang copiés de ceux-ci, où seules les entrées à partir du rang
+    modifié sont réécrites (aucune pour un ajout en fin de roster, le cas de
+    la configuration initiale). Chaque index donne la première position du
+    roster pour une clé; les noms sont comparés en casefold.
+    """
+    
+    __slots__ = ("characters", "positions", "index_by_position", "index_by_name", "index_by_hwnd", "index_by_pid")
+    
+    def __init__(self, characters: Iterable[CharacterWindow] = ()):
+        """Chargement en bloc: un seul tri, puis tous les index en une passe."""
+        self.characters: Tuple[CharacterWindow, ...] = tuple(sorted(characters, key=lambda c: c.position))
+        self.positions: Tuple[int, ...] = tuple(c.position for c in self.characters)
+        self.index_by_position: Dict[int, int] = {}
+        self.index_by_name: Dict[str, int] = {}
+        self.index_by_hwnd: Dict[int, int] = {}
+        self.index_by_pid: Dict[int, int] = {}
+        for i, char in enumerate(self.characters):
+            for index, key in self._keys(char):
+                index.setdefault(key, i)
+    
+    def __len__(self) -> int:
+        return len(self.characters)
+    
+    def _keys(self, char: CharacterWindow) -> Tuple[Tuple[Dict, object], ...]:
+        keys = ((self.index_by_position, char.position), (self.index_by_name, char.name.casefold()),
+                (self.index_by_hwnd, char.hwnd))
+        pid = char.pid
+        return keys + ((self.index_by_pid, pid),) if pid else keys
+    
+    def _derive(self, characters: Tuple[CharacterWindow, ...], positions: Tuple[int, ...],
+                names_only: bool = False) -> 'Roster':
+        """Roster dérivé; avec `names_only`, seul l'index des noms est copié, les autres sont partagés."""
+        roster = Roster.__new__(Roster)
+        roster.characters = characters
+        roster.positions = positions
+        roster.index_by_name = dict(self.index_by_name)
+        if names_only:
+            roster.index_by_position = self.index_by_position
+            roster.index_by_hwnd = self.index_by_hwnd
+            roster.index_by_pid = self.index_by_pid
+        else:
+            roster.index_by_position = dict(self.index_by_position)
+            roster.index_by_hwnd = dict(self.index_by_hwnd)
+            roster.index_by_pid = dict(self.index_by_pid)
+        return roster
+    
+    def _shift(self, characters: Tuple[CharacterWindow, ...], indices: range, delta: int):
+        """Décale de `delta` les entrées des personnages `characters[j]`, pour j dans `indices`."""
+        keys_of = self._keys
+        for j in indices:
+            new = j + delta
+            for index, key in keys_of(characters[j]):
+                current = index.get(key)
+                # Clé absente: elle appartenait au personnage retiré, celui-ci en est la prochaine occurrence
+                if current == j or current is None:
+                    index[key] = new
+    
+    def _index(self, char: CharacterWindow, i: int):
+        for index, key in self._keys(char):
+            if index.get(key, i + 1) > i:
+                index[key] = i
+    
+    def insertion_point(self, position: int) -> int:
+        """Index auquel `added` insère un personnage de cette position (après ses égaux)."""
+        return bisect.bisect_right(self.positions, position)
+    
+    def added(self, char: CharacterWindow) -> 'Roster':
+        """Nouveau roster avec `char` inséré à sa place."""
+        i = self.insertion_point(char.position)
+        roster = self._derive(self.characters[:i] + (char,) + self.characters[i:],
+                              self.positions[:i] + (char.position,) + self.positions[i:])
+        # De la fin vers `i`: une clé partagée n'est décalée qu'une fois
+        roster._shift(self.characters, range(len(self.characters) - 1, i - 1, -1), 1)
+        roster._index(char, i)
+        return roster
+    
+    def removed(self, position: int) -> 'Roster':
+        """Nouveau roster sans le personnage de cette position (le même s'il n'existe pas)."""
+        i = self.index_by_position.get(position)
+        if i is None:
+            return self
+        roster = self._derive(self.characters[:i] + self.characters[i + 1:],
+                              self.positions[:i] + self.positions[i + 1:])
+        for index, key in roster._keys(self.characters[i]):
+            if index.get(key) == i:
+                del index[key]
+        roster._shift(self.characters, range(i + 1, len(self.characters)), -1)
+        return roster
+    
+    def renamed(self, position: int, name: str) -> 'Roster':
+        """Nouveau roster où le personnage de cette position porte `name`."""
+        i = self.index_by_position.get(position)
+        if i is None:
+            return self
+        old = self.characters[i]
+        char = CharacterWindow(name, old.hwnd, old.position, old.fingerprint)
+        roster = self._derive(self.characters[:i] + (char,) + self.characters[i + 1:], self.positions, True)
+        old_key = old.name.casefold()
+        if roster.index_by_name.get(old_key) == i:
+            del roster.index_by_name[old_key]
+            # Homonyme plus loin dans le roster (rare: parcours limité aux renommages)
+            for j in range(i + 1, len(roster.characters)):
+                if roster.characters[j].name.casefold() == old_key:
+                    roster.index_by_name[old_key] = j
+                    break
+        new_key = char.name.casefold()
+        if roster.index_by_name.get(new_key, i + 1) > i:
+            roster.index_by_name[new_key] = i
+        return roster
+    
+    def by_position(self, position: int) -> Optional[CharacterWindow]:
+        i = self.index_by_position.get(position)
+        return self.characters[i] if i is not None else None
+    
+    def by_name(self, name: str) -> Optional[CharacterWindow]:
+        i = self.index_by_name.get(name.casefold())
+        return self.characters[i] if i is not None else None
+    
+    def by_hwnd(self, hwnd: int) -> Optional[CharacterWindow]:
+        i = self.index_by_hwnd.get(hwnd)
+        return self.characters[i] if i is not None else None
+    
+    def by_pid(self, pid: int) -> Optional[CharacterWindow]:
+        i = self.index_by_pid.get(pid)
+        return self.characters[i] if i is not None else None
+
+
+class RosterSnapshot:
+    """État du roster à un instant donné, jamais modifié après sa publication.
+    
+    Les lecteurs (overlay, raccourcis, gestionnaires de processus) prennent
+    `WindowManager.snapshot()` une fois et n'utilisent que cet objet: ils ne
+    peuvent pas voir un roster à moitié reconstruit, et ne bloquent jamais.
+    Chaque modification publie un nouvel instantané d'un seul bloc.
+    """
+    
+    def __init__(self, roster: Optional[Roster] = None, current_index: int = 0,
+                 turn_order: Optional[TurnOrder] = None, version: int = 0):
+        self.roster = roster if roster is not None else Roster()
+        self.characters = self.roster.characters
+        self.current_index = current_index
+        self.turn_order = turn_order if turn_order is not None else TurnOrder(len(self.characters))
+        self.version = version
+        # Index du roster (maintenus par Roster, partagés entre instantanés du même roster)
+        self.index_by_hwnd = self.roster.index_by_hwnd
+        self.index_by_name = self.roster.index_by_name
+    
+    def replace(self, current_index: Optional[int] = None,
+                turn_order: Optional[TurnOrder] = None) -> 'RosterSnapshot':
+        """Nouvel instantané pour le même roster (les index sont partagés)."""
+        snapshot = copy.copy(self)
+        if current_index is not None:
+            snapshot.current_index = current_index
+        if turn_order is not None:
+            snapshot.turn_order = turn_order
+        snapshot.version = self.version + 1
+        return snapshot
+    
+    def current(self) -> Optional[CharacterWindow]:
+        if 0 <= self.current_index < len(self.characters):
+            return self.characters[self.current_index]
+        return None
+    
+    def next_index(self) -> int:
+        if not self.characters:
+            return -1
+        return self.turn_order.next_live(self.current_index)
+    
+    def next_character(self) -> Optional[CharacterWindow]:
+        next_index = self.next_index()
+        if next_index < 0:
+            return None
+        return self.characters[next_index]
+    
+    def names(self) -> List[str]:
+        return [char.name for char in self.characters]
+    
+    def hwnds(self) -> List[int]:
+        return [char.hwnd for char in self.characters]
+
+
 class WindowManager:
-    """Gère les fenêtres DOFUS et l'ordre de switching."""
+    """Gère les fenêtres DOFUS et l'ordre de switching.
+    
+    L'état du roster (personnages, personnage actif, ordre de tour) est un
+    RosterSnapshot immuable remplacé d'un bloc. Les écritures (thread de
+    switch, registre, configuration) sont sérialisées par `_write_lock` et
+    passent toutes par `_publish`; les lectures ne prennent aucun verrou.
+    Les appels système (focus) sont faits hors du verrou.
+    """
+    
+    MAX_FOCUS_ATTEMPTS = 3  # Nombre maximal de fenêtres essayées par suivant/précédent
     
     def __init__(self, detector: WindowDetector):
         self.detector = detector
-        self.characters: List[CharacterWindow] = []
-        self.current_index: int = 0
+        self._snapshot = RosterSnapshot()
+        # Réentrant: un rattachement peut être déclenché depuis un callback du registre
+        self._write_lock = threading.RLock()
+        self.registry: Optional[WindowRegistry] = None
+        self.unmatched_characters: List[CharacterWindow] = []
+        self.last_rebind: Optional[RebindReport] = None
+        # Mode focus (désactivé par défaut): seuls l'actif et le suivant restent affichés
+        self.focus_mode = FocusMode(detector.backend)
         
+        # Callback appelé quand une fenêtre d'un personnage change (fermée, renommée...)
+        self.on_change: Callable = lambda: None
+    
+    def snapshot(self) -> RosterSnapshot:
+        """Instantané courant du roster (lecture sans verrou)."""
+        return self._snapshot
+    
+    @property
+    def characters(self) -> Tuple[CharacterWindow, ...]:
+        return self._snapshot.characters
+    
+    @property
+    def current_index(self) -> int:
+        return self._snapshot.current_index
+    
+    @property
+    def turn_order(self) -> TurnOrder:
+        return self._snapshot.turn_order
+    
+    def _publish(self, snapshot: RosterSnapshot):
+        """Unique point d'écriture de l'état du roster (appelant sous `_write_lock`)."""
+        self._snapshot = snapshot
+    
+    def _publish_roster(self, characters: List[CharacterWindow], current_index: Optional[int] = None):
+        """Publie un nouveau roster complet et recalcule son masque de validité (sans appel système)."""
+        roster = Roster(characters)
+        previous = self._snapshot
+        unmatched = {id(c) for c in self.unmatched_characters}
+        order = previous.turn_order.copy()
+        order.set_mask([id(c) not in unmatched and self._is_registered(c.hwnd) for c in roster.characters])
+        if current_index is None:
+            current_index = previous.current_index
+        self._publish(RosterSnapshot(roster, self._clamp(current_index, roster), order, previous.version + 1))
+    
+    def _is_registered(self, hwnd: int) -> bool:
+        return self.registry is None or self.registry.contains(hwnd)
+    
+    @staticmethod
+    def _clamp(current_index: int, roster: Roster) -> int:
+        return current_index if 0 <= current_index < len(roster) else 0
+    
+    def _publish_turn_order(self, snapshot: RosterSnapshot, order: TurnOrder) -> bool:
+        """Publie un ordre de tour calculé sur `snapshot`, si le roster n'a pas été remplacé entre-temps."""
+        current = self._snapshot
+        if current.characters is not snapshot.characters:
+            return False
+        self._publish(current.replace(turn_order=order))
+        return True
+    
+    def attach_registry(self, registry: WindowRegistry):
+        """Suit les événements du registre au lieu d'interroger Windows."""
+        self.registry = registry
+        registry.subscribe(self._on_window_change)
+        with self._write_lock:
+            self._publish_roster(list(self._snapshot.characters))
+    
+    def _on_window_change(self, change: WindowChange):
+        """Callback du registre: met à jour le masque de validité et notifie."""
+        hwnd = change.window.hwnd
+        changed = False
+        if change.kind == WindowChange.REMOVED:
+            self.focus_mode.forget(hwnd)
+        elif self.unmatched_characters and change.kind in (WindowChange.ADDED, WindowChange.RENAMED):
+            # Un client relancé (ou qui vient de se connecter) peut compléter le roster
+            hwnds_before = self._snapshot.hwnds()
+            self.last_rebind = self.rebind_characters()
+            changed = self._snapshot.hwnds() != hwnds_before
+        if hwnd in self._snapshot.index_by_hwnd:
+            self.set_valid_window(hwnd, change.kind != WindowChange.REMOVED)
+            changed = True
+        if changed:
+            self.on_change()
+    
+    def set_valid_window(self, hwnd: int, valid: bool):
+        """Marque la fenêtre d'un personnage comme valide ou non."""
+        with self._write_lock:
+            snapshot = self._snapshot
+            index = snapshot.index_by_hwnd.get(hwnd)
+            if index is None or snapshot.turn_order.valid[index] == valid:
+                return
+            order = snapshot.turn_order.copy()
+            order.set_valid(index, valid)
+            self._publish_turn_order(snapshot, order)
+    
+    def _is_window_valid(self, hwnd: int) -> bool:
+        """Vérifie une fenêtre via le registre si disponible, sinon via Windows."""
+        if self.registry is not None:
+            return self.registry.contains(hwnd)
+        return self.detector.is_window_valid(hwnd)
+    
+    def _live_windows(self) -> List[WindowInfo]:
+        """Retourne les fenêtres DOFUS vivantes (registre si disponible)."""
+        if self.registry is not None:
+            return self.registry.get_windows()
+        return self.detector.detect_windows()
+    
+    def _fingerprint_for(self, hwnd: int) -> Optional[CharacterFingerprint]:
+        """Calcule l'empreinte d'une fenêtre connue."""
+        window = self.registry.get(hwnd) if self.registry is not None else None
+        if window is None:
+            window = next((w for w in self.detector.windows if w.hwnd == hwnd), None)
+        if window is None:
+            return None
+        return CharacterFingerprint.from_window(window, self.detector.process_cache)
+    
     def add_character(self, name: str, hwnd: int, position: int):
-        """Ajoute un personnage à la liste."""
-        char = CharacterWindow(name, hwnd, position)
-        self.characters.append(char)
-        self._sort_by_position()
-        
+        """Ajoute un personnage à la liste (insertion à sa place, sans retri)."""
+        char = CharacterWindow(name, hwnd, position, self._fingerprint_for(hwnd))
+        with self._write_lock:
+            snapshot = self._snapshot
+            index = snapshot.roster.insertion_point(position)
+            order = snapshot.turn_order.copy()
+            order.insert(index, self._is_registered(hwnd))
+            current_index = snapshot.current_index
+            if index <= current_index < len(snapshot.characters):
+                current_index += 1  # le personnage actif reste le même
+            self._publish(RosterSnapshot(snapshot.roster.added(char), current_index, order, snapshot.version + 1))
+    
+    def set_characters(self, characters: List[Tuple[str, int, int]]):
+        """Remplace tout le roster par des personnages (nom, hwnd, position), en une publication."""
+        chars = [CharacterWindow(name, hwnd, position, self._fingerprint_for(hwnd))
+                 for name, hwnd, position in characters]
+        with self._write_lock:
+            self.unmatched_characters = []
+            self._publish_roster(chars)
+    
     def remove_character(self, position: int):
         """Retire un personnage de la liste."""
-        self.characters = [c for c in self.characters if c.position != position]
-        
+        with self._write_lock:
+            snapshot = self._snapshot
+            index = snapshot.roster.index_by_position.get(position)
+            if index is None:
+                return
+            removed = snapshot.characters[index]
+            self.unmatched_characters = [c for c in self.unmatched_characters if c is not removed]
+            roster = snapshot.roster.removed(position)
+            order = snapshot.turn_order.copy()
+            order.remove(index)
+            current_index = snapshot.current_index
+            if index < current_index:
+                current_index -= 1
+            self._publish(RosterSnapshot(roster, self._clamp(current_index, roster), order, snapshot.version + 1))
+    
     def update_character_name(self, position: int, new_name: str):
         """Met à jour le nom d'un personnage."""
-        for char in self.characters:
-            if char.position == position:
-                char.name = new_name
-                break
-                
-    def _sort_by_position(self):
-        """Trie les personnages par position (ordre d'initiative)."""
-        self.characters.sort(key=lambda c: c.position)
-        
+        with self._write_lock:
+            snapshot = self._snapshot
+            roster = snapshot.roster.renamed(position, new_name)
+            if roster is snapshot.roster:
+                return
+            index = roster.index_by_position[position]
+            old = snapshot.characters[index]
+            # Un personnage sans fenêtre le reste sous son nouveau nom
+            self.unmatched_characters = [roster.characters[index] if c is old else c
+                                         for c in self.unmatched_characters]
+            self._publish(RosterSnapshot(roster, snapshot.current_index, snapshot.turn_order, snapshot.version + 1))
+    
+    def _focus_position(self, snapshot: RosterSnapshot, index: int) -> bool:
+        """Met le focus sur la fenêtre d'une position et met à jour le masque en cas d'échec."""
+        char = snapshot.characters[index]
+        focus_mode = self.focus_mode
+        reveal_ms = 0.0
+        if focus_mode.enabled:
+            # Fenêtre masquée par le mode focus (saut direct vers une position)
+            reveal_ms = focus_mode.reveal_target(char.hwnd)
+        if self.detector.focus_window(char.hwnd):
+            with self._write_lock:
+                current = self._snapshot
+                if current.characters is not snapshot.characters:
+                    # Roster remplacé pendant le focus: retrouver la fenêtre dans le nouveau
+                    index = current.index_by_hwnd.get(char.hwnd, current.current_index)
+                self._publish(current.replace(current_index=index))
+            if focus_mode.enabled:
+                self._plan_focus_mode(self._snapshot)
+                focus_mode.run(spent_ms=reveal_ms)
+            return True
+        # Échec: la fenêtre n'est marquée invalide que si elle n'existe vraiment plus
+        if not self.detector.is_window_valid(char.hwnd):
+            self.set_valid_window(char.hwnd, False)
+        return False
+    
     def switch_to_position(self, position: int) -> bool:
-        """Switch vers un personnage à une position donnée (0-7)."""
-        if 0 <= position < len(self.characters):
-            char = self.characters[position]
-            if self.detector.is_window_valid(char.hwnd):
-                success = self.detector.focus_window(char.hwnd)
-                if success:
-                    self.current_index = position
-                return success
+        """Switch vers un personnage à une position donnée (0 = premier)."""
+        snapshot = self._snapshot
+        if 0 <= position < len(snapshot.characters) and snapshot.turn_order.valid[position]:
+            return self._focus_position(snapshot, position)
         return False
     
     def switch_to_character(self, name: str) -> bool:
         """Switch vers un personnage par son nom."""
-        for i, char in enumerate(self.characters):
-            if char.name.upper() == name.upper():
-                return self.switch_to_position(i)
-        return False
+        index = self._snapshot.index_by_name.get(name.casefold())
+        if index is None:
+            return False
+        return self.switch_to_position(index)
     
     def switch_to_next(self) -> bool:
         """Switch vers le personnage suivant dans l'ordre d'initiative."""
-        if not self.characters:
-            return False
-            
-        self.current_index = (self.current_index + 1) % len(self.characters)
-        char = self.characters[self.current_index]
-        
-        if self.detector.is_window_valid(char.hwnd):
-            return self.detector.focus_window(char.hwnd)
-        else:
-            # Si la fenêtre n'est plus valide, essayer la suivante
-            return self.switch_to_next()
+        return self.switch_by(1)
     
     def switch_to_previous(self) -> bool:
         """Switch vers le personnage précédent dans l'ordre d'initiative."""
-        if not self.characters:
-            return False
-            
-        self.current_index = (self.current_index - 1) % len(self.characters)
-        char = self.characters[self.current_index]
+        return self.switch_by(-1)
+    
+    def switch_by(self, offset: int) -> bool:
+        """Avance (ou recule si négatif) de `offset` personnages vivants en un seul switch.
         
-        if self.detector.is_window_valid(char.hwnd):
-            return self.detector.focus_window(char.hwnd)
-        else:
-            return self.switch_to_previous()
+        Les personnages invalides ou passés sont sautés via l'ordre de tour; au
+        plus MAX_FOCUS_ATTEMPTS fenêtres sont essayées si le focus échoue.
+        """
+        snapshot = self._snapshot
+        if not snapshot.characters or offset == 0:
+            return False
+        index = snapshot.turn_order.step(snapshot.current_index, offset)
+        for _ in range(self.MAX_FOCUS_ATTEMPTS):
+            if index < 0:
+                return False
+            if self._focus_position(snapshot, index):
+                return True
+            latest = self._snapshot
+            if latest.characters is not snapshot.characters:
+                return False
+            # Ordre de tour éventuellement mis à jour par l'échec
+            snapshot = latest
+            order = snapshot.turn_order
+            index = order.next_live(index) if offset > 0 else order.prev_live(index)
+        return False
+    
+    def toggle_skip(self, position: int) -> bool:
+        """Passe (ou réintègre) un personnage dans le cycle suivant/précédent."""
+        with self._write_lock:
+            snapshot = self._snapshot
+            order = snapshot.turn_order.copy()
+            skipped = order.toggle_skip(position)
+            self._publish_turn_order(snapshot, order)
+            return skipped
+    
+    def toggle_skip_current(self) -> bool:
+        """Passe (ou réintègre) le personnage actif, ex: mort pendant ce combat."""
+        with self._write_lock:
+            return self.toggle_skip(self._snapshot.current_index)
+    
+    def clear_skips(self):
+        """Réintègre tous les personnages passés."""
+        with self._write_lock:
+            snapshot = self._snapshot
+            if snapshot.turn_order.skipped:
+                order = snapshot.turn_order.copy()
+                order.clear_skips()
+                self._publish_turn_order(snapshot, order)
     
     def get_current_character(self) -> Optional[CharacterWindow]:
         """Retourne le personnage actuellement actif."""
-        if 0 <= self.current_index < len(self.characters):
-            return self.characters[self.current_index]
-        return None
+        return self._snapshot.current()
+    
+    def get_next_index(self) -> int:
+        """Retourne la position du prochain personnage vivant, -1 si aucun."""
+        return self._snapshot.next_index()
     
     def get_next_character(self) -> Optional[CharacterWindow]:
         """Retourne le prochain personnage dans l'ordre."""
-        if not self.characters:
-            return None
-        next_index = (self.current_index + 1) % len(self.characters)
-        return self.characters[next_index]
+        return self._snapshot.next_character()
+    
+    def prefetch_next(self) -> bool:
+        """Prépare la fenêtre du prochain personnage (restaurée sans activation)."""
+        snapshot = self._snapshot
+        next_index = snapshot.next_index()
+        if next_index < 0 or next_index == snapshot.current_index:
+            return False
+        return self.detector.prepare_window(snapshot.characters[next_index].hwnd)
+    
+    def _plan_focus_mode(self, snapshot: RosterSnapshot):
+        """Prévoit de garder l'actif et le suivant affichés et de masquer les autres."""
+        current = snapshot.current()
+        if current is None:
+            return
+        keep = {current.hwnd}
+        next_char = snapshot.next_character()
+        if next_char is not None:
+            keep.add(next_char.hwnd)
+        valid = snapshot.turn_order.valid
+        self.focus_mode.plan([c.hwnd for i, c in enumerate(snapshot.characters) if valid[i]], keep)
+    
+    def settle_focus_mode(self) -> bool:
+        """Termine hors budget les opérations du mode focus différées (thread de switch au repos)."""
+        if not self.focus_mode.pending:
+            return False
+        self.focus_mode.run(limited=False)
+        return True
     
     def get_character_list(self) -> List[str]:
         """Retourne la liste des noms de personnages dans l'ordre."""
-        return [char.name for char in self.characters]
+        return self._snapshot.names()
     
     def validate_windows(self) -> List[int]:
         """Vérifie la validité des fenêtres et retourne les positions invalides."""
+        snapshot = self._snapshot
         invalid_positions = []
-        for char in self.characters:
-            if not self.detector.is_window_valid(char.hwnd):
+        mask = []
+        for char in snapshot.characters:
+            valid = self._is_window_valid(char.hwnd)
+            mask.append(valid)
+            if not valid:
                 invalid_positions.append(char.position)
+        with self._write_lock:
+            order = self._snapshot.turn_order.copy()
+            order.set_mask(mask)
+            self._publish_turn_order(snapshot, order)
         return invalid_positions
     
     def to_dict(self) -> Dict:
         """Convertit la configuration en dictionnaire."""
+        snapshot = self._snapshot
         return {
-            "characters": [c.to_dict() for c in self.characters],
-            "current_index": self.current_index
+            "characters": [c.to_dict() for c in snapshot.characters],
+            "current_index": snapshot.current_index
         }
     
     def from_dict(self, data: Dict):
-        """Charge la configuration depuis un dictionnaire."""
-        self.characters = [CharacterWindow.from_dict(c) for c in data.get("characters", [])]
-        self.current_index = data.get("current_index", 0)
-        self._sort_by_position()
+        """Charge la configuration depuis un dictionnaire.
+        
+        Les hwnd sauvegardés changent à chaque lancement de DOFUS: chaque
+        personnage est rattaché à sa fenêtre vivante via son empreinte avant
+        que le roster ne soit publié.
+        """
+        characters = [CharacterWindow.from_dict(c) for c in data.get("characters", [])]
+        rebound, unmatched, report = self._resolve(characters, self._live_windows())
+        with self._write_lock:
+            self.unmatched_characters = unmatched
+            self._publish_roster(rebound, data.get("current_index", 0))
+        self.last_rebind = report
+    
+    def rebind_characters(self, windows: Optional[List[WindowInfo]] = None) -> RebindReport:
+        """Rattache chaque personnage à une fenêtre vivante.
+        
+        Les personnages sans fenêtre sont listés dans `unmatched_characters`
+        et gardent leur ancien hwnd (invalide) jusqu'au prochain rattachement.
+        L'énumération des fenêtres et le calcul des empreintes se font hors de
+        `_write_lock`; si le roster a été remplacé entre-temps, la résolution
+        est refaite sur le nouveau avant de publier.
+        """
+        if windows is None:
+            windows = self._live_windows()
+        while True:
+            characters = self._snapshot.characters
+            rebound, unmatched, report = self._resolve(list(characters), windows)
+            with self._write_lock:
+                if self._snapshot.characters is characters:
+                    self.unmatched_characters = unmatched
+                    self._publish_roster(rebound)
+                    return report
+    
+    def _resolve(self, characters: List[CharacterWindow], windows: List[WindowInfo]
+                 ) -> Tuple[List[CharacterWindow], List[CharacterWindow], RebindReport]:
+        """Associe chaque personnage à une fenêtre (sans verrou ni publication).
+        
+        Retourne le nouveau roster, les personnages sans fenêtre et le rapport.
+        """
+        resolver = IdentityResolver(windows, self.detector.process_cache)
+        results = resolver.rebind([(c.position, c.fingerprint, c.name) for c in characters])
+        
+        report = RebindReport()
+        rebound = []
+        unmatched = []
+        for char in characters:
+            window, ambiguous = results.get(char.position, (None, False))
+            if window is None:
+                unmatched.append(char)
+                rebound.append(char)
+                report.unmatched.append(char.name)
+                continue
+            if ambiguous:
+                report.ambiguous.append(char.name)
+            fresh = resolver.fingerprints[window.hwnd]
+            if char.fingerprint is not None:
+                # Conserver le nom/la classe connus si le titre ne les affiche pas encore
+                fresh.character = fresh.character or char.fingerprint.character
+                fresh.character_class = fresh.character_class or char.fingerprint.character_class
+            rebound.append(CharacterWindow(char.name, window.hwnd, char.position, fresh))
+            report.matched[char.position] = window.hwnd
+        return rebound, unmatched, report
@@ -0,0 +1,203 @@
+"""Registre des fenêtres DOFUS alimenté par les événements système."""
+import ctypes
+import threading
+from typing import Callable, Dict, List, Optional
+
+from window_detector import WindowDetector, WindowInfo
+
+
+# Événements WinEvent (winuser.h)
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_NAMECHANGE = 0x800C
+
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+GA_ROOT = 2
+WM_QUIT = 0x0012
+
+
+class WindowChange:
+    """Modification du registre transmise aux abonnés."""
+    
+    ADDED = "added"
+    REMOVED = "removed"
+    RENAMED = "renamed"
+    
+    def __init__(self, kind: str, window: WindowInfo, old_title: Optional[str] = None):
+        self.kind = kind
+        self.window = window
+        self.old_title = old_title
+    
+    def __repr__(self):
+        return f"WindowChange({self.kind}, {self.window!r})"
+
+
+class WindowRegistry:
+    """Ensemble vivant des fenêtres DOFUS, mis à jour incrémentalement.
+    
+    Une énumération complète n'est faite qu'au démarrage (`seed`); ensuite
+    chaque événement de création, destruction, affichage/masquage ou changement
+    de titre met à jour le registre et notifie les abonnés.
+    """
+    
+    def __init__(self, detector: WindowDetector):
+        self.detector = detector
+        self.windows: Dict[int, WindowInfo] = {}
+        self._subscribers: List[Callable[[WindowChange], None]] = []
+        self._lock = threading.Lock()
+    
+    def seed(self, windows: Optional[List[WindowInfo]] = None) -> List[WindowInfo]:
+        """Initialise le registre (par défaut via une détection complète)."""
+        if windows is None:
+            windows = self.detector.detect_windows()
+        with self._lock:
+            self.windows = {w.hwnd: w for w in windows}
+        return windows
+    
+    def subscribe(self, callback: Callable[[WindowChange], None]):
+        """Abonne un callback aux modifications du registre."""
+        self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[WindowChange], None]):
+        """Désabonne un callback."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+    
+    def get_windows(self) -> List[WindowInfo]:
+        """Retourne les fenêtres connues dans l'ordre d'apparition."""
+        with self._lock:
+            return list(self.windows.values())
+    
+    def contains(self, hwnd: int) -> bool:
+        """Indique si une fenêtre est connue et visible (sans appel système)."""
+        return hwnd in self.windows
+    
+    def get(self, hwnd: int) -> Optional[WindowInfo]:
+        """Retourne les informations d'une fenêtre connue."""
+        return self.windows.get(hwnd)
+    
+    def handle_event(self, event: int, hwnd: int):
+        """Applique un événement WinEvent au registre."""
+        change = None
+        if event in (EVENT_OBJECT_CREATE, EVENT_OBJECT_SHOW):
+            if hwnd not in self.windows:
+                change = self._try_add(hwnd)
+        elif event in (EVENT_OBJECT_DESTROY, EVENT_OBJECT_HIDE):
+            with self._lock:
+                window = self.windows.pop(hwnd, None)
+            if window is not None:
+                change = WindowChange(WindowChange.REMOVED, window)
+        elif event == EVENT_OBJECT_NAMECHANGE:
+            window = self.windows.get(hwnd)
+            if window is not None:
+                change = self._rename(window)
+        if change is not None:
+            self._notify(change)
+    
+    def _try_add(self, hwnd: int) -> Optional[WindowChange]:
+        """Ajoute une fenêtre si elle est visible et appartient à DOFUS."""
+        backend = self.detector.backend
+        try:
+            pid = backend.get_window_pid(hwnd)
+            if not self.detector.process_cache.classify(pid):
+                return None
+            if not backend.is_window_visible(hwnd):
+                return None
+            window = WindowInfo(hwnd, backend.get_window_text(hwnd), pid)
+        except Exception:
+            return None
+        with self._lock:
+            if hwnd in self.windows:
+                return None
+            self.windows[hwnd] = window
+        return WindowChange(WindowChange.ADDED, window)
+    
+    def _rename(self, window: WindowInfo) -> Optional[WindowChange]:
+        """Met à jour le titre d'une fenêtre connue."""
+        try:
+            title = self.detector.backend.get_window_text(window.hwnd)
+        except Exception:
+            return None
+        if title == window.title:
+            return None
+        old_title = window.title
+        window.title = title
+        return WindowChange(WindowChange.RENAMED, window, old_title)
+    
+    def _notify(self, change: WindowChange):
+        for callback in list(self._subscribers):
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"Erreur dans un abonné du registre: {e}")
+
+
+class Win32EventSource:
+    """Source d'événements réelle basée sur SetWinEventHook.
+    
+    Les hooks hors contexte exigent une boucle de messages: ils sont donc
+    installés dans un thread dédié qui relaie chaque événement au registre
+    par la boucle du cœur (`core`).
+    """
+    
+    def __init__(self, registry: WindowRegistry):
+        self.registry = registry
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id = 0
+        self._proc = None
+        self.core = None
+    
+    def start(self):
+        """Installe les hooks dans un thread dédié."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Retire les hooks et arrête le thread."""
+        if self._thread is None:
+            return
+        if self._thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        self._thread = None
+    
+    def _run(self):
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        
+        def callback(_hook, event, hwnd, id_object, id_child, _thread, _time):
+            # Ne garder que les fenêtres de premier niveau elles-mêmes
+            if not hwnd or id_object != OBJID_WINDOW or id_child != CHILDID_SELF:
+                return
+            if event != EVENT_OBJECT_DESTROY and user32.GetAncestor(hwnd, GA_ROOT) != hwnd:
+                return
+            self.core.call(self.registry.handle_event, event, hwnd)
+        
+        self._proc = WinEventProc(callback)
+        flags = WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+        hooks = [
+            user32.SetWinEventHook(EVENT_OBJECT_CREATE, EVENT_OBJECT_HIDE, 0, self._proc, 0, 0, flags),
+            user32.SetWinEventHook(EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE, 0, self._proc, 0, 0, flags),
+        ]
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
+        self._thread_id = 0